@@ -0,0 +1,92 @@
+"""Cold-start benchmark for the FastAPI app.
+
+Each sample is a fresh interpreter that imports ``src.services.app`` and then
+serves its first ``/healthz`` request in-process, so import-time regressions
+(an eager SDK import, work done at module level) show up directly::
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --max-import-ms 1500 --max-healthz-ms 200  # CI guard
+
+Results are printed as JSON; with budgets set, the exit status is 1 when a
+median exceeds its budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+from src.services import app as module
+imported = time.perf_counter()
+from fastapi.testclient import TestClient  # harness only; kept out of both timings
+client = TestClient(module.app)
+ready = time.perf_counter()
+response = client.get("/healthz")
+served = time.perf_counter()
+assert response.status_code == 200, response.text
+print(json.dumps({"import_ms": (imported - start) * 1000, "healthz_ms": (served - ready) * 1000}))
+"""
+
+
+def sample(env: Dict[str, str]) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=PROJECT_ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "median": round(statistics.median(ordered), 1),
+        "p95": round(ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-healthz-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT), "LOGURU_LEVEL": "ERROR"}
+    sample(env)  # warm the filesystem and bytecode caches
+    samples = [sample(env) for _ in range(max(args.runs, 1))]
+    report = {
+        "runs": len(samples),
+        "import_ms": summarize([s["import_ms"] for s in samples]),
+        "first_healthz_ms": summarize([s["healthz_ms"] for s in samples]),
+    }
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if args.max_import_ms is not None and report["import_ms"]["median"] > args.max_import_ms:
+        print(f"import time over budget ({args.max_import_ms} ms)", file=sys.stderr)
+        failed = True
+    if args.max_healthz_ms is not None and report["first_healthz_ms"]["median"] > args.max_healthz_ms:
+        print(f"first /healthz over budget ({args.max_healthz_ms} ms)", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
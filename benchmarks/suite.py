@@ -0,0 +1,348 @@
+"""End-to-end throughput and latency benchmarks against simulated backends.
+
+Drives ``DebateManager.run``, the ``/debate`` and ``/adk/run`` endpoints and
+``FactChecker.search`` with the Gemini simulator and a simulated search
+backend, sweeping rounds, concurrency and the number of distinct topics. Each
+cell reports throughput, p50/p95/p99 latency, peak RSS and allocations per
+debate; per-stage (argument / rebuttal / judge) call latency comes from the
+prompt usage recorder. Results are written as JSON so runs can be compared::
+
+    python benchmarks/suite.py --quick --out benchmarks/results/baseline.json
+    python benchmarks/suite.py --quick --compare benchmarks/results/baseline.json
+
+``--compare`` exits with status 1 when any cell's p95 latency or throughput is
+more than ``--tolerance`` worse than the baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("LOGURU_LEVEL", "WARNING")
+
+from src.agents.debaters import DebaterA, DebaterB  # noqa: E402
+from src.agents.judge import Judge  # noqa: E402
+from src.agents.prompts import prompt_usage  # noqa: E402
+from src.services.debate import DebateManager  # noqa: E402
+from src.services.runtime import GeminiLLM  # noqa: E402
+from src.services.simulator import SimulatedGemini  # noqa: E402
+from src.tools.factcheck import FactChecker  # noqa: E402
+
+TOPICS = [
+    "Should cities ban private cars?",
+    "Should voting be mandatory?",
+    "Is remote work better than office work?",
+    "Should schools ban smartphones in classrooms?",
+    "Should artificial intelligence be regulated?",
+    "Are electric cars the future of transportation?",
+    "Should social media platforms be liable for user content?",
+    "Is nuclear power essential for decarbonisation?",
+]
+
+
+class SimulatedSearch:
+    """Citation backend with log-normal latency, standing in for Custom Search."""
+
+    def __init__(self, latency_ms: float, time_scale: float, seed: int = 0) -> None:
+        self.timing = SimulatedGemini(
+            latency_ms=latency_ms, tokens_per_second=1e9, time_scale=time_scale, seed=seed
+        )
+
+    def search(self, query: str, *, max_results: int = 3) -> List[Dict[str, str]]:
+        time.sleep(self.timing.plan("search", "", query).delay)
+        return [
+            {"title": f"{query} — source {i}", "link": f"https://example.org/{i}", "snippet": ""}
+            for i in range(1, max_results + 1)
+        ]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def allocations(call: Callable[[], Any]) -> Dict[str, float]:
+    """Peak traced bytes and retained blocks for one call, measured separately from timing."""
+    tracemalloc.start()
+    before_blocks = sys.getallocatedblocks()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    retained = sys.getallocatedblocks() - before_blocks
+    tracemalloc.stop()
+    return {"alloc_peak_kb": round(peak / 1024, 1), "alloc_retained_blocks": retained}
+
+
+class Suite:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.simulator = SimulatedGemini(
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            time_scale=args.time_scale,
+            seed=args.seed,
+        )
+        self.llm = GeminiLLM(simulator=self.simulator)
+
+    def fact_checker(self) -> FactChecker:
+        backend = SimulatedSearch(self.args.search_latency_ms, self.args.time_scale, self.args.seed)
+        return FactChecker(backend=backend)
+
+    def manager(self) -> DebateManager:
+        checker = self.fact_checker()
+        return DebateManager(
+            debater_a=DebaterA(name="Alice", stance="pro", llm=self.llm, fact_checker=checker),
+            debater_b=DebaterB(name="Blake", stance="con", llm=self.llm, fact_checker=checker),
+            judge=Judge(llm=self.llm),
+        )
+
+    def cells(self) -> List[Dict[str, int]]:
+        grid = itertools.product(self.args.rounds, self.args.concurrency, self.args.topics)
+        return [{"rounds": r, "concurrency": c, "topics": t} for r, c, t in grid]
+
+    # -- targets -----------------------------------------------------------
+
+    def bench_manager(self, cell: Dict[str, int]) -> Dict[str, Any]:
+        """Blocking ``DebateManager.run`` from a pool of caller threads."""
+        manager = self.manager()
+        jobs = self._jobs(cell)
+
+        def one(topic: str) -> float:
+            start = time.perf_counter()
+            manager.run(topic, rounds=cell["rounds"])
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=cell["concurrency"]) as pool:
+            latencies = list(pool.map(one, jobs))
+        elapsed = time.perf_counter() - start
+        allocs = allocations(lambda: manager.run(jobs[0], rounds=cell["rounds"]))
+        return self._report(cell, latencies, elapsed, allocs)
+
+    def bench_api(self, cell: Dict[str, int]) -> Dict[str, Any]:
+        """``POST /debate`` through the ASGI app with concurrent async clients."""
+        import httpx
+
+        from src.services.app import app, services
+
+        # Serve the endpoint from this suite's simulated backends.
+        services.built["llm"] = self.llm
+        services.built["fact_checker"] = self.fact_checker()
+        services.built.pop("manager", None)
+        jobs = self._jobs(cell)
+
+        async def drive() -> tuple:
+            transport = httpx.ASGITransport(app=app)
+            limit = asyncio.Semaphore(cell["concurrency"])
+            client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+            async with client:
+
+                async def one(topic: str) -> float:
+                    async with limit:
+                        start = time.perf_counter()
+                        body = {"topic": topic, "rounds": cell["rounds"]}
+                        (await client.post("/debate", json=body)).raise_for_status()
+                        return time.perf_counter() - start
+
+                start = time.perf_counter()
+                latencies = await asyncio.gather(*(one(topic) for topic in jobs))
+                return list(latencies), time.perf_counter() - start
+
+        latencies, elapsed = asyncio.run(drive())
+        allocs = allocations(lambda: asyncio.run(services.manager.arun(jobs[0], rounds=cell["rounds"])))
+        return self._report(cell, latencies, elapsed, allocs)
+
+    def bench_adk(self, cell: Dict[str, int]) -> Dict[str, Any]:
+        """``POST /adk/run``; needs ENABLE_ADK_RUNTIME=1 and the ADK stack installed."""
+        from fastapi.testclient import TestClient
+
+        from src.services.app import app, services
+
+        if services.adk_runtime is None:
+            return {**cell, "skipped": "ADK runtime unavailable (needs ENABLE_ADK_RUNTIME=1 and google-adk)"}
+        client = TestClient(app)
+        jobs = self._jobs(cell)
+
+        def one(topic: str) -> float:
+            start = time.perf_counter()
+            client.post("/adk/run", json={"prompt": f"Debate: {topic}"}).raise_for_status()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=cell["concurrency"]) as pool:
+            latencies = list(pool.map(one, jobs))
+        return self._report(cell, latencies, time.perf_counter() - start, {})
+
+    def bench_factcheck(self, cell: Dict[str, int]) -> Dict[str, Any]:
+        """``FactChecker.search``: the first pass misses the cache, the second hits it."""
+        checker = self.fact_checker()
+        queries = [f"{TOPICS[i % len(TOPICS)]} evidence {i // len(TOPICS)}" for i in range(cell["topics"])]
+        jobs = [queries[i % len(queries)] for i in range(self.args.debates)]
+        passes = {}
+        for name in ("cold", "warm"):
+            def one(query: str) -> float:
+                start = time.perf_counter()
+                checker.search(query)
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=cell["concurrency"]) as pool:
+                latencies = list(pool.map(one, jobs))
+            elapsed = time.perf_counter() - start
+            passes[name] = {
+                "throughput_per_s": round(len(jobs) / elapsed, 2),
+                **percentiles(latencies),
+            }
+        stats = checker.stats()
+        return {
+            **cell,
+            **passes,
+            "upstream_requests": stats["upstream_requests"],
+            "coalesced": stats["coalesced"],
+        }
+
+    # -- helpers -----------------------------------------------------------
+
+    def _jobs(self, cell: Dict[str, int]) -> List[str]:
+        topics = [
+            TOPICS[i % len(TOPICS)] + ("" if i < len(TOPICS) else f" (#{i})") for i in range(cell["topics"])
+        ]
+        return [topics[i % len(topics)] for i in range(self.args.debates)]
+
+    def _report(
+        self,
+        cell: Dict[str, int],
+        latencies: List[float],
+        elapsed: float,
+        allocs: Dict[str, float],
+    ) -> Dict[str, Any]:
+        return {
+            **cell,
+            "debates": len(latencies),
+            "throughput_per_s": round(len(latencies) / elapsed, 2),
+            **percentiles(latencies),
+            "peak_rss_mb": peak_rss_mb(),
+            **allocs,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for target in self.args.targets:
+            bench = getattr(self, f"bench_{target}")
+            rows = []
+            for cell in self.cells():
+                prompt_usage.reset()
+                row = bench(cell)
+                if target in ("manager", "api"):
+                    row["stages"] = {
+                        role: {key: value for key, value in stats.items() if key.startswith("latency")}
+                        for role, stats in prompt_usage.stats().items()
+                    }
+                rows.append(row)
+                print(json.dumps({"target": target, **row}), file=sys.stderr)
+                if target == "adk" and "skipped" in row:
+                    break
+            results[target] = rows
+        return {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "threads": threading.active_count(),
+                "args": {k: v for k, v in vars(self.args).items() if k not in ("out", "compare")},
+                "simulator": self.simulator.stats(),
+            },
+            "results": results,
+        }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a line per cell whose p95 or throughput regressed by more than ``tolerance``."""
+    regressions = []
+    for target, rows in current["results"].items():
+        base_rows = {_cell_key(row): row for row in baseline.get("results", {}).get(target, [])}
+        for row in rows:
+            base = base_rows.get(_cell_key(row))
+            if not base or "p95_ms" not in row or "p95_ms" not in base:
+                continue
+            if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{target} {_cell_key(row)}: p95 {base['p95_ms']} -> {row['p95_ms']} ms")
+            if row["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+                before, after = base["throughput_per_s"], row["throughput_per_s"]
+                regressions.append(f"{target} {_cell_key(row)}: throughput {before} -> {after}/s")
+    return regressions
+
+
+def _cell_key(row: Dict[str, Any]) -> str:
+    return f"rounds={row['rounds']} concurrency={row['concurrency']} topics={row['topics']}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    targets = ["manager", "api", "factcheck", "adk"]
+    parser.add_argument("--targets", nargs="+", default=targets, choices=targets)
+    parser.add_argument("--rounds", nargs="+", type=int, default=[1, 2, 3])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--topics", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--debates", type=int, default=32, help="debates (or searches) per cell")
+    parser.add_argument("--latency-ms", type=float, default=600.0, help="median simulated LLM latency")
+    parser.add_argument("--search-latency-ms", type=float, default=300.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="multiplies every simulated delay")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="rounds 1, concurrency 1 and 8, 8 debates")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.rounds, args.concurrency, args.topics, args.debates = [1], [1, 8], [8], 8
+
+    report = Suite(args).run()
+    out = args.out or PROJECT_ROOT / "benchmarks" / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"wrote {out}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
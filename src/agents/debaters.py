@@ -2,15 +2,29 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from loguru import logger
 
+from src.agents.prompts import Prompt, PromptBuilder, tracked
+from src.agents.records import Citation, Turn
+from src.agents.transcript import summarize
+from src.services.deadline import current_deadline
+from src.services.metrics import stage
 from src.services.runtime import GeminiLLM
 from src.tools.factcheck import FactChecker, FactCheckResult
 
 
-Citation = Dict[str, str]
+# Stable system instructions shared by every debater so the LLM can pool their
+# model handles; who is speaking, on what topic and stance, goes in the persona.
+ARGUMENT_SYSTEM_PROMPT = (
+    "You are a debater in a structured two-sided debate. "
+    "Argue the stance you are assigned. Use evidence-driven reasoning."
+)
+REBUTTAL_SYSTEM_PROMPT = (
+    "You are a debater in a structured two-sided debate. "
+    "Write a concise rebuttal that addresses weaknesses and highlights logical flaws."
+)
 
 
 @dataclass
@@ -21,88 +35,165 @@ class Debater:
     stance: str  # 'pro' or 'con'
     llm: GeminiLLM
     fact_checker: Optional[FactChecker] = None
+    guidance: str = ""  # optional style/strategy instructions appended to the persona
 
-    def propose_argument(self, topic: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def propose_argument(self, topic: str, context: Optional[Dict[str, Any]] = None) -> Turn:
         context = context or {}
-        citations = self._fetch_citations(topic, context)
-        system_prompt = (
-            f"You are {self.name}, debating the topic '{topic}'. "
-            f"You are taking the {self.stance} stance. Use evidence-driven reasoning."
+        with stage("debater.argument", agent=self.name):
+            citations = self._fetch_citations(topic, context)
+            persona, prompt = self._argument_request(topic, citations, context)
+            with tracked(prompt):
+                text = self.llm.generate(
+                    ARGUMENT_SYSTEM_PROMPT, prompt.text, persona=persona, role=prompt.role
+                )
+        return self._turn(text, "argument", citations)
+
+    async def apropose_argument(self, topic: str, context: Optional[Dict[str, Any]] = None) -> Turn:
+        context = context or {}
+        with stage("debater.argument", agent=self.name):
+            citations = await self._afetch_citations(topic, context)
+            persona, prompt = self._argument_request(topic, citations, context)
+            with tracked(prompt):
+                text = await self.llm.agenerate(
+                    ARGUMENT_SYSTEM_PROMPT, prompt.text, persona=persona, role=prompt.role
+                )
+        return self._turn(text, "argument", citations)
+
+    def rebut(
+        self, opponent_claim: Union[Turn, Mapping[str, Any]], context: Optional[Dict[str, Any]] = None
+    ) -> Turn:
+        with stage("debater.rebuttal", agent=self.name):
+            persona, prompt = self._rebuttal_request(opponent_claim, context or {})
+            with tracked(prompt):
+                text = self.llm.generate(
+                    REBUTTAL_SYSTEM_PROMPT, prompt.text, temperature=0.4, persona=persona, role=prompt.role
+                )
+        return self._turn(text, "rebuttal")
+
+    async def arebut(
+        self, opponent_claim: Union[Turn, Mapping[str, Any]], context: Optional[Dict[str, Any]] = None
+    ) -> Turn:
+        with stage("debater.rebuttal", agent=self.name):
+            persona, prompt = self._rebuttal_request(opponent_claim, context or {})
+            with tracked(prompt):
+                text = await self.llm.agenerate(
+                    REBUTTAL_SYSTEM_PROMPT, prompt.text, temperature=0.4, persona=persona, role=prompt.role
+                )
+        return self._turn(text, "rebuttal")
+
+    def _argument_request(
+        self, topic: str, citations: List[Citation], context: Dict[str, Any]
+    ) -> Tuple[str, Prompt]:
+        persona = self._persona(
+            f"You are {self.name}, debating the topic '{topic}'. You are taking the {self.stance} stance."
         )
         prompt = self._argument_prompt(topic, citations, context)
         logger.debug("{} generating argument for topic '{}'", self.name, topic)
-        text = self.llm.generate(system_prompt, prompt)
-        return {
-            "agent": self.name,
-            "stance": self.stance,
-            "text": text,
-            "citations": citations,
-            "type": "argument",
-        }
-
-    def rebut(self, opponent_claim: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        context = context or {}
-        opponent_text = opponent_claim.get("text", "")
-        system_prompt = (
-            f"You are {self.name}, debating as the {self.stance} side. "
-            "Write a concise rebuttal that addresses weaknesses and highlights logical flaws."
-        )
+        return persona, prompt
+
+    def _rebuttal_request(
+        self, opponent_claim: Union[Turn, Mapping[str, Any]], context: Dict[str, Any]
+    ) -> Tuple[str, Prompt]:
+        opponent_text = Turn.coerce(opponent_claim).text  # dicts from callers of the old API
+        persona = self._persona(f"You are {self.name}, debating as the {self.stance} side.")
         prompt = self._rebuttal_prompt(opponent_text, context)
         logger.debug("{} generating rebuttal", self.name)
-        text = self.llm.generate(system_prompt, prompt, temperature=0.4)
-        return {
-            "agent": self.name,
-            "stance": self.stance,
-            "text": text,
-            "type": "rebuttal",
-        }
+        return persona, prompt
+
+    def _persona(self, base: str) -> str:
+        return f"{base} {self.guidance}" if self.guidance else base
+
+    def _turn(self, text: str, kind: str, citations: Optional[List[Citation]] = None) -> Turn:
+        return Turn(
+            agent=self.name,
+            stance=self.stance,
+            text=text,
+            type=kind,
+            citations=None if citations is None else tuple(citations),
+        )
 
     def _fetch_citations(self, topic: str, context: Dict[str, Any]) -> List[Citation]:
         if not self.fact_checker:
             return []
+        timeout = self._citation_timeout()
+        if timeout == 0:
+            return []
+        try:
+            results = self.fact_checker.search(self._citation_query(topic, context), timeout=timeout)
+        except TimeoutError:
+            current_deadline().degrade("citations_timed_out")
+            return []
+        return self._to_citations(results)
+
+    async def _afetch_citations(self, topic: str, context: Dict[str, Any]) -> List[Citation]:
+        if not self.fact_checker:
+            return []
+        timeout = self._citation_timeout()
+        if timeout == 0:
+            return []
+        try:
+            results = await self.fact_checker.asearch(self._citation_query(topic, context), timeout=timeout)
+        except TimeoutError:
+            current_deadline().degrade("citations_timed_out")
+            return []
+        return self._to_citations(results)
+
+    def _citation_timeout(self) -> Optional[float]:
+        """Time-box for this turn's lookup under a debate deadline; 0 skips it."""
+        deadline = current_deadline()
+        if deadline is None:
+            return None
+        return deadline.citation_timeout(self.fact_checker.timeout)
+
+    def _citation_query(self, topic: str, context: Dict[str, Any]) -> str:
         query = f"{topic} {self.stance} position evidence"
         history = context.get("history", [])
         if history:
             query = f"{topic} {self.stance} rebuttal evidence {len(history)}"
-        results: List[FactCheckResult] = self.fact_checker.search(query)
+        return query
+
+    @staticmethod
+    def _to_citations(results: List[FactCheckResult]) -> List[Citation]:
         citations: List[Citation] = [
-            {"id": str(idx + 1), "title": hit["title"], "url": hit["link"]}
+            Citation(id=str(idx + 1), title=hit["title"], url=hit["link"])
             for idx, hit in enumerate(results[:3])
         ]
         return citations
 
-    def _argument_prompt(self, topic: str, citations: List[Citation], context: Dict[str, Any]) -> str:
-        citation_block = "\n".join(f"[{c['id']}] {c['title']} — {c['url']}" for c in citations) or "None"
+    def _argument_prompt(self, topic: str, citations: List[Citation], context: Dict[str, Any]) -> Prompt:
+        citation_block = "\n".join(f"[{c.id}] {c.title} — {c.url}" for c in citations) or "None"
         history_summary = self._summarize_history(context.get("history", []))
         return (
-            f"Topic: {topic}\n"
-            f"Stance: {self.stance}\n"
-            f"Previous turns summary: {history_summary}\n"
-            f"Suggested citations:\n{citation_block}\n\n"
-            "Write a persuasive, evidence-backed argument (2 short paragraphs). "
-            "Reference citations inline as [id] when useful and keep tone respectful."
+            PromptBuilder("argument")
+            .add(topic, "Topic: ")
+            .add(self.stance, "\nStance: ")
+            .add(history_summary, "\nPrevious turns summary: ", priority=0, floor=16)
+            .add(citation_block, "\nSuggested citations:\n", priority=1, items=True)
+            .add(
+                "Write a persuasive, evidence-backed argument (2 short paragraphs). "
+                "Reference citations inline as [id] when useful and keep tone respectful.",
+                "\n\n",
+            )
+            .build()
         )
 
-    def _rebuttal_prompt(self, opponent_text: str, context: Dict[str, Any]) -> str:
+    def _rebuttal_prompt(self, opponent_text: str, context: Dict[str, Any]) -> Prompt:
         history_summary = self._summarize_history(context.get("history", []))
         return (
-            f"Opponent claim:\n{opponent_text}\n\n"
-            f"Conversation summary: {history_summary}\n"
-            "Write a rebuttal with 2-3 crisp counterpoints. "
-            "Highlight logical gaps, missing evidence, or trade-offs."
+            PromptBuilder("rebuttal")
+            .add(opponent_text, "Opponent claim:\n", priority=1, floor=64)
+            .add(history_summary, "\n\nConversation summary: ", priority=0, floor=16)
+            .add(
+                "Write a rebuttal with 2-3 crisp counterpoints. "
+                "Highlight logical gaps, missing evidence, or trade-offs.",
+                "\n",
+            )
+            .build()
         )
 
     @staticmethod
-    def _summarize_history(history: List[Dict[str, Any]]) -> str:
-        if not history:
-            return "No prior turns."
-        snippets = []
-        for turn in history[-4:]:
-            agent = turn.get("agent", "agent")
-            role = turn.get("type", "argument")
-            text = turn.get("text", "")
-            snippets.append(f"{agent} ({role}): {text[:120]}...")
-        return " | ".join(snippets)
+    def _summarize_history(history: Sequence[Turn]) -> str:
+        return summarize(history, "debater")
 
 
 class DebaterA(Debater):
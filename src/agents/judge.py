@@ -3,20 +3,62 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from loguru import logger
 
+from src.agents.prompts import PROMPT_BUDGETS, Prompt, PromptBuilder, tracked
+from src.agents.records import Judgement
 from src.evaluation.rubric import DEFAULT_RUBRIC
+from src.services.metrics import JUDGE_PARSE_FALLBACKS, stage
 from src.services.runtime import GeminiLLM
 
 
 Rubric = Dict[str, float]
+# One round as the judge sees it: (a_claim, b_claim), each {"argument", "rebuttal"}.
+RoundClaims = Tuple[Dict[str, Any], Dict[str, Any]]
+
+RESPONSE_FORMAT = (
+    "You MUST respond with ONLY a JSON object (no other text). "
+    "Use this exact format:\n"
+    '{\n'
+    '  "rubric_scores": {\n'
+    '    "logic": {"A": 7.5, "B": 8.0, "notes": "explanation"},\n'
+    '    "factuality": {"A": 6.0, "B": 7.5, "notes": "explanation"},\n'
+    '    "persuasion": {"A": 8.0, "B": 6.5, "notes": "explanation"}\n'
+    '  },\n'
+    '  "winner": "A",\n'
+    '  "rationale": "brief explanation"\n'
+    '}\n'
+)
+
+SERIES_RESPONSE_FORMAT = (
+    "You MUST respond with ONLY a JSON object (no other text), with one entry per round "
+    "in round order. Use this exact format:\n"
+    '{\n'
+    '  "rounds": [\n'
+    '    {\n'
+    '      "round": 1,\n'
+    '      "rubric_scores": {\n'
+    '        "logic": {"A": 7.5, "B": 8.0, "notes": "explanation"},\n'
+    '        "factuality": {"A": 6.0, "B": 7.5, "notes": "explanation"},\n'
+    '        "persuasion": {"A": 8.0, "B": 6.5, "notes": "explanation"}\n'
+    '      },\n'
+    '      "winner": "A",\n'
+    '      "rationale": "brief explanation"\n'
+    '    }\n'
+    '  ]\n'
+    '}\n'
+)
 
 
 @dataclass
 class Judge:
-    """LLM-as-judge that scores each round with the rubric."""
+    """LLM-as-judge that scores each round with the rubric.
+
+    :meth:`score_series` scores a whole finished debate in one request instead,
+    returning the same per-round :class:`Judgement` objects.
+    """
 
     llm: GeminiLLM
     rubric: Rubric = field(default_factory=lambda: DEFAULT_RUBRIC.copy())
@@ -26,66 +68,145 @@ class Judge:
         a_claim: Dict[str, Any],
         b_claim: Dict[str, Any],
         context: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
-        context = context or {}
+    ) -> Judgement:
+        with stage("judge.score"):
+            system_prompt, prompt = self._request(a_claim, b_claim, context or {})
+            with tracked(prompt):
+                response = self.llm.generate(system_prompt, prompt.text, temperature=0.2, role=prompt.role)
+            return self._parse_response(response)
+
+    async def ascore_round(
+        self,
+        a_claim: Dict[str, Any],
+        b_claim: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Judgement:
+        with stage("judge.score"):
+            system_prompt, prompt = self._request(a_claim, b_claim, context or {})
+            with tracked(prompt):
+                response = await self.llm.agenerate(
+                    system_prompt, prompt.text, temperature=0.2, role=prompt.role
+                )
+            return self._parse_response(response)
+
+    def score_series(
+        self, rounds: Sequence[RoundClaims], context: Optional[Dict[str, Any]] = None
+    ) -> List[Judgement]:
+        with stage("judge.series"):
+            system_prompt, prompt = self._series_request(rounds, context or {})
+            with tracked(prompt):
+                response = self.llm.generate(system_prompt, prompt.text, temperature=0.2, role=prompt.role)
+            return self._parse_series(response, len(rounds))
+
+    async def ascore_series(
+        self, rounds: Sequence[RoundClaims], context: Optional[Dict[str, Any]] = None
+    ) -> List[Judgement]:
+        with stage("judge.series"):
+            system_prompt, prompt = self._series_request(rounds, context or {})
+            with tracked(prompt):
+                response = await self.llm.agenerate(
+                    system_prompt, prompt.text, temperature=0.2, role=prompt.role
+                )
+            return self._parse_series(response, len(rounds))
+
+    def _request(
+        self,
+        a_claim: Dict[str, Any],
+        b_claim: Dict[str, Any],
+        context: Dict[str, Any],
+    ) -> Tuple[str, Prompt]:
         system_prompt = (
             "You are an impartial debate judge. Score each debater on logic, factuality, "
             "and persuasion using a 0-10 scale, then declare a winner."
         )
-        prompt = self._assemble_prompt(a_claim, b_claim, context)
-        response = self.llm.generate(system_prompt, prompt, temperature=0.2)
-        result = self._parse_response(response)
-        return result
+        return system_prompt, self._assemble_prompt(a_claim, b_claim, context)
 
     def _assemble_prompt(
         self,
         a_claim: Dict[str, Any],
         b_claim: Dict[str, Any],
         context: Dict[str, Any],
-    ) -> str:
+    ) -> Prompt:
         rubric_text = ", ".join(f"{k}={v}" for k, v in self.rubric.items())
         history_summary = context.get("history_summary", "History provided in transcript.")
+        # The four debate texts share a priority so a tight budget trims them evenly;
+        # the transcript summary is the first thing to go.
+        turn = dict(priority=1, floor=48)
+        a_text = a_claim.get("argument", {}).get("text") or a_claim.get("text", "")
+        b_text = b_claim.get("argument", {}).get("text") or b_claim.get("text", "")
         return (
-            "Topic: {topic}\n"
-            "Debater A argument: {a_text}\n"
-            "Debater B argument: {b_text}\n"
-            "Debater A rebuttal: {a_rebuttal}\n"
-            "Debater B rebuttal: {b_rebuttal}\n"
-            "Transcript summary: {history}\n\n"
-            "Rubric weights: {rubric}\n\n"
-            "You MUST respond with ONLY a JSON object (no other text). "
-            "Use this exact format:\n"
-            '{{\n'
-            '  "rubric_scores": {{\n'
-            '    "logic": {{"A": 7.5, "B": 8.0, "notes": "explanation"}},\n'
-            '    "factuality": {{"A": 6.0, "B": 7.5, "notes": "explanation"}},\n'
-            '    "persuasion": {{"A": 8.0, "B": 6.5, "notes": "explanation"}}\n'
-            '  }},\n'
-            '  "winner": "A",\n'
-            '  "rationale": "brief explanation"\n'
-            '}}\n'
-        ).format(
-            topic=context.get("topic", "N/A"),
-            a_text=a_claim.get("argument", {}).get("text") or a_claim.get("text", ""),
-            b_text=b_claim.get("argument", {}).get("text") or b_claim.get("text", ""),
-            a_rebuttal=a_claim.get("rebuttal", {}).get("text", ""),
-            b_rebuttal=b_claim.get("rebuttal", {}).get("text", ""),
-            history=history_summary,
-            rubric=rubric_text,
+            PromptBuilder("judge")
+            .add(str(context.get("topic", "N/A")), "Topic: ")
+            .add(a_text, "\nDebater A argument: ", **turn)
+            .add(b_text, "\nDebater B argument: ", **turn)
+            .add(a_claim.get("rebuttal", {}).get("text", ""), "\nDebater A rebuttal: ", **turn)
+            .add(b_claim.get("rebuttal", {}).get("text", ""), "\nDebater B rebuttal: ", **turn)
+            .add(history_summary, "\nTranscript summary: ", priority=0, floor=16)
+            .add(rubric_text, "\n\nRubric weights: ")
+            .add(RESPONSE_FORMAT, "\n\n")
+            .build()
+        )
+
+    def _series_request(self, rounds: Sequence[RoundClaims], context: Dict[str, Any]) -> Tuple[str, Prompt]:
+        system_prompt = (
+            "You are an impartial debate judge. Score every round separately: rate each debater on "
+            "logic, factuality, and persuasion using a 0-10 scale, then declare the round's winner."
         )
+        rubric_text = ", ".join(f"{k}={v}" for k, v in self.rubric.items())
+        # Topic, rubric and format are sent once; the budget grows with the debate texts only.
+        builder = PromptBuilder("judge_series", budget=PROMPT_BUDGETS["judge"] * max(len(rounds), 1))
+        builder.add(str(context.get("topic", "N/A")), "Topic: ")
+        history_summary = context.get("history_summary", "No prior turns.")
+        builder.add(history_summary, "\nEarlier transcript: ", priority=0, floor=16)
+        turn = dict(priority=1, floor=48)
+        for number, (a_claim, b_claim) in enumerate(rounds, 1):
+            builder.add(f"\n\nRound {number}", "")
+            builder.add(a_claim.get("argument", {}).get("text", ""), "\nDebater A argument: ", **turn)
+            builder.add(b_claim.get("argument", {}).get("text", ""), "\nDebater B argument: ", **turn)
+            builder.add(a_claim.get("rebuttal", {}).get("text", ""), "\nDebater A rebuttal: ", **turn)
+            builder.add(b_claim.get("rebuttal", {}).get("text", ""), "\nDebater B rebuttal: ", **turn)
+        builder.add(str(len(rounds)), "\n\nRounds to score: ")
+        builder.add(rubric_text, "\nRubric weights: ")
+        builder.add(SERIES_RESPONSE_FORMAT, "\n\n")
+        return system_prompt, builder.build()
+
+    def _parse_series(self, raw: str, count: int) -> List[Judgement]:
+        """Split a series verdict into per-round judgements; missing rounds get placeholders."""
+        with stage("judge.parse"):
+            data = self._safe_json(raw)
+            entries = data.get("rounds")
+            by_round: Dict[int, Dict[str, Any]] = {}
+            for position, entry in enumerate(entries if isinstance(entries, list) else [], 1):
+                if isinstance(entry, dict):
+                    number = entry.get("round")
+                    by_round.setdefault(number if isinstance(number, int) else position, entry)
+            judgements = []
+            for number in range(1, count + 1):
+                entry = by_round.get(number)
+                if entry is None and data:
+                    JUDGE_PARSE_FALLBACKS.inc(reason="missing_scores")
+                judgements.append(self._judgement(entry or {}))
+            return judgements
+
+    def _parse_response(self, raw: str) -> Judgement:
+        with stage("judge.parse"):
+            return self._judgement(self._safe_json(raw))
 
-    def _parse_response(self, raw: str) -> Dict[str, Any]:
-        data = self._safe_json(raw)
-        rubric_scores = data.get("rubric_scores") or self._blank_rubric_scores()
+    def _judgement(self, data: Dict[str, Any]) -> Judgement:
+        rubric_scores = data.get("rubric_scores")
+        if not rubric_scores:
+            if data:
+                JUDGE_PARSE_FALLBACKS.inc(reason="missing_scores")
+            rubric_scores = self._blank_rubric_scores()
         overall = self._aggregate_scores(rubric_scores)
         winner = data.get("winner") or self._determine_winner(overall)
         rationale = data.get("rationale") or "See rubric notes."
-        return {
-            "rubric_scores": rubric_scores,
-            "scores": overall,
-            "winner": winner,
-            "rationale": rationale,
-        }
+        return Judgement(
+            rubric_scores=rubric_scores,
+            scores=overall,
+            winner=str(winner),
+            rationale=str(rationale),
+        )
 
     def _aggregate_scores(self, rubric_scores: Dict[str, Any]) -> Dict[str, float]:
         totals = {"A": 0.0, "B": 0.0}
@@ -110,6 +231,7 @@ class Judge:
 
     def _safe_json(self, raw: str) -> Dict[str, Any]:
         if not raw:
+            JUDGE_PARSE_FALLBACKS.inc(reason="empty")
             return {}
         candidate = raw.strip()
         
@@ -135,5 +257,6 @@ class Judge:
         try:
             return json.loads(candidate)
         except json.JSONDecodeError as e:
+            JUDGE_PARSE_FALLBACKS.inc(reason="invalid_json")
             logger.warning(f"Judge returned non-JSON response: {e}. Raw response: {raw[:200]}")
             return {}
@@ -0,0 +1,193 @@
+"""Token-budgeted prompt assembly for debaters and the judge.
+
+Prompts are built from sections. Fixed sections (instructions, topic, output
+format) are always kept; trimmable ones carry a priority and are cut lowest
+priority first until the estimated size fits the role's budget. Sections that
+share a priority are trimmed evenly, longest first, so neither side of the
+debate loses more than the other. Every call is recorded in
+:data:`prompt_usage` with its prompt size and LLM latency.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from src.services.env import load_env
+
+load_env()
+
+# Rough characters-per-token ratio for Gemini on English prose; cheap to apply
+# and within a few percent of the real tokenizer for this kind of text.
+CHARS_PER_TOKEN = 4
+ELLIPSIS = " […]"
+
+DEFAULT_BUDGETS: Dict[str, int] = {"argument": 700, "rebuttal": 700, "judge": 1600}
+PROMPT_BUDGETS: Dict[str, int] = {
+    role: int(os.getenv(f"PROMPT_BUDGET_{role.upper()}", str(budget)))
+    for role, budget in DEFAULT_BUDGETS.items()
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class Section:
+    body: str
+    label: str = ""
+    priority: Optional[int] = None  # None: never trimmed; lower values are trimmed first
+    floor: int = 0  # tokens of ``body`` kept however tight the budget
+    items: bool = False  # trim by dropping whole lines from the end
+    tokens: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.tokens = estimate_tokens(self.body)
+
+    def render(self) -> str:
+        return f"{self.label}{self.body}"
+
+    def trim_to(self, tokens: int) -> None:
+        tokens = max(tokens, self.floor)
+        if tokens >= self.tokens:
+            return
+        if self.items:
+            lines = self.body.splitlines()
+            while lines and estimate_tokens("\n".join(lines)) > tokens:
+                lines.pop()
+            self.body = "\n".join(lines) or "None"
+        else:
+            chars = max(tokens * CHARS_PER_TOKEN - len(ELLIPSIS), 0)
+            self.body = self.body[:chars].rstrip() + ELLIPSIS
+        self.tokens = estimate_tokens(self.body)
+
+
+@dataclass(frozen=True)
+class Prompt:
+    role: str
+    text: str
+    tokens: int
+    budget: int
+    trimmed: int  # estimated tokens removed to fit the budget
+
+
+class PromptBuilder:
+    """Collect sections, then trim them by priority to fit ``budget`` tokens."""
+
+    def __init__(self, role: str, budget: Optional[int] = None) -> None:
+        self.role = role
+        self.budget = PROMPT_BUDGETS.get(role, 1000) if budget is None else budget
+        self.sections: List[Section] = []
+
+    def add(self, body: str, label: str = "", **options) -> "PromptBuilder":
+        self.sections.append(Section(body, label, **options))
+        return self
+
+    def build(self) -> Prompt:
+        before = estimate_tokens("".join(section.render() for section in self.sections))
+        overflow = before - self.budget
+        for priority in sorted({s.priority for s in self.sections if s.priority is not None}):
+            if overflow <= 0:
+                break
+            group = [s for s in self.sections if s.priority == priority]
+            overflow -= self._trim_group(group, overflow)
+        text = "".join(section.render() for section in self.sections)
+        tokens = estimate_tokens(text)
+        if overflow > 0:
+            logger.debug("{} prompt still over budget: {} > {} tokens", self.role, tokens, self.budget)
+        return Prompt(self.role, text, tokens, self.budget, max(before - tokens, 0))
+
+    @staticmethod
+    def _trim_group(group: List[Section], overflow: int) -> int:
+        """Cut up to ``overflow`` tokens from ``group``, levelling the longest sections first."""
+        sizes = [s.tokens for s in group]
+        spare = sum(max(s.tokens - s.floor, 0) for s in group)
+        target = sum(sizes) - min(overflow, spare)
+        # Water-fill: find the cap so that sum(min(size, cap)) == target.
+        cap, remaining, ordered = 0, target, sorted(sizes)
+        for index, size in enumerate(ordered):
+            share = remaining // (len(ordered) - index)
+            if size <= share:
+                remaining -= size
+                continue
+            cap = share
+            break
+        else:
+            cap = ordered[-1] if ordered else 0
+        before = sum(sizes)
+        for section in group:
+            section.trim_to(cap)
+        return before - sum(s.tokens for s in group)
+
+
+class PromptUsage:
+    """Rolling per-role record of prompt sizes and LLM latencies."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Deque[Tuple[int, float]]] = {}
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, prompt: Prompt, latency: float) -> None:
+        with self._lock:
+            calls = self._calls.setdefault(prompt.role, deque(maxlen=self.window))
+            calls.append((prompt.tokens, latency))
+            totals = self._totals.setdefault(prompt.role, {"calls": 0, "trimmed_calls": 0, "budget": 0})
+            totals["calls"] += 1
+            totals["trimmed_calls"] += prompt.trimmed > 0
+            totals["budget"] = prompt.budget
+        logger.debug(
+            "{} prompt: {} tokens (budget {}, trimmed {}) in {:.0f} ms",
+            prompt.role,
+            prompt.tokens,
+            prompt.budget,
+            prompt.trimmed,
+            latency * 1000,
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {role: (list(calls), dict(self._totals[role])) for role, calls in self._calls.items()}
+        report: Dict[str, Dict[str, float]] = {}
+        for role, (calls, totals) in snapshot.items():
+            tokens = sorted(t for t, _ in calls)
+            latencies = sorted(l for _, l in calls)
+            report[role] = {
+                **totals,
+                "tokens_p50": _percentile(tokens, 0.50),
+                "tokens_p95": _percentile(tokens, 0.95),
+                "tokens_max": tokens[-1],
+                "latency_ms_p50": round(_percentile(latencies, 0.50) * 1000, 1),
+                "latency_ms_p95": round(_percentile(latencies, 0.95) * 1000, 1),
+            }
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._totals.clear()
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+prompt_usage = PromptUsage()
+
+
+@contextmanager
+def tracked(prompt: Prompt) -> Iterator[None]:
+    """Time the LLM call made with ``prompt`` and record it in :data:`prompt_usage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        prompt_usage.record(prompt, time.perf_counter() - start)
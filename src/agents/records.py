@@ -0,0 +1,130 @@
+"""Compact records for debate turns, citations and judgements.
+
+The pipeline passes these slotted objects around instead of dicts; agent,
+stance and turn-type strings are interned so thousands of turns share one copy.
+They still answer ``record["text"]`` / ``record.get("text")`` for code written
+against the old dict shape, and :func:`to_primitive` turns any result tree back
+into plain JSON-ready data at the API boundary.
+"""
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class _Record:
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: to_primitive(getattr(self, name)) for name in self.__slots__}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.__slots__:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__ or getattr(self, key) is None:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Citation(_Record):
+    __slots__ = ("id", "title", "url")
+
+    def __init__(self, id: str, title: str, url: str) -> None:
+        self.id = id
+        self.title = title
+        self.url = url
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Citation":
+        return cls(str(data.get("id", "")), data.get("title", ""), data.get("url", ""))
+
+
+class Turn(_Record):
+    """One argument or rebuttal; ``citations`` is ``None`` for rebuttals."""
+
+    __slots__ = ("agent", "stance", "text", "citations", "type")
+
+    def __init__(
+        self,
+        agent: str,
+        stance: str,
+        text: str,
+        type: str,
+        citations: Optional[Tuple[Citation, ...]] = None,
+    ) -> None:
+        self.agent = sys.intern(agent)
+        self.stance = sys.intern(stance)
+        self.text = text
+        self.citations = citations
+        self.type = sys.intern(type)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"agent": self.agent, "stance": self.stance, "text": self.text}
+        if self.citations is not None:
+            data["citations"] = [citation.to_dict() for citation in self.citations]
+        data["type"] = self.type
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Turn":
+        citations = data.get("citations")
+        return cls(
+            agent=str(data.get("agent", "agent")),
+            stance=str(data.get("stance", "")),
+            text=str(data.get("text", "")),
+            type=str(data.get("type", "argument")),
+            citations=None if citations is None else tuple(Citation.from_dict(c) for c in citations),
+        )
+
+    @classmethod
+    def coerce(cls, value: Any) -> "Turn":
+        return value if isinstance(value, Turn) else cls.from_dict(value)
+
+
+class Judgement(_Record):
+    __slots__ = ("rubric_scores", "scores", "winner", "rationale")
+
+    def __init__(
+        self,
+        rubric_scores: Dict[str, Any],
+        scores: Dict[str, float],
+        winner: str,
+        rationale: str,
+    ) -> None:
+        self.rubric_scores = rubric_scores
+        self.scores = scores
+        self.winner = sys.intern(winner)
+        self.rationale = rationale
+
+
+def coerce_turns(turns: Iterable[Any]) -> List[Turn]:
+    return [Turn.coerce(turn) for turn in turns]
+
+
+def to_primitive(value: Any) -> Any:
+    """Recursively convert records inside dicts/lists to JSON-ready data."""
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_primitive(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_primitive(item) for item in value]
+    return value
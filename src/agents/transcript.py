@@ -0,0 +1,242 @@
+"""Append-only debate transcript with incrementally maintained summaries.
+
+Debaters and the judge only ever see a short rolling summary of the most recent
+turns. Instead of re-slicing and re-formatting the history on every call, each
+turn is formatted once when appended and pushed into fixed-size windows, and
+:meth:`Transcript.view` freezes the current summaries in O(1) so concurrent
+turns can read the state "as of" their round.
+
+With a :class:`TranscriptDigest`, turns that scroll out of the recent window
+are folded block by block into an LLM-written digest; each block is digested
+once and memoised, so prompt size stays bounded however long a session runs.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from loguru import logger
+
+from src.agents.records import Turn
+from src.services.runtime import GeminiLLM
+
+
+@dataclass(frozen=True)
+class SummaryWindow:
+    """Shape of one rolling summary: the last ``size`` turns, ``width`` chars each."""
+
+    size: int
+    width: int
+    template: str
+    empty: str
+
+    def format(self, turn: Turn) -> str:
+        return self.template.format(agent=turn.agent, role=turn.type, text=turn.text[: self.width])
+
+
+# The two summaries the pipeline uses: debater prompts and the judge's context.
+DEBATER_WINDOW = SummaryWindow(size=4, width=120, template="{agent} ({role}): {text}...", empty="No prior turns.")
+JUDGE_WINDOW = SummaryWindow(size=6, width=80, template="{agent}:{text}...", empty="No turns yet.")
+WINDOWS: Dict[str, SummaryWindow] = {"debater": DEBATER_WINDOW, "judge": JUDGE_WINDOW}
+
+
+class RollingSummary:
+    """Joined summary of the last ``size`` turns (``window.size`` by default), updated in O(1) per append."""
+
+    __slots__ = ("window", "_snippets", "_joined")
+
+    def __init__(self, window: SummaryWindow, size: Optional[int] = None) -> None:
+        self.window = window
+        self._snippets: Deque[str] = deque(maxlen=window.size if size is None else size)
+        self._joined: Optional[str] = None
+
+    def push(self, turn: Turn) -> None:
+        self._snippets.append(self.window.format(turn))
+        self._joined = None
+
+    def seed(self, turns: Sequence[Turn]) -> None:
+        """Push ``turns``, formatting only those the summary can still hold."""
+        for turn in turns[max(len(turns) - self._snippets.maxlen, 0) :]:
+            self.push(turn)
+
+    def keep_last(self, count: int) -> None:
+        while len(self._snippets) > max(count, 0):
+            self._snippets.popleft()
+            self._joined = None
+
+    def text(self) -> str:
+        if self._joined is None:
+            self._joined = " | ".join(self._snippets) if self._snippets else self.window.empty
+        return self._joined
+
+
+@dataclass
+class TranscriptDigest:
+    """Opt-in tiered summaries: fold old turns into a cached LLM digest.
+
+    Turns older than ``keep_recent`` are digested ``block_size`` at a time;
+    each digest extends the previous one and is memoised process-wide by
+    content, so replaying a session never pays for the same block twice.
+    """
+
+    llm: GeminiLLM
+    block_size: int = 8
+    keep_recent: int = 8
+    max_chars: int = 600
+    memo_size: int = 1024
+    _memo: "OrderedDict[str, str]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    SYSTEM_PROMPT = (
+        "You maintain a running digest of a debate. Merge the new turns into the existing "
+        "digest. Keep each side's key claims, evidence and unresolved disputes. "
+        "Answer in at most 120 words of plain prose."
+    )
+
+    def due(self, digested: int, total: int) -> bool:
+        return total - digested >= self.block_size + self.keep_recent
+
+    def cached(self, previous: str, block: Sequence[Turn]) -> Optional[str]:
+        with self._lock:
+            return self._memo.get(self._key(previous, block))
+
+    def prompt(self, previous: str, block: Sequence[Turn]) -> str:
+        lines = "\n".join(f"{turn.agent} ({turn.type}): {turn.text}" for turn in block)
+        return f"Existing digest: {previous or 'None yet.'}\n\nNew turns:\n{lines}"
+
+    def remember(self, previous: str, block: Sequence[Turn], digest: str) -> str:
+        digest = " ".join(digest.split())[: self.max_chars] or previous
+        with self._lock:
+            self._memo[self._key(previous, block)] = digest
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return digest
+
+    @staticmethod
+    def _key(previous: str, block: Sequence[Turn]) -> str:
+        hasher = hashlib.sha256(previous.encode("utf-8"))
+        for turn in block:
+            hasher.update(f"\x1f{turn.agent}\x1e{turn.type}\x1e{turn.text}".encode("utf-8"))
+        return hasher.hexdigest()
+
+
+class TranscriptView:
+    """Frozen, list-like snapshot of a transcript prefix plus its summaries."""
+
+    __slots__ = ("_turns", "_length", "_summaries", "digest")
+
+    def __init__(self, turns: List[Turn], length: int, summaries: Dict[str, str], digest: str) -> None:
+        self._turns = turns
+        self._length = length
+        self._summaries = summaries
+        self.digest = digest
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Turn]:
+        return islice(self._turns, self._length)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._turns[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._turns[index]
+
+    def summary(self, kind: str) -> str:
+        recent = self._summaries[kind]
+        if self.digest:
+            return f"Earlier: {self.digest} | {recent}"
+        return recent
+
+
+class Transcript:
+    """Append-only list of turns that keeps its rolling summaries current."""
+
+    def __init__(self, turns: Iterable[Turn] = (), *, digest: Optional[TranscriptDigest] = None) -> None:
+        self.turns: List[Turn] = list(turns)
+        self.digest_policy = digest
+        self.digest = ""
+        self._digested = 0
+        self._summaries = {kind: RollingSummary(window) for kind, window in WINDOWS.items()}
+        # With a digest, prompts see every turn it does not cover yet. The
+        # rolling windows are shorter than ``keep_recent`` plus a pending
+        # block, so turns between the digest and the window would reach no
+        # prompt; these summaries hold that tail instead, capped at what
+        # compaction would leave.
+        self._tails: Dict[str, RollingSummary] = {}
+        if digest is not None:
+            tail = digest.block_size + digest.keep_recent - 1
+            self._tails = {kind: RollingSummary(window, size=tail) for kind, window in WINDOWS.items()}
+        # A long session history is formatted only as far back as a summary reaches.
+        for summary in (*self._summaries.values(), *self._tails.values()):
+            summary.seed(self.turns)
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def append(self, turn: Turn) -> None:
+        self.turns.append(turn)
+        for summary in self._summaries.values():
+            summary.push(turn)
+        for summary in self._tails.values():
+            summary.push(turn)
+
+    def extend(self, turns: Iterable[Turn]) -> None:
+        for turn in turns:
+            self.append(turn)
+
+    def view(self) -> TranscriptView:
+        sources = self._tails or self._summaries
+        summaries = {kind: summary.text() for kind, summary in sources.items()}
+        return TranscriptView(self.turns, len(self.turns), summaries, self.digest)
+
+    def compact(self) -> None:
+        """Digest every block that has scrolled out of the recent window."""
+        policy = self.digest_policy
+        while policy and policy.due(self._digested, len(self.turns)):
+            block = self._next_block()
+            digest = policy.cached(self.digest, block)
+            if digest is None:
+                text = policy.llm.generate(policy.SYSTEM_PROMPT, policy.prompt(self.digest, block), temperature=0.2)
+                digest = policy.remember(self.digest, block, text)
+            self._advance(digest)
+
+    async def acompact(self) -> None:
+        policy = self.digest_policy
+        while policy and policy.due(self._digested, len(self.turns)):
+            block = self._next_block()
+            digest = policy.cached(self.digest, block)
+            if digest is None:
+                text = await policy.llm.agenerate(
+                    policy.SYSTEM_PROMPT, policy.prompt(self.digest, block), temperature=0.2
+                )
+                digest = policy.remember(self.digest, block, text)
+            self._advance(digest)
+
+    def _next_block(self) -> List[Turn]:
+        return self.turns[self._digested : self._digested + self.digest_policy.block_size]
+
+    def _advance(self, digest: str) -> None:
+        self.digest = digest
+        self._digested += self.digest_policy.block_size
+        for summary in self._tails.values():
+            summary.keep_last(len(self.turns) - self._digested)
+        logger.debug("Transcript digest now covers {} turns", self._digested)
+
+
+def summarize(history: Sequence[Turn], kind: str) -> str:
+    """Summary of ``history`` for ``kind``; O(1) for views, recomputed for plain lists."""
+    if isinstance(history, TranscriptView):
+        return history.summary(kind)
+    window = WINDOWS[kind]
+    if not history:
+        return window.empty
+    return " | ".join(window.format(turn) for turn in history[-window.size :])
@@ -0,0 +1,235 @@
+"""Round-robin tournaments between debater configurations, rated with Elo and Bradley–Terry."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src.agents.debaters import Debater
+from src.agents.judge import Judge
+from src.services.debate import DebateManager
+from src.services.runtime import GeminiLLM
+from src.services.scheduler import FairLimiter, bind_llm_limiter, run_sync
+from src.tools.factcheck import FactChecker
+
+Pairing = Tuple[int, int]
+
+
+@dataclass
+class Participant:
+    """One debater configuration competing in a tournament."""
+
+    name: str
+    model_name: Optional[str] = None
+    temperature: float = 0.6
+    guidance: str = ""
+
+    def __post_init__(self) -> None:
+        self._llm: Optional[GeminiLLM] = None
+
+    def debater(self, stance: str, fact_checker: Optional[FactChecker] = None) -> Debater:
+        if self._llm is None:
+            self._llm = GeminiLLM(model_name=self.model_name, temperature=self.temperature)
+        return Debater(
+            name=self.name,
+            stance=stance,
+            llm=self._llm,
+            fact_checker=fact_checker,
+            guidance=self.guidance,
+        )
+
+
+@dataclass
+class MatchResult:
+    """Outcome of one scheduled match; ``a`` argued pro and ``b`` con."""
+
+    slot: int
+    a: int
+    b: int
+    topic: str
+    judgements: List[Dict[str, Any]]
+    final_scores: Dict[str, Any]
+
+    @property
+    def score(self) -> float:
+        """Result from ``a``'s point of view: 1 win, 0.5 draw, 0 loss."""
+        return {"A": 1.0, "B": 0.0}.get(self.final_scores.get("winner"), 0.5)
+
+
+def round_robin_schedule(n: int, *, double: bool = True) -> List[List[Pairing]]:
+    """Circle-method schedule; each slot pits every participant at most once.
+
+    With ``double=True`` the second half replays every pairing with sides
+    swapped so each configuration argues both pro and con.
+    """
+    if n < 2:
+        return []
+    players: List[Optional[int]] = list(range(n)) + ([None] if n % 2 else [])
+    size = len(players)
+    slots: List[List[Pairing]] = []
+    for _ in range(size - 1):
+        slot = []
+        for i in range(size // 2):
+            a, b = players[i], players[size - 1 - i]
+            if a is not None and b is not None:
+                slot.append((a, b) if len(slots) % 2 == 0 else (b, a))
+        slots.append(slot)
+        players = [players[0], players[-1]] + players[1:-1]
+    if double:
+        slots += [[(b, a) for a, b in slot] for slot in slots]
+    return slots
+
+
+def elo_ratings(
+    a: np.ndarray,
+    b: np.ndarray,
+    score: np.ndarray,
+    slots: np.ndarray,
+    n: int,
+    *,
+    k: float = 24.0,
+    base: float = 1500.0,
+) -> np.ndarray:
+    """Elo over matches grouped by slot; each slot is one vectorized update.
+
+    Within a slot nobody plays twice, so the batched update equals applying
+    the matches one by one.
+    """
+    ratings = np.full(n, base, dtype=np.float64)
+    if not len(a):
+        return ratings
+    order = np.argsort(slots, kind="stable")
+    a, b, score, slots = a[order], b[order], score[order], slots[order]
+    bounds = np.flatnonzero(np.diff(slots)) + 1
+    for idx in np.split(np.arange(len(a)), bounds):
+        ra, rb = ratings[a[idx]], ratings[b[idx]]
+        expected = 1.0 / (1.0 + np.power(10.0, (rb - ra) / 400.0))
+        delta = k * (score[idx] - expected)
+        np.add.at(ratings, a[idx], delta)
+        np.add.at(ratings, b[idx], -delta)
+    return ratings
+
+
+def bradley_terry_ratings(
+    a: np.ndarray,
+    b: np.ndarray,
+    score: np.ndarray,
+    n: int,
+    *,
+    prior: float = 0.5,
+    iterations: int = 500,
+    tol: float = 1e-9,
+    base: float = 1500.0,
+) -> np.ndarray:
+    """Bradley–Terry strengths via Hunter's MM algorithm, on the Elo scale.
+
+    Draws count as half a win for each side; ``prior`` adds that many virtual
+    draws to every pair that met, which keeps undefeated or winless
+    participants finite.
+    """
+    wins = np.zeros((n, n), dtype=np.float64)
+    np.add.at(wins, (a, b), score)
+    np.add.at(wins, (b, a), 1.0 - score)
+    games = wins + wins.T
+    met = games > 0
+    wins += prior * 0.5 * met
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1)
+    strength = np.ones(n, dtype=np.float64)
+    for _ in range(iterations):
+        pair_sum = strength[:, None] + strength[None, :]
+        denom = np.divide(games, pair_sum, out=np.zeros_like(games), where=met).sum(axis=1)
+        updated = np.divide(total_wins, denom, out=np.ones(n), where=denom > 0)
+        updated /= np.exp(np.mean(np.log(updated)))
+        if np.max(np.abs(updated - strength)) < tol:
+            strength = updated
+            break
+        strength = updated
+    return base + 400.0 * np.log10(strength)
+
+
+@dataclass
+class Tournament:
+    """Round-robin tournament that plays every pairing through ``DebateManager``."""
+
+    participants: List[Participant]
+    judge: Judge
+    fact_checker: Optional[FactChecker] = None
+    rounds: int = 1
+    double: bool = True
+    max_concurrent_matches: int = 4
+    max_in_flight: int = 8
+    judging: str = "per_round"  # "deferred" scores each match with one judge call
+    results: List[MatchResult] = field(default_factory=list)
+
+    def schedule(self) -> List[List[Pairing]]:
+        return round_robin_schedule(len(self.participants), double=self.double)
+
+    def run(self, topics: Sequence[str]) -> List[MatchResult]:
+        return run_sync(self.arun(topics))
+
+    async def arun(self, topics: Sequence[str]) -> List[MatchResult]:
+        """Play the full schedule, cycling through ``topics``; results are appended."""
+        if not topics:
+            raise ValueError("At least one topic is required.")
+        limiter = FairLimiter(self.max_in_flight)
+        matches = asyncio.Semaphore(max(self.max_concurrent_matches, 1))
+        # Slots continue after earlier runs so Elo never sees two of a player's matches in one slot.
+        first_slot = max((result.slot for result in self.results), default=-1) + 1
+        pairings = [(first_slot + slot, a, b) for slot, pairs in enumerate(self.schedule()) for a, b in pairs]
+
+        async def play(number: int, slot: int, a: int, b: int) -> MatchResult:
+            async with matches:
+                bind_llm_limiter(limiter, number)
+                topic = topics[number % len(topics)]
+                manager = DebateManager(
+                    debater_a=self.participants[a].debater("pro", self.fact_checker),
+                    debater_b=self.participants[b].debater("con", self.fact_checker),
+                    judge=self.judge,
+                    judging=self.judging,
+                )
+                outcome = await manager.arun(topic, rounds=self.rounds)
+                return MatchResult(
+                    slot=slot,
+                    a=a,
+                    b=b,
+                    topic=topic,
+                    judgements=[entry["judgement"] for entry in outcome["rounds"]],
+                    final_scores=outcome["final_scores"],
+                )
+
+        played = await asyncio.gather(*(play(i, *pairing) for i, pairing in enumerate(pairings)))
+        self.results.extend(played)
+        logger.info("Tournament played {} matches; limiter {}", len(played), limiter.stats())
+        return list(played)
+
+    def results_matrix(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(a, b, score, slot)`` arrays over every stored match."""
+        a = np.fromiter((r.a for r in self.results), dtype=np.int64, count=len(self.results))
+        b = np.fromiter((r.b for r in self.results), dtype=np.int64, count=len(self.results))
+        score = np.fromiter((r.score for r in self.results), dtype=np.float64, count=len(self.results))
+        slots = np.fromiter((r.slot for r in self.results), dtype=np.int64, count=len(self.results))
+        return a, b, score, slots
+
+    def standings(self) -> List[Dict[str, Any]]:
+        """Participants sorted by Bradley–Terry rating, with Elo and record."""
+        n = len(self.participants)
+        a, b, score, slots = self.results_matrix()
+        elo = elo_ratings(a, b, score, slots, n)
+        bt = bradley_terry_ratings(a, b, score, n)
+        wins = np.bincount(a, weights=score, minlength=n) + np.bincount(b, weights=1.0 - score, minlength=n)
+        played = np.bincount(a, minlength=n) + np.bincount(b, minlength=n)
+        table = [
+            {
+                "name": participant.name,
+                "bradley_terry": round(float(bt[i]), 1),
+                "elo": round(float(elo[i]), 1),
+                "points": float(wins[i]),
+                "played": int(played[i]),
+            }
+            for i, participant in enumerate(self.participants)
+        ]
+        return sorted(table, key=lambda row: row["bradley_terry"], reverse=True)
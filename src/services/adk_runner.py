@@ -1,15 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from loguru import logger
 
+from src.services.metrics import stage
 from src.tools.factcheck import FactChecker
 
 
+SessionKey = Tuple[str, str]
+
+
+@dataclass
+class _SessionSlot:
+    last_used: float
+    ready: bool = False  # created in the runner's session service
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
 class ADKDebateRuntime:
-    """Multi-agent debate pipeline powered by Google ADK."""
+    """Multi-agent debate pipeline powered by Google ADK.
+
+    One runner is built at startup and shared by every request. Its in-memory
+    session service holds the conversation state, so reusing a ``session_id``
+    continues the same debate; the ``max_sessions`` most recently used
+    sessions are kept and any idle for longer than ``session_ttl`` seconds
+    are dropped.
+    """
 
     def __init__(
         self,
@@ -17,15 +40,26 @@ class ADKDebateRuntime:
         *,
         app_name: str = "agora-adk",
         model_name: Optional[str] = None,
+        max_sessions: Optional[int] = None,
+        session_ttl: Optional[float] = None,
+        fact_timeout: Optional[float] = None,
     ) -> None:
         self.fact_checker = fact_checker
         self.app_name = app_name
         self.model_name = model_name or os.getenv("ADK_MODEL") or os.getenv(
             "GEMINI_MODEL", "gemini-1.5-flash"
         )
+        self.max_sessions = max_sessions or int(os.getenv("ADK_MAX_SESSIONS", "256"))
+        self.session_ttl = session_ttl or float(os.getenv("ADK_SESSION_TTL", "1800"))
+        self.fact_timeout = fact_timeout or float(os.getenv("ADK_FACTCHECK_TIMEOUT", "4"))
+        self._fact_tasks: Set[asyncio.Task] = set()
+        self._sessions: "OrderedDict[SessionKey, _SessionSlot]" = OrderedDict()
+        self._created = 0
+        self._evicted = 0
         self._imports = self._load_dependencies()
         self.enabled = self._imports is not None
         self._app = self._build_app() if self.enabled else None
+        self._runner = self._imports["InMemoryRunner"](app=self._app) if self.enabled else None
 
     def _load_dependencies(self):
         try:
@@ -51,6 +85,20 @@ class ADKDebateRuntime:
     def available(self) -> bool:
         return self.enabled
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "capacity": self.max_sessions,
+            "ttl_seconds": self.session_ttl,
+            "created": self._created,
+            "evicted": self._evicted,
+        }
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            await self._runner.close()
+            self._runner = None
+
     def _build_app(self):
         LlmAgent = self._imports["LlmAgent"]
         SequentialAgent = self._imports["SequentialAgent"]
@@ -91,10 +139,23 @@ class ADKDebateRuntime:
 
     def _create_fact_tool(self):
         fact_checker = self.fact_checker
+        timeout = self.fact_timeout
+        pending = self._fact_tasks
 
-        def fact_check(query: str) -> Dict[str, Any]:
+        async def fact_check(query: str) -> Dict[str, Any]:
             """Search for recent facts to cite in the debate."""
-            results = fact_checker.search(query) if fact_checker else []
+            if not fact_checker:
+                return {"status": "empty", "query": query, "results": []}
+            # A search that outlives the timeout keeps running in the background
+            # and lands in the checker's cache, so a retry is answered from there.
+            search = asyncio.ensure_future(fact_checker.asearch(query))
+            pending.add(search)
+            search.add_done_callback(pending.discard)
+            try:
+                results = await asyncio.wait_for(asyncio.shield(search), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("fact_check timed out after {}s for '{}'", timeout, query)
+                return {"status": "timeout", "query": query, "results": []}
             payload = []
             for idx, hit in enumerate(results[:3]):
                 payload.append(
@@ -168,24 +229,108 @@ class ADKDebateRuntime:
         session_id: Optional[str] = None,
         user_id: str = "adk-demo",
     ) -> Dict[str, Any]:
-        """Executes the ADK debate app for a natural-language prompt."""
-        if not self.enabled or not self._app:
+        """Executes the ADK debate app for a natural-language prompt.
+
+        Without a ``session_id`` a fresh session is started; the returned id
+        continues it on later calls.
+        """
+        result: Dict[str, Any] = {}
+        events: List[Dict[str, Any]] = []
+        async for frame in self.astream(prompt, session_id=session_id, user_id=user_id):
+            if frame["event"] == "start":
+                result = dict(frame["data"])
+            elif frame["event"] == "event":
+                events.append(frame["data"])
+        result["events"] = events
+        return result
+
+    async def astream(
+        self,
+        prompt: str,
+        *,
+        session_id: Optional[str] = None,
+        user_id: str = "adk-demo",
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{"event", "data"}`` frames as the pipeline emits them.
+
+        A ``start`` frame carries the session id, each ADK event (debater
+        text, tool calls and responses, judge output) follows as an ``event``
+        frame the moment the runner yields it, and ``done`` closes the stream.
+        ``start`` is only sent once the session exists and the runner has
+        produced its first event, so a runner that fails to start raises from
+        the first ``__anext__`` (before a response is committed) instead of
+        partway through the stream.
+        """
+        if not self.enabled or not self._runner:
             raise RuntimeError("ADK runtime not available")
 
-        InMemoryRunner = self._imports["InMemoryRunner"]
-        async with InMemoryRunner(app=self._app) as runner:
-            events = await runner.run_debug(
-                prompt,
-                user_id=user_id,
-                session_id=session_id or "adk-session",
-                quiet=True,
-                verbose=False,
+        session_id = session_id or uuid.uuid4().hex
+        slot = await self._session(user_id, session_id)
+        types_mod = self._imports["types"]
+        message = types_mod.Content(role="user", parts=[types_mod.Part(text=prompt)])
+        start = {"event": "start", "data": {"app": self.app_name, "prompt": prompt, "session_id": session_id}}
+        count = 0
+        async with slot.lock:
+            try:
+                if not slot.ready:
+                    await self._runner.session_service.create_session(
+                        app_name=self.app_name, user_id=user_id, session_id=session_id
+                    )
+                    slot.ready = True
+                # Detached: the span stays open across yields to the SSE consumer.
+                with stage("adk.run", detached=True, session_id=session_id):
+                    events = self._runner.run_async(
+                        user_id=user_id, session_id=session_id, new_message=message
+                    )
+                    try:
+                        first = await events.__anext__()
+                    except StopAsyncIteration:
+                        first = None
+                    yield start
+                    if first is not None:
+                        count += 1
+                        yield {"event": "event", "data": self._serialize_event(first)}
+                        async for event in events:
+                            count += 1
+                            yield {"event": "event", "data": self._serialize_event(event)}
+            finally:
+                slot.last_used = time.monotonic()
+        yield {"event": "done", "data": {"session_id": session_id, "events": count}}
+
+    async def _session(self, user_id: str, session_id: str) -> _SessionSlot:
+        """Return the slot for a session, registering it and evicting stale ones as needed."""
+        key = (user_id, session_id)
+        now = time.monotonic()
+        await self._evict(now)
+        slot = self._sessions.get(key)
+        if slot is None:
+            slot = self._sessions[key] = _SessionSlot(last_used=now)
+            self._created += 1
+        slot.last_used = now
+        self._sessions.move_to_end(key)
+        return slot
+
+    async def _evict(self, now: float) -> None:
+        stale = [
+            key
+            for key, slot in self._sessions.items()
+            if now - slot.last_used > self.session_ttl and not slot.lock.locked()
+        ]
+        overflow = len(self._sessions) - len(stale) - self.max_sessions + 1
+        for key, slot in self._sessions.items():
+            if overflow <= 0:
+                break
+            if key not in stale and not slot.lock.locked():
+                stale.append(key)
+                overflow -= 1
+        for user_id, session_id in stale:
+            slot = self._sessions.pop((user_id, session_id))
+            self._evicted += 1
+            if not slot.ready:
+                continue
+            await self._runner.session_service.delete_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
             )
-        return {
-            "app": self.app_name,
-            "prompt": prompt,
-            "events": [self._serialize_event(event) for event in events],
-        }
 
     def _serialize_event(self, event) -> Dict[str, Any]:
         """Convert ADK Event objects into API-safe dictionaries."""
@@ -1,22 +1,146 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import threading
+from contextlib import asynccontextmanager
+from functools import partial, wraps
 
-from typing import Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple, TypeVar
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from loguru import logger
 from pydantic import BaseModel, Field
 
-from src.agents.debaters import DebaterA, DebaterB
-from src.agents.judge import Judge
-from src.services.debate import DebateManager
-from src.services.runtime import GeminiLLM
-from src.tools.factcheck import FactChecker
+from src.agents.prompts import prompt_usage
+from src.agents.records import to_primitive
+from src.services.metrics import registry
+from src.services.sessions import SessionNotFound, SessionStore, new_turns
 
-app = FastAPI(title="AGORA — AI Debate Club")
+if TYPE_CHECKING:  # built lazily by Services; imported there to keep startup light
+    from src.services.debate import DebateManager
+    from src.services.runtime import GeminiLLM
+    from src.tools.factcheck import FactChecker
+
+
+T = TypeVar("T")
+
+
+def _component(build: Callable[["Services"], T]) -> T:
+    """Property that builds its value on first access, once, under that component's lock."""
+    name = build.__name__
+
+    @wraps(build)
+    def get(self: "Services") -> T:
+        if name not in self.built:
+            with self._lock_for(name):
+                if name not in self.built:
+                    self.built[name] = build(self)
+        return self.built[name]
+
+    return property(get)  # type: ignore[return-value]
+
+
+class Services:
+    """Application objects, each constructed on first use.
+
+    Importing the app builds nothing, so workers start accepting requests
+    (and ``/healthz`` answers) without paying for clients, agents or the ADK
+    stack they may never touch.
+    """
+
+    def __init__(self) -> None:
+        self.built: Dict[str, Any] = {}
+        # One lock per component: a slow build (the ADK stack during warmup)
+        # must not hold up readers of components that are already built.
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, name: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.RLock())
+
+    @_component
+    def llm(self) -> "GeminiLLM":
+        from src.services.runtime import GeminiLLM
+
+        return GeminiLLM()
+
+    @_component
+    def fact_checker(self) -> "FactChecker":
+        from src.tools.factcheck import FactChecker
+
+        return FactChecker()
+
+    @_component
+    def manager(self) -> "DebateManager":
+        from src.agents.debaters import DebaterA, DebaterB
+        from src.agents.judge import Judge
+        from src.services.debate import DebateManager
+
+        llm, fact_checker = self.llm, self.fact_checker
+        return DebateManager(
+            debater_a=DebaterA(name="Debater Alice", stance="pro", llm=llm, fact_checker=fact_checker),
+            debater_b=DebaterB(name="Debater Blake", stance="con", llm=llm, fact_checker=fact_checker),
+            judge=Judge(llm=llm),
+        )
+
+    @_component
+    def sessions(self) -> SessionStore:
+        return SessionStore.from_env()
+
+    @_component
+    def adk_runtime(self):
+        if os.getenv("ENABLE_ADK_RUNTIME", "0") != "1":
+            return None
+        try:
+            from src.services.adk_runner import ADKDebateRuntime
+
+            runtime = ADKDebateRuntime(fact_checker=self.fact_checker)
+        except Exception as exc:  # pragma: no cover
+            logger.warning("Failed to initialize ADK runtime: {}", exc)
+            return None
+        if not runtime.available():
+            logger.warning("ENABLE_ADK_RUNTIME=1 but ADK runtime is unavailable.")
+            return None
+        return runtime
+
+    async def aclose(self) -> None:
+        built = self.built
+        if built.get("adk_runtime") is not None:
+            await built["adk_runtime"].aclose()
+        if "fact_checker" in built:
+            await built["fact_checker"].aclose()
+        if "sessions" in built:
+            built["sessions"].close()
+        if "llm" in built and built["llm"].cache is not None:
+            built["llm"].cache.close()
+        if "llm" in built and built["llm"].hedging is not None:
+            built["llm"].hedging.close()
+        built.clear()
+
+
+services = Services()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if os.getenv("ENABLE_ADK_RUNTIME", "0") == "1":
+        # Import the ADK stack off the event loop so startup is not held up by it.
+        warmup = asyncio.ensure_future(asyncio.to_thread(lambda: services.adk_runtime))
+    else:
+        warmup = None
+    yield
+    if warmup is not None:
+        await warmup
+    await services.aclose()
+
+
+app = FastAPI(title="AGORA — AI Debate Club", lifespan=lifespan)
 
 # Enable CORS for browser access
 app.add_middleware(
@@ -27,64 +151,235 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-llm_client = GeminiLLM()
-fact_checker = FactChecker()
-debater_a = DebaterA(name="Debater Alice", stance="pro", llm=llm_client, fact_checker=fact_checker)
-debater_b = DebaterB(name="Debater Blake", stance="con", llm=llm_client, fact_checker=fact_checker)
-judge = Judge(llm=llm_client)
-manager = DebateManager(debater_a=debater_a, debater_b=debater_b, judge=judge)
-
-ENABLE_ADK = os.getenv("ENABLE_ADK_RUNTIME", "0") == "1"
-adk_runtime = None
-if ENABLE_ADK:
-    try:
-        from src.services.adk_runner import ADKDebateRuntime
-
-        adk_runtime = ADKDebateRuntime(fact_checker=fact_checker)
-        if not adk_runtime.available():
-            logger.warning("ENABLE_ADK_RUNTIME=1 but ADK runtime is unavailable.")
-    except Exception as exc:  # pragma: no cover
-        logger.warning("Failed to initialize ADK runtime: {}", exc)
-        adk_runtime = None
-
-
 class DebateRequest(BaseModel):
     topic: str = Field(..., min_length=4, max_length=280)
     rounds: int = Field(1, ge=1, le=3)
     context: dict = Field(default_factory=dict, description="Optional session context/memory.")
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Server-side session from POST /sessions; history is loaded from the store "
+        "and only the new turns are returned.",
+    )
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        ge=500,
+        le=600_000,
+        description="Latency budget; the debate is shortened as needed to meet it and reports "
+        "`degraded` plus time spent per stage.",
+    )
+
+
+class DebateBatchRequest(BaseModel):
+    requests: List[DebateRequest] = Field(..., min_length=1, max_length=500)
+    max_in_flight: int = Field(
+        default_factory=lambda: int(os.getenv("DEBATE_BATCH_MAX_IN_FLIGHT", "8")),
+        ge=1,
+        le=64,
+        description="Upper bound on concurrent LLM calls across the whole batch.",
+    )
+    judging: Literal["per_round", "deferred"] = Field(
+        default="per_round",
+        description="`deferred` scores each debate with one judge call after its last round "
+        "instead of one call per round.",
+    )
 
 
 class ADKRunRequest(BaseModel):
     prompt: str = Field(..., min_length=4, max_length=500)
-    session_id: Optional[str] = Field(default=None, description="Reuse to maintain ADK session state.")
+    session_id: Optional[str] = Field(
+        default=None, description="Reuse to continue an ADK session; omitted starts a new one."
+    )
 
 
 @app.get("/healthz")
 def health():
+    # Only report on components that exist; a health probe should not build them.
+    built = services.built
+    llm_client = built.get("llm")
+    adk_runtime = built.get("adk_runtime")
     return {
         "status": "ok",
-        "mock_llm": llm_client.mock_mode,
-        "adk_runtime": bool(adk_runtime and adk_runtime.available()),
+        "mock_llm": llm_client.mock_mode if llm_client else None,
+        "model_pool": llm_client.pool_stats() if llm_client else None,
+        "llm_cache": llm_client.cache.stats() if llm_client and llm_client.cache else None,
+        "llm_simulator": llm_client.simulator.stats() if llm_client and llm_client.simulator else None,
+        "llm_limiter": llm_client.limiter.stats() if llm_client else None,
+        "llm_hedging": llm_client.hedging.stats() if llm_client and llm_client.hedging else None,
+        "adk_runtime": adk_runtime is not None,
+        "adk_sessions": adk_runtime.stats() if adk_runtime is not None else None,
+        "fact_checker": built["fact_checker"].stats() if "fact_checker" in built else None,
+        "sessions": built["sessions"].stats() if "sessions" in built else None,
+        "prompts": prompt_usage.stats(),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms, outcome counters, in-flight gauges."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/demo")
-def demo():
+async def demo():
     logger.info("Running demo debate round")
-    return manager.run(topic="Should cities ban private cars?", rounds=1)
+    manager = await _component_off_loop("manager")
+    return to_primitive(await manager.arun(topic="Should cities ban private cars?", rounds=1))
+
+
+@app.post("/sessions")
+def create_session():
+    return {"session_id": services.sessions.create()}
+
+
+@app.get("/sessions/{session_id}")
+def get_session(session_id: str):
+    try:
+        history = services.sessions.history(session_id)
+    except SessionNotFound as exc:
+        raise HTTPException(status_code=404, detail="Unknown session.") from exc
+    return {"session_id": session_id, "transcript": to_primitive(history)}
 
 
 @app.post("/debate")
-def run_debate(payload: DebateRequest):
+async def run_debate(payload: DebateRequest):
+    context, offset = await _session_context(payload)
+    manager = await _component_off_loop("manager")
+    try:
+        result = await manager.arun(
+            topic=payload.topic, rounds=payload.rounds, context=context, deadline=_deadline(payload)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return to_primitive(_record_session(payload, result, offset))
+
+
+@app.post("/debate/stream")
+async def stream_debate(payload: DebateRequest):
+    """Server-Sent Events variant of /debate that emits each turn as it completes."""
+    context, offset = await _session_context(payload)
+    manager = await _component_off_loop("manager")
+    frames = manager.astream(
+        topic=payload.topic, rounds=payload.rounds, context=context, deadline=_deadline(payload)
+    )
     try:
-        result = manager.run(topic=payload.topic, rounds=payload.rounds, context=payload.context)
+        first = await frames.__anext__()
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return result
+    finalize = partial(_record_session, payload, offset=offset)
+    return StreamingResponse(_sse(first, frames, finalize), media_type="text/event-stream")
+
+
+def _deadline(payload: DebateRequest) -> Optional[float]:
+    return payload.deadline_ms / 1000 if payload.deadline_ms else None
+
+
+async def _session_context(payload: DebateRequest) -> Tuple[Dict[str, Any], int]:
+    """Swap in the stored history when the request names a session."""
+    if not payload.session_id:
+        return payload.context, 0
+    sessions = await _component_off_loop("sessions")
+    try:
+        history = sessions.history(payload.session_id)
+    except SessionNotFound as exc:
+        raise HTTPException(status_code=404, detail="Unknown session.") from exc
+    return {**payload.context, "history": history}, len(history)
+
+
+def _record_session(payload: DebateRequest, result: Dict[str, Any], offset: int) -> Dict[str, Any]:
+    if not payload.session_id:
+        return result
+    trimmed = new_turns(result, offset)
+    services.sessions.append(payload.session_id, trimmed["transcript"])
+    trimmed["session_id"] = payload.session_id
+    return trimmed
+
+
+async def _sse(
+    first: Dict[str, Any],
+    frames: AsyncIterator[Dict[str, Any]],
+    finalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> AsyncIterator[str]:
+    yield _sse_frame(first)
+    try:
+        async for frame in frames:
+            if finalize is not None and frame["event"] == "final_scores":
+                frame = {"event": frame["event"], "data": finalize(frame["data"])}
+            yield _sse_frame(frame)
+    except Exception as exc:
+        # The 200 is already out; end the stream with a frame the client can act on.
+        logger.warning("Stream failed after its first frame: {}", exc)
+        yield _sse_frame({"event": "error", "data": {"detail": str(exc) or type(exc).__name__}})
+
+
+def _sse_frame(frame: Dict[str, Any]) -> str:
+    return f"event: {frame['event']}\ndata: {json.dumps(to_primitive(frame['data']))}\n\n"
+
+
+@app.post("/debate/batch")
+async def run_debate_batch(payload: DebateBatchRequest):
+    """Run many debates under one LLM concurrency budget; NDJSON in completion order.
+
+    Items naming a session continue it like ``/debate`` does: the stored
+    history is loaded up front and only the new turns are returned and saved.
+    """
+    session_ids = [request.session_id for request in payload.requests if request.session_id]
+    if len(session_ids) != len(set(session_ids)):
+        raise HTTPException(status_code=400, detail="A session can appear only once per batch.")
+    contexts = [await _session_context(request) for request in payload.requests]  # 404 before streaming
+    requests = [
+        request.model_copy(update={"context": context})
+        for request, (context, _) in zip(payload.requests, contexts)
+    ]
+
+    manager = await _component_off_loop("manager")
+
+    async def lines() -> AsyncIterator[str]:
+        async for entry in manager.abatch(
+            requests, max_in_flight=payload.max_in_flight, judging=payload.judging
+        ):
+            if "result" in entry:
+                index = entry["index"]
+                result = _record_session(payload.requests[index], entry["result"], contexts[index][1])
+                entry = {**entry, "result": result}
+            yield json.dumps(to_primitive(entry)) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def _component_off_loop(name: str) -> Any:
+    """A :class:`Services` component, built (or waited for) off the event loop.
+
+    First builds import heavy SDKs (the ADK stack, ``google.generativeai``)
+    and a build in progress holds that component's lock; neither may stall
+    the loop. Once built, the component is returned directly.
+    """
+    if name in services.built:
+        return services.built[name]
+    return await asyncio.to_thread(getattr, services, name)
 
 
 @app.post("/adk/run")
 async def run_adk(payload: ADKRunRequest):
-    if not adk_runtime or not adk_runtime.available():
+    adk_runtime = await _component_off_loop("adk_runtime")
+    if adk_runtime is None:
         raise HTTPException(status_code=503, detail="ADK runtime disabled or not configured.")
     return await adk_runtime.run(prompt=payload.prompt, session_id=payload.session_id)
+
+
+@app.post("/adk/stream")
+async def stream_adk(payload: ADKRunRequest):
+    """Server-Sent Events variant of /adk/run that flushes each ADK event as it is emitted."""
+    adk_runtime = await _component_off_loop("adk_runtime")
+    if adk_runtime is None:
+        raise HTTPException(status_code=503, detail="ADK runtime disabled or not configured.")
+    frames = adk_runtime.astream(prompt=payload.prompt, session_id=payload.session_id)
+    try:
+        first = await frames.__anext__()
+    except StopAsyncIteration as exc:
+        raise HTTPException(status_code=502, detail="ADK runtime produced no events.") from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except Exception as exc:
+        logger.warning("ADK stream failed before its first event: {}", exc)
+        raise HTTPException(status_code=502, detail="ADK runtime failed.") from exc
+    return StreamingResponse(_sse(first, frames), media_type="text/event-stream")
@@ -0,0 +1,179 @@
+"""Latency budgets for a single debate.
+
+A :class:`DebateDeadline` is bound to the debate's task (and inherited by
+every turn it starts, like the batch LLM limiter), so the layers that spend
+time can consult it without extra parameters:
+
+* debaters time-box citation lookups, or skip them when the round is
+  already at risk;
+* GeminiLLM caps debater output length under pressure and never lets a
+  debater call (retries included) outlive the deadline; only the judge gets
+  a short grace period past it;
+* DebateManager only starts another round when the time left covers what
+  the last round took plus a judge call.
+
+Each of these records why the debate was degraded, and the time spent per
+stage is collected from :func:`src.services.metrics.stage` for the response.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.services.env import load_env
+from src.services.metrics import STAGE_SECONDS, bind_stage_sink, reset_stage_sink
+
+load_env()
+
+# Output cap for debater turns once the deadline is at risk; judges are never
+# capped because a truncated verdict cannot be parsed.
+DEADLINE_OUTPUT_TOKENS = int(os.getenv("DEADLINE_OUTPUT_TOKENS", "256"))
+# Share of the remaining time a single citation lookup may take.
+CITATION_SHARE = 0.2
+MIN_CITATION_TIMEOUT = 0.25
+# Floor for a judge call's budget: a late verdict that still answers beats
+# placeholder scores. Debater calls get no floor; past the deadline they are
+# skipped.
+MIN_JUDGE_BUDGET = 1.0
+
+
+class DebateDeadline:
+    """Time budget of one debate and the degradations made to meet it."""
+
+    def __init__(self, seconds: float) -> None:
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.reasons: List[str] = []
+        self._stages: Dict[str, List[float]] = {}  # stage -> [total seconds, count]
+        self._rounds: Dict[int, bool] = {}
+        self._round_finished: Dict[int, float] = {0: self.started}
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return self.budget - (time.monotonic() - self.started)
+
+    def degrade(self, reason: str) -> None:
+        with self._lock:
+            if reason in self.reasons:
+                return
+            self.reasons.append(reason)
+        logger.info("Debate degraded to meet its {:.1f}s deadline: {}", self.budget, reason)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def admit_round(self, round_idx: int) -> bool:
+        """Whether ``round_idx`` may start; decided once, and never again after a drop.
+
+        Round 1 always starts, since a debate needs one, but its debater calls
+        are still cut off at the deadline (see :meth:`call_budget`).
+        """
+        with self._lock:
+            if round_idx in self._rounds:
+                return self._rounds[round_idx]
+            previous = self._rounds.get(round_idx - 1, True)
+        admitted = round_idx == 1 or (previous and self.remaining() >= self._round_cost())
+        with self._lock:
+            admitted = self._rounds.setdefault(round_idx, admitted)
+        if not admitted:
+            self.degrade("rounds_dropped")
+        return admitted
+
+    def round_finished(self, round_idx: int) -> None:
+        with self._lock:
+            self._round_finished[round_idx] = time.monotonic()
+
+    def rounds_completed(self) -> int:
+        with self._lock:
+            return sum(1 for admitted in self._rounds.values() if admitted)
+
+    def at_risk(self) -> bool:
+        """True when the time left no longer covers a round and its verdict."""
+        return self.remaining() < self._round_cost()
+
+    def citation_timeout(self, default: float) -> float:
+        """Seconds a citation lookup may take; 0 means skip it."""
+        if self.at_risk():
+            self.degrade("citations_skipped")
+            return 0.0
+        timeout = min(default, self.remaining() * CITATION_SHARE)
+        if timeout < MIN_CITATION_TIMEOUT:
+            self.degrade("citations_skipped")
+            return 0.0
+        return timeout
+
+    def call_budget(self, role: Optional[str] = None) -> float:
+        """Seconds one LLM call (retries included) may take; 0 or less means none is left."""
+        if role == "judge":
+            return max(self.remaining(), MIN_JUDGE_BUDGET)
+        return self.remaining()
+
+    def output_cap(self, role: Optional[str]) -> Optional[int]:
+        if role not in ("argument", "rebuttal") or not self.at_risk():
+            return None
+        self.degrade("output_capped")
+        return DEADLINE_OUTPUT_TOKENS
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        if elapsed > self.budget:
+            self.degrade("deadline_exceeded")
+        with self._lock:
+            stages = {stage: round(total * 1000, 1) for stage, (total, _) in sorted(self._stages.items())}
+            reasons = list(self.reasons)
+        return {
+            "budget_ms": round(self.budget * 1000, 1),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "reasons": reasons,
+            "rounds_completed": self.rounds_completed(),
+            "stages_ms": stages,
+        }
+
+    def _round_cost(self) -> float:
+        """Expected time for a round's critical path plus the judge that scores it."""
+        with self._lock:
+            finished = sorted(self._round_finished.items())
+            judge = self._stages.get("judge.score")
+        spans = [later[1] - earlier[1] for earlier, later in zip(finished, finished[1:])]
+        if spans:
+            round_cost = max(spans)
+        else:  # nothing measured yet in this debate: fall back to process-wide means
+            round_cost = STAGE_SECONDS.mean(stage="debater.argument") + STAGE_SECONDS.mean(
+                stage="debater.rebuttal"
+            )
+        judge_cost = judge[0] / judge[1] if judge else STAGE_SECONDS.mean(stage="judge.score")
+        return round_cost + judge_cost
+
+
+_current: ContextVar[Optional[DebateDeadline]] = ContextVar("debate_deadline", default=None)
+
+
+def bind_deadline(deadline: Optional[DebateDeadline]) -> Tuple[Token, Token]:
+    """Make ``deadline`` visible to the current task and the turns it starts.
+
+    Returns the tokens :func:`unbind_deadline` needs to restore the previous binding.
+    """
+    return _current.set(deadline), bind_stage_sink(deadline)
+
+
+def unbind_deadline(tokens: Tuple[Token, Token]) -> None:
+    deadline_token, sink_token = tokens
+    try:
+        _current.reset(deadline_token)
+        reset_stage_sink(sink_token)
+    except ValueError:
+        # Closed from another context (a stream finalized by the garbage
+        # collector); the binding never leaked into that one.
+        pass
+
+
+def current_deadline() -> Optional[DebateDeadline]:
+    return _current.get()
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
 
 from loguru import logger
 
 from src.agents.debaters import Debater
 from src.agents.judge import Judge
+from src.agents.records import Turn, coerce_turns
+from src.agents.transcript import Transcript, TranscriptDigest, TranscriptView, summarize
+from src.services.deadline import DebateDeadline, bind_deadline, current_deadline, unbind_deadline
+from src.services.metrics import child_context, stage
+from src.services.scheduler import FairLimiter, TurnFunc, TurnGraph, bind_llm_limiter, run_sync
 
 
 @dataclass
@@ -16,6 +23,15 @@ class DebateManager:
     debater_a: Debater
     debater_b: Debater
     judge: Judge
+    # Opt-in: fold turns that scroll out of the summaries into a cached LLM digest.
+    digest: Optional[TranscriptDigest] = None
+    # "per_round" scores each round as it finishes; "deferred" scores the whole
+    # debate in one judge call once every round is in (batch evaluation).
+    judging: str = "per_round"
+
+    # Transcript order of a round's turns; the scheduler may finish them in any order.
+    TURN_ORDER = ("a_argument", "b_argument", "a_rebuttal", "b_rebuttal")
+    JUDGING_MODES = ("per_round", "deferred")
 
     def run(
         self,
@@ -23,66 +39,409 @@ class DebateManager:
         *,
         rounds: int = 1,
         context: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+        judging: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Blocking entry point; turns run on worker threads via the sync agent API.
+
+        ``deadline`` is a latency budget in seconds: lookups are time-boxed or
+        skipped, debater output is shortened and later rounds are dropped as
+        needed to meet it, and the result reports ``degraded`` and the time
+        spent per stage. ``judging`` overrides the manager's judging mode.
+        """
+        frames = self._stream(topic, rounds, context, blocking=True, deadline=deadline, judging=judging)
+        return run_sync(self._final(frames))
+
+    async def arun(
+        self,
+        topic: str,
+        *,
+        rounds: int = 1,
+        context: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+        judging: Optional[str] = None,
     ) -> Dict[str, Any]:
+        frames = self._stream(topic, rounds, context, blocking=False, deadline=deadline, judging=judging)
+        return await self._final(frames)
+
+    async def astream(
+        self,
+        topic: str,
+        *,
+        rounds: int = 1,
+        context: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+        judging: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{"event", "data"}`` frames as turns complete.
+
+        The first frame (``start``) is emitted once the request is validated;
+        each argument, rebuttal and judgement follows as soon as it is produced,
+        and the closing ``final_scores`` frame carries the same payload
+        :meth:`run` returns. With deferred judging, every round's judgement
+        frame arrives together after the last rebuttal.
+        """
+        frames = self._stream(topic, rounds, context, blocking=False, deadline=deadline, judging=judging)
+        try:
+            async for frame in frames:
+                yield frame
+        finally:
+            # Close the inner stream here, in the consumer's context, so its
+            # deadline binding is reset rather than left to the finalizer.
+            await frames.aclose()
+
+    async def abatch(
+        self,
+        requests: Sequence[Any],
+        *,
+        max_in_flight: int = 8,
+        max_debates: Optional[int] = None,
+        judging: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run many debates, yielding ``{"index", "result" | "error"}`` as each finishes.
+
+        ``requests`` are ``DebateRequest``-like objects or dicts with ``topic``,
+        ``rounds`` and ``context``. All debates share one :class:`FairLimiter`
+        so at most ``max_in_flight`` LLM calls are outstanding, granted
+        round-robin across debates; ``max_debates`` bounds how many debates are
+        open at once (default ``4 * max_in_flight``). ``judging`` applies to
+        every debate in the batch.
+        """
+        limiter = FairLimiter(max_in_flight)
+        queue = list(enumerate(requests))
+        queue.reverse()
+        open_limit = max(max_debates or 4 * max_in_flight, 1)
+        running: Dict[asyncio.Task, int] = {}
+
+        async def one(index: int, request: Any) -> Dict[str, Any]:
+            bind_llm_limiter(limiter, index)
+            topic, rounds, context, deadline = self._request_fields(request)
+            return await self.arun(topic, rounds=rounds, context=context, deadline=deadline, judging=judging)
+
+        try:
+            while queue or running:
+                while queue and len(running) < open_limit:
+                    index, request = queue.pop()
+                    running[asyncio.ensure_future(one(index, request))] = index
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    try:
+                        entry = {"index": index, "result": task.result()}
+                    except Exception as exc:  # one failed debate must not sink the batch
+                        logger.warning("Batch debate {} failed: {}", index, exc)
+                        entry = {"index": index, "error": str(exc)}
+                    yield entry
+        finally:
+            for task in running:
+                task.cancel()
+        logger.info("Batch of {} debates finished; limiter {}", len(requests), limiter.stats())
+
+    def run_batch(
+        self,
+        requests: Sequence[Any],
+        *,
+        max_in_flight: int = 8,
+        max_debates: Optional[int] = None,
+        judging: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Blocking :meth:`abatch` returning one entry per request, in input order."""
+
+        async def collect() -> List[Dict[str, Any]]:
+            entries: List[Dict[str, Any]] = [{} for _ in requests]
+            batch = self.abatch(
+                requests, max_in_flight=max_in_flight, max_debates=max_debates, judging=judging
+            )
+            async for entry in batch:
+                entries[entry["index"]] = entry
+            return entries
+
+        return run_sync(collect())
+
+    @staticmethod
+    def _request_fields(request: Any) -> Tuple[str, int, Optional[Dict[str, Any]], Optional[float]]:
+        if isinstance(request, dict):
+            topic, read = request.get("topic", ""), request.get
+        else:
+            topic, read = request.topic, partial(getattr, request)
+        deadline_ms = read("deadline_ms", None)
+        return topic, read("rounds", 1), read("context", None), deadline_ms / 1000 if deadline_ms else None
+
+    async def _stream(
+        self,
+        topic: str,
+        rounds: int,
+        context: Optional[Dict[str, Any]],
+        *,
+        blocking: bool,
+        deadline: Optional[float] = None,
+        judging: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        judging = judging or self.judging
+        history = self._validate(topic, rounds, context, judging)
+        yield {"event": "start", "data": {"topic": topic, "rounds": rounds}}
+        # Bound before the graph starts so every turn task and thread inherits it.
+        budget = DebateDeadline(deadline) if deadline else None
+        tokens = bind_deadline(budget)
+        try:
+            # Detached: the span stays open across yields to the consumer. Turns are
+            # started in contexts where it is current, so they still nest under it.
+            with stage("debate", detached=True, rounds=rounds) as span:
+                transcript = Transcript(history, digest=self.digest)
+                deferred = judging == "deferred"
+                graph = self._build_graph(topic, rounds, transcript, blocking=blocking, deferred=deferred)
+                results: Dict[str, Any] = {}
+                async for key, value in graph.stream(task_context=partial(child_context, span)):
+                    if key == "series.judgement":  # split back into the per-round judgements
+                        for round_idx, judgement in enumerate(value or (), 1):
+                            results[f"r{round_idx}.judgement"] = judgement
+                            yield self._frame(f"r{round_idx}.judgement", judgement)
+                        continue
+                    results[key] = value
+                    if value is not None and not key.endswith(".context"):
+                        yield self._frame(key, value)
+                final = self._assemble(topic, rounds, transcript, results)
+        finally:
+            # Also on errors and early close (a client leaving an SSE stream).
+            unbind_deadline(tokens)
+        if budget is not None:
+            report = budget.report()
+            final["degraded"] = bool(report["reasons"])
+            final["deadline"] = report
+        yield {"event": "final_scores", "data": final}
+
+    @staticmethod
+    async def _final(frames: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        async for frame in frames:
+            result = frame["data"]
+        return result
+
+    @staticmethod
+    def _frame(key: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        round_label, name = key.split(".", 1)
+        data: Dict[str, Any] = {"round": int(round_label[1:])}
+        if name == "judgement":
+            data["judgement"] = value
+            return {"event": "judgement", "data": data}
+        side, kind = name.split("_", 1)
+        data.update({"side": side.upper(), "turn": value})
+        return {"event": kind, "data": data}
+
+    @staticmethod
+    def _validate(topic: str, rounds: int, context: Optional[Dict[str, Any]], judging: str) -> List[Turn]:
         if not topic or not topic.strip():
             raise ValueError("Topic is required.")
         if rounds < 1:
             raise ValueError("At least one round is required.")
-
+        if judging not in DebateManager.JUDGING_MODES:
+            raise ValueError(f"Unknown judging mode '{judging}'.")
         context = context or {}
-        transcript: List[Dict[str, Any]] = context.get("history", []).copy()
-        round_results: List[Dict[str, Any]] = []
+        return coerce_turns(context.get("history", []))
 
+    def _build_graph(
+        self,
+        topic: str,
+        rounds: int,
+        transcript: Transcript,
+        *,
+        blocking: bool,
+        deferred: bool = False,
+    ) -> TurnGraph:
+        """Lay out every turn of the series as a dependency graph.
+
+        Both arguments of a round only need the prior transcript, each rebuttal
+        only needs the opposing argument, and the judge sits off the critical
+        path so the next round can start while the previous one is scored.
+        A ``context`` node per round appends the finished turns to the
+        transcript once and hands a frozen view to the next round and judge.
+        With ``deferred`` there is no judge per round; a single
+        ``series.judgement`` node scores every round once all are in.
+        """
+        graph = TurnGraph()
+        opening = transcript.view()
+        graph.add("r0.context", lambda results: opening, ())
+        previous: Tuple[str, ...] = ("r0.context",)
+        every_turn: Tuple[str, ...] = ()
         for round_idx in range(1, rounds + 1):
-            logger.info("Starting debate round {}", round_idx)
-            round_context = {"history": transcript, "round": round_idx}
-            a_argument = self.debater_a.propose_argument(topic, round_context)
-            b_argument = self.debater_b.propose_argument(topic, round_context)
-            a_rebuttal = self.debater_a.rebut(b_argument, round_context)
-            b_rebuttal = self.debater_b.rebut(a_argument, round_context)
-
-            transcript.extend([a_argument, b_argument, a_rebuttal, b_rebuttal])
-
-            judge_context = {
-                "history_summary": self._summarize_transcript(transcript),
-                "topic": topic,
-            }
-            judgement = self.judge.score_round(
-                {"argument": a_argument, "rebuttal": a_rebuttal},
-                {"argument": b_argument, "rebuttal": b_rebuttal},
-                judge_context,
+            keys = self._round_keys(round_idx)
+            turn_keys = tuple(keys[name] for name in self.TURN_ORDER)
+            bind = partial(self._turn, topic=topic, round_idx=round_idx, blocking=blocking)
+            graph.add(keys["a_argument"], bind(self.debater_a, "argument"), previous)
+            graph.add(keys["b_argument"], bind(self.debater_b, "argument"), previous)
+            graph.add(
+                keys["a_rebuttal"],
+                bind(self.debater_a, "rebuttal", opponent_key=keys["b_argument"]),
+                previous + (keys["b_argument"],),
+            )
+            graph.add(
+                keys["b_rebuttal"],
+                bind(self.debater_b, "rebuttal", opponent_key=keys["a_argument"]),
+                previous + (keys["a_argument"],),
             )
+            advance = self._advance(transcript, round_idx, turn_keys, blocking=blocking)
+            graph.add(keys["context"], advance, turn_keys)
+            if not deferred:
+                graph.add(keys["judgement"], bind(self.judge, "judgement"), (keys["context"],) + turn_keys)
+            previous = (keys["context"],) + turn_keys
+            every_turn += turn_keys
+        if deferred:
+            series = self._turn(self.judge, "series", topic=topic, round_idx=rounds, blocking=blocking)
+            graph.add("series.judgement", series, previous + every_turn)
+        return graph
+
+    @staticmethod
+    def _advance(
+        transcript: Transcript, round_idx: int, turn_keys: Tuple[str, ...], *, blocking: bool
+    ) -> TurnFunc:
+        """Graph node that appends a finished round and returns the updated view.
+
+        A round dropped for its deadline adds nothing and passes the view on.
+        """
+
+        def append(results: Dict[str, Any]) -> bool:
+            turns = [results[key] for key in turn_keys]
+            if any(turn is None for turn in turns):
+                return False
+            transcript.extend(turns)
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.round_finished(round_idx)
+            return True
+
+        if blocking:
+
+            def advance(results: Dict[str, Any]) -> TranscriptView:
+                if append(results):
+                    transcript.compact()
+                return transcript.view()
+
+            return advance
+
+        async def aadvance(results: Dict[str, Any]) -> TranscriptView:
+            if append(results):
+                await transcript.acompact()
+            return transcript.view()
+
+        return aadvance
+
+    def _turn(
+        self,
+        agent: Any,
+        kind: str,
+        *,
+        topic: str,
+        round_idx: int,
+        blocking: bool,
+        opponent_key: Optional[str] = None,
+    ) -> TurnFunc:
+        """Build the graph node for one turn, sync or async depending on ``blocking``.
+
+        The ``series`` kind is the deferred judge; ``round_idx`` is then the last round.
+        """
 
-            round_results.append(
-                {
-                    "round": round_idx,
-                    "A": {"argument": a_argument, "rebuttal": a_rebuttal},
-                    "B": {"argument": b_argument, "rebuttal": b_rebuttal},
-                    "judgement": judgement,
+        def prepare(results: Dict[str, Any]) -> Optional[Tuple[Callable[..., Any], Tuple[Any, ...]]]:
+            if kind == "series":
+                # Rounds dropped for the deadline have no turns, and neither does any later one.
+                claims = []
+                for number in range(1, round_idx + 1):
+                    if results[f"r{number}.a_argument"] is None:
+                        break
+                    claims.append(self._claims(results, number))
+                judge_context = {
+                    "history_summary": self._summarize_transcript(results["r0.context"]),
+                    "topic": topic,
                 }
-            )
+                method = agent.score_series if blocking else agent.ascore_series
+                return method, (claims, judge_context)
+            deadline = current_deadline()
+            if deadline is not None and not deadline.admit_round(round_idx):
+                return None  # round dropped to meet the deadline
+            if kind == "judgement":
+                keys = self._round_keys(round_idx)
+                judge_context = {
+                    "history_summary": self._summarize_transcript(results[keys["context"]]),
+                    "topic": topic,
+                }
+                method = agent.score_round if blocking else agent.ascore_round
+                return method, (*self._claims(results, round_idx), judge_context)
+
+            round_context = {"history": results[f"r{round_idx - 1}.context"], "round": round_idx}
+            if kind == "argument":
+                if agent is self.debater_a:
+                    logger.info("Starting debate round {}", round_idx)
+                method = agent.propose_argument if blocking else agent.apropose_argument
+                return method, (topic, round_context)
+            method = agent.rebut if blocking else agent.arebut
+            return method, (results[opponent_key], round_context)
+
+        if blocking:
+
+            def turn(results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                call = prepare(results)
+                if call is None:
+                    return None
+                method, args = call
+                return method(*args)
+
+            return turn
+
+        async def aturn(results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            call = prepare(results)
+            if call is None:
+                return None
+            method, args = call
+            return await method(*args)
+
+        return aturn
+
+    def _assemble(
+        self,
+        topic: str,
+        rounds: int,
+        transcript: Transcript,
+        results: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        round_results: List[Dict[str, Any]] = []
+        for round_idx in range(1, rounds + 1):
+            keys = self._round_keys(round_idx)
+            if results.get(keys["judgement"]) is None:  # dropped, and so is every later round
+                break
+            a_claim, b_claim = self._claims(results, round_idx)
+            judgement = results[keys["judgement"]]
+            round_results.append({"round": round_idx, "A": a_claim, "B": b_claim, "judgement": judgement})
 
         final_scores = self._aggregate_series(round_results)
         return {
             "topic": topic,
             "rounds": round_results,
             "final_scores": final_scores,
-            "transcript": transcript,
+            "transcript": list(transcript.turns),
         }
 
-    def _summarize_transcript(self, transcript: List[Dict[str, Any]]) -> str:
-        if not transcript:
-            return "No turns yet."
-        snippets = []
-        for entry in transcript[-6:]:
-            snippets.append(f"{entry.get('agent', 'agent')}:{entry.get('text', '')[:80]}...")
-        return " | ".join(snippets)
+    @staticmethod
+    def _claims(results: Dict[str, Any], round_idx: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Both sides' argument and rebuttal for one round, as the judge and result expect them."""
+        keys = DebateManager._round_keys(round_idx)
+        return (
+            {"argument": results[keys["a_argument"]], "rebuttal": results[keys["a_rebuttal"]]},
+            {"argument": results[keys["b_argument"]], "rebuttal": results[keys["b_rebuttal"]]},
+        )
+
+    @staticmethod
+    def _round_keys(round_idx: int) -> Dict[str, str]:
+        names = DebateManager.TURN_ORDER + ("context", "judgement")
+        return {name: f"r{round_idx}.{name}" for name in names}
+
+    @staticmethod
+    def _summarize_transcript(transcript: Sequence[Turn]) -> str:
+        return summarize(transcript, "judge")
 
     def _aggregate_series(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         totals = {"A": 0.0, "B": 0.0}
         per_round = []
         for result in results:
-            scores = result["judgement"]["scores"]
+            scores = result["judgement"].scores
             totals["A"] += scores.get("A", 0.0)
             totals["B"] += scores.get("B", 0.0)
             per_round.append(scores)
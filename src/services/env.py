@@ -0,0 +1,11 @@
+"""Load ``.env`` once per process, however many modules ask for it."""
+from __future__ import annotations
+
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    load_dotenv()
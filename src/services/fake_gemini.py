@@ -0,0 +1,84 @@
+"""Local HTTP stand-in for the Gemini REST API, backed by :class:`SimulatedGemini`.
+
+Run it and point the real SDK at it to load-test the production code path
+(REST transport, retries, timeouts) without quota::
+
+    python -m src.services.fake_gemini --port 8765 --error-rate 0.05
+    GEMINI_API_KEY=fake GEMINI_API_ENDPOINT=http://127.0.0.1:8765 uvicorn src.services.app:app
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from src.services.simulator import STATUS, SimulatedGemini
+
+
+def create_app(simulator: SimulatedGemini):
+    """FastAPI app serving Gemini's ``generateContent`` REST call from ``simulator``."""
+    app = FastAPI(title="Simulated Gemini")
+
+    @app.post("/{version}/models/{model}:generateContent")
+    async def generate_content(version: str, model: str, request: Request):
+        body = await request.json()
+        system_prompt = " ".join(_texts(body.get("systemInstruction") or body.get("system_instruction")))
+        prompt = "\n".join(text for content in body.get("contents", []) for text in _texts(content))
+        reply = simulator.plan(model, system_prompt, prompt)
+        await asyncio.sleep(reply.delay)
+        if reply.error is not None:
+            error = {"code": reply.error, "message": "Simulated failure.", "status": STATUS[reply.error]}
+            return JSONResponse({"error": error}, status_code=reply.error)
+        candidate = {"content": {"role": "model", "parts": [{"text": reply.text}]}, "finishReason": "STOP"}
+        return {
+            "candidates": [{**candidate, "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": reply.prompt_tokens,
+                "candidatesTokenCount": reply.output_tokens,
+                "totalTokenCount": reply.prompt_tokens + reply.output_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    def stats():
+        return simulator.stats()
+
+    return app
+
+
+def _texts(content: Optional[Dict[str, Any]]) -> List[str]:
+    if not content:
+        return []
+    return [part.get("text", "") for part in content.get("parts", []) if part.get("text")]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a latency-realistic fake Gemini REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=600.0)
+    parser.add_argument("--sigma", type=float, default=0.35)
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    simulator = SimulatedGemini(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.sigma,
+        tokens_per_second=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    logger.info("Simulated Gemini on http://{}:{} ({})", args.host, args.port, simulator)
+    uvicorn.run(create_app(simulator), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Hedged Gemini requests: race a duplicate when a call runs into the tail.
+
+Once a role has enough history, a call that has not returned by the
+``percentile`` of that role's recent latencies gets a second, identical
+request; whichever answers first wins and the other is dropped. Hedges are
+capped at ``budget`` extra requests per call, so a slow backend sees at most
+that much added load rather than a doubling. Only roles listed in ``roles``
+are hedged; the judge's low-temperature calls are the default.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, FrozenSet, Optional, TypeVar
+
+from loguru import logger
+
+from src.services.env import load_env
+from src.services.metrics import LLM_HEDGES
+
+load_env()
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgePolicy:
+    """When to hedge a call, and how much extra load hedging may add."""
+
+    roles: FrozenSet[str] = frozenset({"judge"})
+    percentile: float = 0.95  # hedge once a call is slower than this share of recent calls
+    min_samples: int = 20  # history a role needs before it is hedged
+    min_delay: float = 0.05  # never hedge sooner than this, in seconds
+    budget: float = 0.1  # hedges allowed per call of a hedged role
+    window: int = 256
+    max_workers: int = 16  # threads racing blocking calls
+    _latencies: Dict[str, Deque[float]] = field(default_factory=dict, init=False, repr=False)
+    _stats: Dict[str, int] = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.roles = frozenset(self.roles)
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["HedgePolicy"]:
+        if os.getenv("LLM_HEDGE", "0") != "1":
+            return None
+        roles = os.getenv("LLM_HEDGE_ROLES", "judge")
+        return cls(
+            roles=frozenset(role.strip() for role in roles.split(",") if role.strip()),
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")),
+        )
+
+    def delay(self, role: Optional[str]) -> Optional[float]:
+        """Seconds to wait before hedging a call for ``role``; ``None`` means never."""
+        if role not in self.roles:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(role, ()))
+        if len(samples) < max(self.min_samples, 1):
+            return None
+        index = min(int(self.percentile * len(samples)), len(samples) - 1)
+        return max(samples[index], self.min_delay)
+
+    def observe(self, role: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(role, deque(maxlen=self.window)).append(seconds)
+
+    def run(self, role: Optional[str], attempt: Callable[[], T]) -> T:
+        """Call ``attempt``, racing a duplicate on a worker thread if it runs long."""
+        start = time.perf_counter()
+        delay = self._admit(role)
+        if delay is None:
+            return self._finish(role, start, attempt())
+        executor = self._get_executor()
+        primary = executor.submit(contextvars.copy_context().run, attempt)
+        done, _ = wait([primary], timeout=delay)
+        legs: Dict[Future, bool] = {primary: False}
+        if not done and self._take_budget(role):
+            legs[executor.submit(contextvars.copy_context().run, attempt)] = True
+        pending, error = set(legs), None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._settle(role, legs, legs[future])
+                    return self._finish(role, start, future.result())
+                error = future.exception()
+        raise error  # both legs failed; the last error is as good as any
+
+    async def arun(self, role: Optional[str], attempt: Callable[[], Awaitable[T]]) -> T:
+        """Async :meth:`run`; the losing request is cancelled."""
+        start = time.perf_counter()
+        delay = self._admit(role)
+        if delay is None:
+            return self._finish(role, start, await attempt())
+        primary = asyncio.ensure_future(attempt())
+        legs: Dict[asyncio.Future, bool] = {primary: False}
+        try:
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if not done and self._take_budget(role):
+                legs[asyncio.ensure_future(attempt())] = True
+            pending, error = set(legs), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._settle(role, legs, legs[task])
+                        return self._finish(role, start, task.result())
+                    error = task.exception()
+            raise error
+        finally:
+            for task in legs:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["roles"] = sorted(self.roles)
+        stats["hedge_delay_ms"] = {
+            role: round(delay * 1000, 1) for role in self.roles if (delay := self.delay(role)) is not None
+        }
+        return stats
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _admit(self, role: Optional[str]) -> Optional[float]:
+        if role not in self.roles:
+            return None
+        with self._lock:
+            self._stats["calls"] += 1
+        return self.delay(role)
+
+    def _take_budget(self, role: str) -> bool:
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.budget * self._stats["calls"]:
+                self._stats["budget_denied"] += 1
+                allowed = False
+            else:
+                self._stats["hedged"] += 1
+                allowed = True
+        LLM_HEDGES.inc(role=role, outcome="issued" if allowed else "denied")
+        return allowed
+
+    def _settle(self, role: str, legs: Dict[Any, bool], hedge_won: bool) -> None:
+        if len(legs) < 2:
+            return
+        if hedge_won:
+            with self._lock:
+                self._stats["hedge_wins"] += 1
+        LLM_HEDGES.inc(role=role, outcome="won" if hedge_won else "lost")
+        logger.debug("Hedged {} call: {} request answered first", role, "hedge" if hedge_won else "primary")
+
+    def _finish(self, role: Optional[str], start: float, result: T) -> T:
+        if role in self.roles:
+            self.observe(role, time.perf_counter() - start)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="llm-hedge")
+            return self._executor
@@ -0,0 +1,308 @@
+"""Hot-path latency histograms, outcome counters and in-flight gauges.
+
+Every expensive step of a debate (LLM calls, citation searches, debater turns,
+judging, ADK runs) is wrapped in :func:`stage`, which times it into
+``agora_stage_seconds``, tracks how many are running in
+``agora_stage_in_flight`` and counts exceptions in ``agora_stage_errors_total``.
+:data:`registry` renders everything in the Prometheus text format for
+``GET /metrics``.
+
+With ``OTEL_ENABLED=1`` each stage is also an OpenTelemetry span, so one
+debate's trace shows every call beneath it. Only the API package is needed
+here; exporting the spans is left to whatever SDK the deployment configures.
+"""
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+from loguru import logger
+
+from src.services.env import load_env
+
+load_env()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum].
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def mean(self, **labels: str) -> float:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if not series:
+                return 0.0
+            return series[1][0] / sum(series[0])
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        lines: List[str] = []
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together for a scrape."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "agora_stage_seconds", "Wall time spent in each pipeline stage.", ["stage"]
+)
+STAGE_IN_FLIGHT = registry.gauge("agora_stage_in_flight", "Stage executions currently running.", ["stage"])
+STAGE_ERRORS = registry.counter("agora_stage_errors_total", "Stage executions that raised.", ["stage"])
+LLM_RESPONSES = registry.counter(
+    "agora_llm_responses_total",
+    "LLM calls by outcome: ok, empty, failed, cached or mock.",
+    ["outcome"],
+)
+JUDGE_PARSE_FALLBACKS = registry.counter(
+    "agora_judge_parse_fallbacks_total",
+    "Judge responses scored with placeholder values: empty, invalid_json or missing_scores.",
+    ["reason"],
+)
+LLM_RETRIES = registry.counter("agora_llm_retries_total", "Gemini calls retried, by status code.", ["code"])
+LLM_CONCURRENCY_LIMIT = registry.gauge(
+    "agora_llm_concurrency_limit", "Current adaptive cap on in-flight Gemini calls."
+)
+LLM_HEDGES = registry.counter(
+    "agora_llm_hedges_total",
+    "Hedged Gemini requests by role and outcome: issued, denied (over budget), won or lost.",
+    ["role", "outcome"],
+)
+FACTCHECK_RESULTS = registry.counter(
+    "agora_factcheck_lookups_total",
+    "Citation lookups by outcome: ok, empty, cached, coalesced, short_circuited or disabled.",
+    ["outcome"],
+)
+
+
+class StageSink(Protocol):
+    def record(self, stage: str, seconds: float) -> None:
+        ...
+
+
+# Per-request collector of stage timings (a debate's deadline), inherited by
+# the tasks and threads that request starts.
+_stage_sink: ContextVar[Optional[StageSink]] = ContextVar("stage_sink", default=None)
+
+
+def bind_stage_sink(sink: Optional[StageSink]) -> Token:
+    return _stage_sink.set(sink)
+
+
+def reset_stage_sink(token: Token) -> None:
+    _stage_sink.reset(token)
+
+
+_tracer: Optional[Any] = None
+_tracing_checked = False
+
+
+def _load_tracer() -> Optional[Any]:
+    """The ``agora`` tracer when ``OTEL_ENABLED=1``; resolved once, lazily."""
+    global _tracer, _tracing_checked
+    if not _tracing_checked:
+        _tracing_checked = True
+        if os.getenv("OTEL_ENABLED", "0") == "1":
+            try:
+                from opentelemetry import trace
+            except ImportError:
+                logger.warning("OTEL_ENABLED=1 but opentelemetry-api is not installed; spans disabled.")
+            else:
+                _tracer = trace.get_tracer("agora")
+    return _tracer
+
+
+@contextmanager
+def stage(name: str, *, detached: bool = False, **attributes: Any) -> Iterator[Optional[Any]]:
+    """Time the enclosed block as stage ``name`` (and trace it as a span when enabled).
+
+    ``detached`` starts the span without making it current, for blocks that
+    cross ``yield`` points of an async generator and may resume in another
+    context; the span is yielded so work started inside can still nest under
+    it via :func:`child_context`. Cancellation is timed but not counted as an
+    error.
+    """
+    tracer = _load_tracer()
+    with ExitStack() as scope:
+        span = None
+        if tracer is not None and detached:
+            span = tracer.start_span(name, attributes=attributes)
+            scope.callback(span.end)
+        elif tracer is not None:
+            scope.enter_context(tracer.start_as_current_span(name, attributes=attributes))
+        STAGE_IN_FLIGHT.inc(stage=name)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as exc:
+            STAGE_ERRORS.inc(stage=name)
+            if span is not None:
+                span.record_exception(exc)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            STAGE_SECONDS.observe(elapsed, stage=name)
+            STAGE_IN_FLIGHT.dec(stage=name)
+            sink = _stage_sink.get()
+            if sink is not None:
+                sink.record(name, elapsed)
+
+
+def child_context(span: Optional[Any]) -> contextvars.Context:
+    """A copy of the current context with ``span`` (from a detached stage) as the current span."""
+    context = contextvars.copy_context()
+    if span is not None:
+        from opentelemetry import context as otel_context, trace
+
+        context.run(otel_context.attach, trace.set_span_in_context(span))
+    return context
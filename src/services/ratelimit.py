@@ -0,0 +1,291 @@
+"""Process-wide quota limiter and retry layer for Gemini calls.
+
+Every GeminiLLM call is admitted through one :class:`RateLimiter`. Admission
+has three parts:
+
+* token buckets for the project's requests-per-minute and tokens-per-minute
+  quota, so bursts from many debates are smoothed to the quota ceiling
+  instead of being rejected upstream;
+* an AIMD concurrency cap that creeps up by one call per window of successes
+  and halves (at most once per ``cooldown``) when Gemini answers 429 or 503;
+* jittered exponential retries for those overload errors, bounded by a
+  per-call deadline so a stuck quota surfaces as a failure, not a hang.
+
+Waits use plain sleeps over lock-protected state, so sync callers on worker
+threads and async callers on any loop share the same limiter.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from loguru import logger
+
+from src.services.env import load_env
+from src.services.metrics import LLM_CONCURRENCY_LIMIT, LLM_RETRIES
+
+load_env()
+
+T = TypeVar("T")
+
+# Status codes worth retrying: quota exhaustion and transient server trouble.
+# google.api_core errors and SimulatedAPIError both expose them as ``code``.
+RETRYABLE_CODES = frozenset({429, 500, 503, 504})
+OVERLOAD_CODES = frozenset({429, 503})
+
+
+class DeadlineExceeded(Exception):
+    """The call could not be admitted or completed within its deadline."""
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "code", None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute up to ``capacity``.
+
+    :meth:`reserve` takes units immediately, going into debt if needed, and
+    returns how long the caller must wait before using them; reservations
+    therefore queue in arrival order without any polling.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate_per_minute / 60.0
+        # A quarter-minute of quota as burst: enough to absorb a round's fan-out.
+        self.capacity = capacity if capacity is not None else max(rate_per_minute / 4, 1.0)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= amount
+            return max(-self._tokens / self.rate, 0.0)
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._stamp
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+class AdaptiveConcurrency:
+    """Additive-increase / multiplicative-decrease cap on in-flight calls."""
+
+    def __init__(
+        self,
+        *,
+        initial: float = 8.0,
+        minimum: float = 1.0,
+        maximum: float = 64.0,
+        backoff: float = 0.5,
+        cooldown: float = 2.0,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.limit = min(max(initial, minimum), maximum)
+        self.in_flight = 0
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def release(self, *, overloaded: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                # One burst of rejections is one signal; halve once per cooldown.
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+                    logger.warning("Gemini overloaded; concurrency limit now {:.1f}", self.limit)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+
+@dataclass
+class RateLimiter:
+    """Quota buckets, adaptive concurrency and retries for one Gemini project."""
+
+    requests_per_minute: float = 0.0  # 0 disables the bucket
+    tokens_per_minute: float = 0.0
+    max_concurrency: int = 32
+    attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 60.0  # seconds per call, retries and waits included
+    poll_interval: float = 0.02
+    concurrency: AdaptiveConcurrency = field(init=False)
+    _requests: Optional[TokenBucket] = field(init=False, repr=False)
+    _tokens: Optional[TokenBucket] = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stats: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Start wide open; the cap only tightens once Gemini pushes back.
+        self.concurrency = AdaptiveConcurrency(initial=self.max_concurrency, maximum=self.max_concurrency)
+        self._requests = TokenBucket(self.requests_per_minute) if self.requests_per_minute > 0 else None
+        self._tokens = TokenBucket(self.tokens_per_minute) if self.tokens_per_minute > 0 else None
+        self._stats = {"attempts": 0, "retries": 0, "overloads": 0, "throttled": 0, "deadline_exceeded": 0}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        return cls(
+            requests_per_minute=float(os.getenv("GEMINI_RPM", "0")),
+            tokens_per_minute=float(os.getenv("GEMINI_TPM", "0")),
+            max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+            attempts=int(os.getenv("GEMINI_RETRY_ATTEMPTS", "5")),
+            deadline=float(os.getenv("GEMINI_CALL_DEADLINE", "60")),
+        )
+
+    def call(self, attempt: Callable[[float], T], *, tokens: int = 0, budget: Optional[float] = None) -> T:
+        """Run ``attempt(timeout)`` under the quota, retrying overload errors.
+
+        ``tokens`` is the estimated cost charged to the tokens-per-minute
+        bucket; ``timeout`` is the time left before the call's deadline, which
+        is ``budget`` seconds away when that is shorter than the default.
+        """
+        deadline = time.monotonic() + min(self.deadline, budget if budget is not None else self.deadline)
+        for number in range(self.attempts):
+            self._sleep_until_admitted(tokens, deadline)
+            try:
+                result = attempt(self._remaining(deadline))
+            except Exception as exc:
+                delay = self._failed(exc, number, deadline)
+                time.sleep(delay)
+                continue
+            self.concurrency.release()
+            return result
+        raise AssertionError("unreachable: the last attempt re-raises")  # pragma: no cover
+
+    async def acall(
+        self, attempt: Callable[[float], Awaitable[T]], *, tokens: int = 0, budget: Optional[float] = None
+    ) -> T:
+        deadline = time.monotonic() + min(self.deadline, budget if budget is not None else self.deadline)
+        for number in range(self.attempts):
+            await self._asleep_until_admitted(tokens, deadline)
+            try:
+                result = await asyncio.wait_for(attempt(self._remaining(deadline)), self._remaining(deadline))
+            except asyncio.TimeoutError:
+                self.concurrency.release()
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded("Gemini call ran past its deadline") from None
+            except asyncio.CancelledError:
+                self.concurrency.release()
+                raise
+            except Exception as exc:
+                delay = self._failed(exc, number, deadline)
+                await asyncio.sleep(delay)
+                continue
+            self.concurrency.release()
+            return result
+        raise AssertionError("unreachable: the last attempt re-raises")  # pragma: no cover
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Charge tokens a response used beyond the estimate admitted for it."""
+        if self._tokens and actual > estimated:
+            self._tokens.reserve(actual - estimated)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats.update(
+            concurrency_limit=round(self.concurrency.limit, 2),
+            in_flight=self.concurrency.in_flight,
+            rpm=self.requests_per_minute or None,
+            tpm=self.tokens_per_minute or None,
+        )
+        return stats
+
+    def _admission_wait(self, tokens: int, deadline: float) -> float:
+        """Reserve quota for one attempt and return how long to wait for it."""
+        wait = self._requests.reserve(1) if self._requests else 0.0
+        if self._tokens and tokens:
+            wait = max(wait, self._tokens.reserve(tokens))
+        if time.monotonic() + wait > deadline:
+            if self._requests:
+                self._requests.refund(1)
+            if self._tokens and tokens:
+                self._tokens.refund(tokens)
+            self._count("deadline_exceeded")
+            raise DeadlineExceeded("Gemini quota cannot admit this call before its deadline")
+        self._count("attempts")
+        if wait > 0:
+            self._count("throttled")
+        return wait
+
+    def _sleep_until_admitted(self, tokens: int, deadline: float) -> None:
+        time.sleep(self._admission_wait(tokens, deadline))
+        while not self.concurrency.try_acquire():
+            self._check_deadline(deadline)
+            time.sleep(self.poll_interval)
+
+    async def _asleep_until_admitted(self, tokens: int, deadline: float) -> None:
+        await asyncio.sleep(self._admission_wait(tokens, deadline))
+        while not self.concurrency.try_acquire():
+            self._check_deadline(deadline)
+            await asyncio.sleep(self.poll_interval)
+
+    def _failed(self, exc: Exception, number: int, deadline: float) -> float:
+        """Record a failed attempt; return the backoff before the next one or re-raise."""
+        code = status_code(exc)
+        self.concurrency.release(overloaded=code in OVERLOAD_CODES)
+        if code in OVERLOAD_CODES:
+            self._count("overloads")
+        if code not in RETRYABLE_CODES or number + 1 >= self.attempts:
+            raise exc
+        # Full jitter: spreads the retries of a rejected burst over the whole window.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**number))
+        if time.monotonic() + delay >= deadline:
+            raise exc
+        self._count("retries")
+        LLM_RETRIES.inc(code=str(code))
+        logger.debug("Gemini returned {}; retry {} in {:.2f}s", code, number + 1, delay)
+        return delay
+
+    def _check_deadline(self, deadline: float) -> None:
+        if time.monotonic() >= deadline:
+            self._count("deadline_exceeded")
+            raise DeadlineExceeded("No Gemini concurrency slot freed before the call's deadline")
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(deadline - time.monotonic(), 0.001)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+
+@lru_cache(maxsize=None)
+def shared_limiter() -> RateLimiter:
+    """The limiter every GeminiLLM in this process uses unless given its own."""
+    return RateLimiter.from_env()
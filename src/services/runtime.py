@@ -1,19 +1,42 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from dataclasses import dataclass
-from typing import Optional
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
 
-from dotenv import load_dotenv
 from loguru import logger
 
-try:
-    import google.generativeai as genai
-except ImportError:  # pragma: no cover - handled via mock mode
-    genai = None
+from src.services.cache import ResponseCache
+from src.services.deadline import current_deadline
+from src.services.env import load_env
+from src.services.hedging import HedgePolicy
+from src.services.metrics import LLM_RESPONSES, stage
+from src.services.ratelimit import DeadlineExceeded, RateLimiter, shared_limiter
+from src.services.scheduler import llm_slot
+from src.services.simulator import SimulatedGemini
 
+# google.generativeai takes a noticeable share of cold start, so it is only
+# imported once a GeminiLLM actually has an API key to use it with.
+genai = None
 
-load_dotenv()
+load_env()
+
+T = TypeVar("T")
+
+
+def _load_genai():
+    global genai
+    if genai is None:
+        try:
+            import google.generativeai as sdk
+        except ImportError:  # pragma: no cover - handled via mock mode
+            return None
+        genai = sdk
+    return genai
 
 
 @dataclass
@@ -22,47 +45,291 @@ class GeminiLLM:
 
     model_name: Optional[str] = None
     temperature: float = 0.6
+    pool_size: int = 32
+    cache: Optional[ResponseCache] = field(default=None, repr=False)
+    # Stand-in for the Gemini SDK (``LLM_SIMULATE=1``); takes precedence over the API key.
+    simulator: Optional[SimulatedGemini] = field(default=None, repr=False)
+    # Quota, adaptive concurrency and retries; shared process-wide by default.
+    limiter: Optional[RateLimiter] = field(default=None, repr=False)
+    # Opt-in (``LLM_HEDGE=1``): race a duplicate request when a call runs into the tail.
+    hedging: Optional[HedgePolicy] = field(default=None, repr=False)
 
     def __post_init__(self) -> None:
+        if self.limiter is None:
+            self.limiter = shared_limiter()
+        if self.hedging is None:
+            self.hedging = HedgePolicy.from_env()
+        if self.cache is None:
+            self.cache = ResponseCache.from_env()
+        if self.simulator is None:
+            self.simulator = SimulatedGemini.from_env()
+        # LRU of GenerativeModel handles keyed by (model_name, system_instruction).
+        self._pool: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._pool_lock = threading.Lock()
+        self._pool_hits = 0
+        self._pool_misses = 0
+        # The SDK's async client only speaks gRPC, so REST-configured calls run the
+        # blocking client on a worker thread instead.
+        self._sync_transport = False
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.model_name = self.model_name or os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-        self._mock_mode = not self.api_key or genai is None
+        if self.simulator is not None:
+            self._mock_mode = False
+            logger.info("Gemini calls answered by the latency simulator: {}", self.simulator)
+            return
+        sdk = _load_genai() if self.api_key else None
+        self._mock_mode = sdk is None
         if self._mock_mode:
             logger.warning(
                 "GEMINI_API_KEY not set or google-generativeai missing; running in mock mode."
             )
         else:  # pragma: no cover - requires actual API access
-            genai.configure(api_key=self.api_key)
+            transport = self._transport_options()
+            sdk.configure(api_key=self.api_key, **transport)
+            self._sync_transport = transport.get("transport") == "rest"
 
     @property
     def mock_mode(self) -> bool:
         return self._mock_mode
 
+    def pool_stats(self) -> Dict[str, int]:
+        with self._pool_lock:
+            return {
+                "size": len(self._pool),
+                "capacity": self.pool_size,
+                "hits": self._pool_hits,
+                "misses": self._pool_misses,
+            }
+
     def generate(
         self,
         system_prompt: str,
         user_prompt: str,
         *,
         temperature: Optional[float] = None,
+        persona: Optional[str] = None,
+        use_cache: bool = True,
+        role: Optional[str] = None,
     ) -> str:
-        """Generate text using Gemini or return a deterministic stub in mock mode."""
+        """Generate text using Gemini or return a deterministic stub in mock mode.
+
+        ``persona`` carries per-call instructions (speaker, topic, stance) in the
+        user turn so ``system_prompt`` can stay stable and its model is pooled.
+        ``use_cache=False`` bypasses the response cache for this call. ``role``
+        (argument, rebuttal, judge) selects the latency history used for hedging
+        and, under a debate deadline, whether the output length may be capped.
+        """
         if self._mock_mode:
+            LLM_RESPONSES.inc(outcome="mock")
             return self._mock_response(system_prompt, user_prompt)
 
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            system_instruction=system_prompt,
-        )
+        cache_key, cached = self._cache_lookup(system_prompt, user_prompt, temperature, persona, use_cache)
+        if cached is not None:
+            LLM_RESPONSES.inc(outcome="cached")
+            return cached
+
+        model = self._model(system_prompt)
+        contents = self._user_turn(user_prompt, persona)
+        deadline = current_deadline()
+        cap = deadline.output_cap(role) if deadline else None
+        config = self._generation_config(temperature, cap)
+        tokens = self._estimate_tokens(system_prompt, contents)
         try:  # pragma: no cover - network interaction
-            response = model.generate_content(
-                user_prompt,
-                generation_config={"temperature": temperature or self.temperature},
-            )
-            text = getattr(response, "text", "") or ""
-            return text.strip()
+            with stage("llm.generate", model=self.model_name):
+                call = partial(
+                    self.limiter.call,
+                    lambda timeout: model.generate_content(
+                        contents, generation_config=config, request_options={"timeout": timeout}
+                    ),
+                    tokens=tokens,
+                    budget=deadline.call_budget(role) if deadline else None,
+                )
+                response = self.hedging.run(role, call) if self.hedging else call()
+            self.limiter.settle(tokens, self._usage_tokens(response))
+            text = self._response_text(response)
+        except DeadlineExceeded as exc:
+            LLM_RESPONSES.inc(outcome="failed")
+            logger.warning("Gemini generation gave up: {}", exc)
+            if deadline is not None:
+                deadline.degrade("calls_timed_out")
+            return ""
         except Exception as exc:  # pragma: no cover
+            LLM_RESPONSES.inc(outcome="failed")
             logger.exception("Gemini generation failed: {}", exc)
             return ""
+        LLM_RESPONSES.inc(outcome="ok" if text else "empty")
+        # A length-capped answer is fine for this debate but not worth replaying.
+        return self._cache_store(cache_key if cap is None else None, text)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: Optional[float] = None,
+        persona: Optional[str] = None,
+        use_cache: bool = True,
+        role: Optional[str] = None,
+    ) -> str:
+        """Async counterpart of :meth:`generate` built on the SDK's async API.
+
+        Each upstream request holds a slot of the batch limiter bound to the
+        current task, if any; a hedged duplicate takes a slot of its own.
+        """
+        if self._mock_mode:
+            LLM_RESPONSES.inc(outcome="mock")
+            async with llm_slot():
+                return self._mock_response(system_prompt, user_prompt)
+
+        cache_key, cached = self._cache_lookup(system_prompt, user_prompt, temperature, persona, use_cache)
+        if cached is not None:
+            LLM_RESPONSES.inc(outcome="cached")
+            return cached
+
+        model = self._model(system_prompt)
+        contents = self._user_turn(user_prompt, persona)
+        deadline = current_deadline()
+        cap = deadline.output_cap(role) if deadline else None
+        config = self._generation_config(temperature, cap)
+        tokens = self._estimate_tokens(system_prompt, contents)
+        try:  # pragma: no cover - network interaction
+            with stage("llm.generate", model=self.model_name):
+                call = partial(
+                    self._in_llm_slot,
+                    partial(
+                        self.limiter.acall,
+                        partial(self._agenerate_content, model, contents, config),
+                        tokens=tokens,
+                        budget=deadline.call_budget(role) if deadline else None,
+                    ),
+                )
+                response = await (self.hedging.arun(role, call) if self.hedging else call())
+            self.limiter.settle(tokens, self._usage_tokens(response))
+            text = self._response_text(response)
+        except DeadlineExceeded as exc:
+            LLM_RESPONSES.inc(outcome="failed")
+            logger.warning("Gemini generation gave up: {}", exc)
+            if deadline is not None:
+                deadline.degrade("calls_timed_out")
+            return ""
+        except Exception as exc:  # pragma: no cover
+            LLM_RESPONSES.inc(outcome="failed")
+            logger.exception("Gemini generation failed: {}", exc)
+            return ""
+        LLM_RESPONSES.inc(outcome="ok" if text else "empty")
+        # A length-capped answer is fine for this debate but not worth replaying.
+        return self._cache_store(cache_key if cap is None else None, text)
+
+    def _cache_lookup(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float],
+        persona: Optional[str],
+        use_cache: bool,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Return ``(key, cached_text)``; key is ``None`` when caching is off."""
+        if self.cache is None:
+            return None, None
+        if not use_cache:
+            self.cache.record_bypass()
+            return None, None
+        key = ResponseCache.key(
+            self.model_name,
+            system_prompt,
+            persona or "",
+            user_prompt,
+            self._generation_config(temperature)["temperature"],
+        )
+        return key, self.cache.get(key)
+
+    def _cache_store(self, key: Optional[str], text: str) -> str:
+        # Empty text means the call failed or was blocked; never pin that.
+        if key is not None and text:
+            self.cache.set(key, text)
+        return text
+
+    def _model(self, system_prompt: str):
+        """Return a pooled GenerativeModel for this system instruction."""
+        key = (self.model_name, system_prompt)
+        with self._pool_lock:
+            model = self._pool.get(key)
+            if model is not None:
+                self._pool.move_to_end(key)
+                self._pool_hits += 1
+                return model
+            self._pool_misses += 1
+        if self.simulator is not None:
+            model = self.simulator.model(self.model_name, system_prompt)
+        else:
+            model = genai.GenerativeModel(
+                model_name=self.model_name,
+                system_instruction=system_prompt,
+            )
+        with self._pool_lock:
+            self._pool[key] = model
+            self._pool.move_to_end(key)
+            while len(self._pool) > max(self.pool_size, 1):
+                self._pool.popitem(last=False)
+        return model
+
+    @staticmethod
+    async def _in_llm_slot(call: Callable[[], Awaitable[T]]) -> T:
+        async with llm_slot():
+            return await call()
+
+    def _agenerate_content(self, model, contents: str, config: dict, timeout: float):
+        options = {"timeout": timeout}
+        if self._sync_transport:
+            return asyncio.to_thread(
+                model.generate_content, contents, generation_config=config, request_options=options
+            )
+        return model.generate_content_async(contents, generation_config=config, request_options=options)
+
+    @staticmethod
+    def _transport_options() -> dict:
+        # GEMINI_API_ENDPOINT points the SDK's REST transport elsewhere, e.g. at
+        # ``python -m src.services.fake_gemini`` for offline load tests.
+        endpoint = os.getenv("GEMINI_API_ENDPOINT")
+        if not endpoint:
+            return {}
+        return {"transport": "rest", "client_options": {"api_endpoint": endpoint}}
+
+    @staticmethod
+    def _user_turn(user_prompt: str, persona: Optional[str]) -> str:
+        if not persona:
+            return user_prompt
+        return f"{persona}\n\n{user_prompt}"
+
+    def _generation_config(
+        self, temperature: Optional[float], max_output_tokens: Optional[int] = None
+    ) -> dict:
+        config = {"temperature": temperature or self.temperature}
+        if max_output_tokens is not None:
+            config["max_output_tokens"] = max_output_tokens
+        return config
+
+    @staticmethod
+    def _estimate_tokens(system_prompt: str, contents: str) -> int:
+        # Charged to the tokens-per-minute bucket up front; settled against usage after.
+        return (len(system_prompt) + len(contents) + 3) // 4
+
+    @staticmethod
+    def _usage_tokens(response) -> int:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return 0
+        names = ("total_token_count", "prompt_token_count", "candidates_token_count")
+        counts = usage if isinstance(usage, dict) else {name: getattr(usage, name, 0) for name in names}
+        total = counts.get("total_token_count") or (
+            (counts.get("prompt_token_count") or 0) + (counts.get("candidates_token_count") or 0)
+        )
+        return int(total)
+
+    @staticmethod
+    def _response_text(response) -> str:
+        text = getattr(response, "text", "") or ""
+        return text.strip()
 
     def _mock_response(self, system_prompt: str, user_prompt: str) -> str:
         excerpt = user_prompt.replace("\n", " ")[:200]
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+# A turn receives the results of every completed node so far (which always
+# includes its declared dependencies) and returns the turn payload.
+TurnFunc = Callable[[Dict[str, Any]], Any]
+
+T = TypeVar("T")
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run ``awaitable`` to completion from synchronous code.
+
+    ``asyncio.run`` refuses to start inside a running loop (Jupyter, or sync
+    code called from async handlers); there the coroutine gets its own loop
+    on a worker thread instead, with the caller's context variables.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-sync") as executor:
+        return executor.submit(context.run, asyncio.run, awaitable).result()
+
+
+@dataclass
+class TurnNode:
+    key: str
+    func: TurnFunc
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class TurnGraph:
+    """Dependency graph of debate turns; ready turns run concurrently."""
+
+    nodes: Dict[str, TurnNode] = field(default_factory=dict)
+
+    def add(self, key: str, func: TurnFunc, deps: Tuple[str, ...] = ()) -> None:
+        if key in self.nodes:
+            raise ValueError(f"Duplicate turn '{key}'.")
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Turn '{key}' depends on unknown turns: {missing}")
+        self.nodes[key] = TurnNode(key=key, func=func, deps=tuple(deps))
+
+    async def stream(
+        self, task_context: Optional[Callable[[], contextvars.Context]] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ``(key, result)`` pairs in completion order.
+
+        Coroutine functions are awaited directly; plain callables are
+        offloaded to a worker thread so blocking LLM calls overlap. Turns run
+        in a fresh ``task_context()`` when given, else in a copy of the current
+        context.
+        """
+        results: Dict[str, Any] = {}
+        pending: Dict[asyncio.Task, str] = {}
+        waiting: List[TurnNode] = list(self.nodes.values())
+
+        def launch_ready() -> None:
+            for node in list(waiting):
+                if all(dep in results for dep in node.deps):
+                    waiting.remove(node)
+                    context = task_context() if task_context is not None else None
+                    task = asyncio.get_running_loop().create_task(
+                        self._invoke(node, dict(results)), context=context
+                    )
+                    pending[task] = node.key
+
+        launch_ready()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Preserve insertion order among simultaneously finished turns.
+                for task in sorted(done, key=lambda t: list(self.nodes).index(pending[t])):
+                    key = pending.pop(task)
+                    results[key] = task.result()
+                    yield key, results[key]
+                launch_ready()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def execute(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        async for key, value in self.stream():
+            results[key] = value
+        return results
+
+    @staticmethod
+    async def _invoke(node: TurnNode, results: Dict[str, Any]) -> Any:
+        if inspect.iscoroutinefunction(node.func):
+            return await node.func(results)
+        return await asyncio.to_thread(node.func, results)
+
+
+class FairLimiter:
+    """Caps in-flight LLM calls and hands free slots to owners round-robin.
+
+    Each waiting owner (typically one debate in a batch) gets its own FIFO
+    queue; when a slot frees up it goes to the next owner in rotation, so one
+    debate with many ready turns cannot starve the others.
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError("Limit must be at least 1.")
+        self.limit = limit
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.granted = 0
+        self._queues: Dict[Hashable, Deque[asyncio.Future]] = {}
+        self._rotation: Deque[Hashable] = deque()
+
+    async def acquire(self, owner: Hashable) -> None:
+        if self.in_flight < self.limit and not self._rotation:
+            self._take()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(owner)
+        if queue is None:
+            queue = self._queues[owner] = deque()
+            self._rotation.append(owner)
+        queue.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # granted just before cancellation; hand it on
+            else:
+                self._forget(owner, waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        while self.in_flight < self.limit and self._rotation:
+            owner = self._rotation.popleft()
+            queue = self._queues[owner]
+            waiter = queue.popleft()
+            if queue:
+                self._rotation.append(owner)
+            else:
+                del self._queues[owner]
+            if waiter.cancelled():
+                continue
+            self._take()
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "granted": self.granted,
+            "waiting": sum(len(queue) for queue in self._queues.values()),
+        }
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        self.granted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _forget(self, owner: Hashable, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(owner)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[owner]
+            self._rotation.remove(owner)
+
+
+# The limiter and owner for LLM calls made from the current task; batch runs
+# set them per debate and every turn task inherits them.
+_llm_limiter: ContextVar[Optional[FairLimiter]] = ContextVar("llm_limiter", default=None)
+_llm_owner: ContextVar[Hashable] = ContextVar("llm_owner", default=None)
+
+
+def bind_llm_limiter(limiter: Optional[FairLimiter], owner: Hashable) -> None:
+    """Route LLM calls of the current task (and its children) through ``limiter``."""
+    _llm_limiter.set(limiter)
+    _llm_owner.set(owner)
+
+
+@asynccontextmanager
+async def llm_slot() -> AsyncIterator[None]:
+    """Hold one slot of the bound limiter, if any, for the duration of an LLM call."""
+    limiter = _llm_limiter.get()
+    if limiter is None:
+        yield
+        return
+    await limiter.acquire(_llm_owner.get())
+    try:
+        yield
+    finally:
+        limiter.release()
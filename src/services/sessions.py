@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from loguru import logger
+
+from src.agents.records import Turn
+
+
+class SessionNotFound(KeyError):
+    """Raised when a session id is unknown to the store."""
+
+
+class SessionStore:
+    """Server-side debate sessions as append-only turn logs.
+
+    Turns are held as compact :class:`Turn` records. Every appended turn is
+    written through to SQLite (``path``). The most recently used
+    ``max_sessions`` logs are also kept in memory so follow-up requests skip
+    the database; older ones are reloaded on demand. Sessions not appended to
+    for ``ttl`` seconds expire, and the store is periodically trimmed to the
+    ``max_stored`` most recently active ones.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        max_sessions: int = 256,
+        ttl: float = 7 * 24 * 3600,
+        max_stored: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.max_sessions = max(max_sessions, 1)
+        self.ttl = ttl
+        self.max_stored = max(max_stored, 1)
+        # session id -> (turn log, last append time)
+        self._working: "OrderedDict[str, Tuple[List[Turn], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._expired = 0
+        self._creates_since_trim = 0
+        self._db = self._open(path)
+        with self._lock:
+            self._trim(time.time())
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        return cls(
+            os.getenv("DEBATE_SESSION_DB") or "data/sessions.db",
+            max_sessions=int(os.getenv("DEBATE_SESSION_WORKING_SET", "256")),
+            ttl=float(os.getenv("DEBATE_SESSION_TTL", str(7 * 24 * 3600))),
+            max_stored=int(os.getenv("DEBATE_SESSION_MAX", "10000")),
+        )
+
+    def create(self) -> str:
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT INTO sessions (id, accessed_at) VALUES (?, ?)", (session_id, now))
+            self._keep(session_id, [], now)
+            self._creates_since_trim += 1
+            if self._creates_since_trim >= 100:
+                self._trim(now)
+        return session_id
+
+    def history(self, session_id: str) -> List[Turn]:
+        """Return the session's turns; callers must not mutate the list."""
+        with self._lock:
+            return self._load(session_id)
+
+    def append(self, session_id: str, turns: Sequence[Turn]) -> int:
+        """Append ``turns`` and return the new session length."""
+        with self._lock:
+            log = self._load(session_id)
+            start = len(log)
+            self._db.executemany(
+                "INSERT INTO turns (session_id, seq, payload) VALUES (?, ?, ?)",
+                [
+                    (session_id, start + offset, json.dumps(turn.to_dict(), separators=(",", ":")))
+                    for offset, turn in enumerate(turns)
+                ],
+            )
+            now = time.time()
+            self._db.execute("UPDATE sessions SET accessed_at = ? WHERE id = ?", (now, session_id))
+            self._working[session_id] = (log, now)
+            log.extend(turns)
+            return len(log)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0],
+                "working_set": len(self._working),
+                "capacity": self.max_sessions,
+                "loads": self._loads,
+                "expired": self._expired,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _load(self, session_id: str) -> List[Turn]:
+        entry = self._working.get(session_id)
+        if entry is not None:
+            self._working.move_to_end(session_id)
+            log, accessed_at = entry
+        else:
+            row = self._db.execute("SELECT accessed_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                raise SessionNotFound(session_id)
+            accessed_at = row[0]
+            rows = self._db.execute(
+                "SELECT payload FROM turns WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+            self._loads += 1
+            log = self._keep(session_id, [Turn.from_dict(json.loads(row[0])) for row in rows], accessed_at)
+        if accessed_at <= time.time() - self.ttl:  # expired, but not trimmed yet
+            raise SessionNotFound(session_id)
+        return log
+
+    def _keep(self, session_id: str, log: List[Turn], accessed_at: float) -> List[Turn]:
+        self._working[session_id] = (log, accessed_at)
+        self._working.move_to_end(session_id)
+        while len(self._working) > self.max_sessions:
+            self._working.popitem(last=False)
+        return log
+
+    def _trim(self, now: float) -> None:
+        """Drop expired sessions and the least recently active beyond ``max_stored``."""
+        self._creates_since_trim = 0
+        doomed = self._db.execute(
+            "SELECT id FROM sessions WHERE accessed_at <= ? "
+            "UNION SELECT id FROM (SELECT id FROM sessions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (now - self.ttl, self.max_stored),
+        ).fetchall()
+        if not doomed:
+            return
+        self._db.executemany("DELETE FROM turns WHERE session_id = ?", doomed)
+        self._db.executemany("DELETE FROM sessions WHERE id = ?", doomed)
+        for (session_id,) in doomed:
+            self._working.pop(session_id, None)
+        self._expired += len(doomed)
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            logger.info("Debate sessions persisted at {}", path)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, accessed_at REAL NOT NULL)")
+        if "accessed_at" not in {row[1] for row in db.execute("PRAGMA table_info(sessions)")}:
+            # Stores written before expiry existed: their sessions start their TTL now.
+            db.execute("ALTER TABLE sessions ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            db.execute("UPDATE sessions SET accessed_at = ?", (time.time(),))
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed_at)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS turns ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, payload TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+        return db
+
+
+def new_turns(result: Dict[str, Any], history_length: int) -> Dict[str, Any]:
+    """Trim a debate result's transcript to the turns produced by this request."""
+    trimmed = dict(result)
+    trimmed["transcript"] = result["transcript"][history_length:]
+    return trimmed
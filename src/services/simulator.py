@@ -0,0 +1,204 @@
+"""Latency-realistic stand-in for Gemini, for load and retry testing offline.
+
+:class:`SimulatedGemini` answers like the real service: each call waits a
+base latency drawn from a log-normal distribution plus time proportional to
+prompt and output tokens, a configurable share of calls fail with 429/503,
+and judge prompts get well-formed rubric JSON. It plugs in two ways:
+
+* in-process: ``LLM_SIMULATE=1`` makes :class:`GeminiLLM` hand out
+  :class:`SimulatedModel` handles in place of ``genai.GenerativeModel``, so
+  pooling, caching, limiting and error handling all run for real;
+* over HTTP: :mod:`src.services.fake_gemini` serves the same model as the
+  ``generateContent`` REST call for the real SDK to target.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from src.evaluation.rubric import DEFAULT_RUBRIC
+
+_FILLER = (
+    "evidence suggests the policy shifts incentives while costs fall on groups with the least "
+    "room to adapt so any fair assessment must weigh outcomes over time and across regions"
+).split()
+
+STATUS = {429: "RESOURCE_EXHAUSTED", 503: "UNAVAILABLE"}
+# Deferred judge prompts state how many rounds they want scored.
+_SERIES_ROUNDS = re.compile(r"Rounds to score: (\d+)")
+
+
+class SimulatedAPIError(Exception):
+    """Injected service error; ``code`` is the HTTP status like Google's API errors."""
+
+    def __init__(self, code: int) -> None:
+        super().__init__(f"{code} {STATUS[code]} (simulated)")
+        self.code = code
+        self.status = STATUS[code]
+
+
+@dataclass
+class Reply:
+    text: str
+    delay: float
+    error: Optional[int] = None
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class SimulatedGemini:
+    """Configurable latency, throughput and failure model for Gemini calls."""
+
+    latency_ms: float = 600.0  # median time to first token
+    latency_sigma: float = 0.35  # log-normal spread of that latency
+    tokens_per_second: float = 80.0  # output decoding rate
+    prefill_tokens_per_second: float = 4000.0
+    output_tokens: int = 180  # mean output length for free-text turns
+    error_rate: float = 0.0  # share of calls failing with 429 or 503
+    time_scale: float = 1.0  # multiplies every delay; <1 speeds up tests
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stats: Dict[str, float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._stats = {"calls": 0, "errors_429": 0, "errors_503": 0, "simulated_seconds": 0.0}
+
+    @classmethod
+    def from_env(cls) -> Optional["SimulatedGemini"]:
+        if os.getenv("LLM_SIMULATE", "0") != "1":
+            return None
+        seed = os.getenv("LLM_SIM_SEED")
+        return cls(
+            latency_ms=float(os.getenv("LLM_SIM_LATENCY_MS", "600")),
+            latency_sigma=float(os.getenv("LLM_SIM_SIGMA", "0.35")),
+            tokens_per_second=float(os.getenv("LLM_SIM_TOKENS_PER_SEC", "80")),
+            output_tokens=int(os.getenv("LLM_SIM_OUTPUT_TOKENS", "180")),
+            error_rate=float(os.getenv("LLM_SIM_ERROR_RATE", "0")),
+            time_scale=float(os.getenv("LLM_SIM_TIME_SCALE", "1")),
+            seed=int(seed) if seed else None,
+        )
+
+    def model(self, model_name: str, system_prompt: str = "") -> "SimulatedModel":
+        return SimulatedModel(self, model_name, system_prompt)
+
+    def plan(
+        self, model_name: str, system_prompt: str, prompt: str, max_tokens: Optional[int] = None
+    ) -> Reply:
+        """Decide the outcome of one call: response text, delay and any error."""
+        prompt_tokens = (len(system_prompt) + len(prompt) + 3) // 4
+        with self._lock:
+            base = self.latency_ms / 1000 * math.exp(self._rng.gauss(0.0, self.latency_sigma))
+            roll = self._rng.random()
+            error = None
+            if roll < self.error_rate:
+                error = 429 if roll < self.error_rate * 0.7 else 503
+            if error is None:
+                series = _SERIES_ROUNDS.search(prompt)
+                if series and '"rubric_scores"' in prompt:
+                    count = int(series.group(1))
+                    length, text = 110 * count, self._series_json(count)
+                elif '"rubric_scores"' in prompt:
+                    length, text = 110, self._judge_json()
+                else:
+                    length = max(int(self._rng.gauss(self.output_tokens, self.output_tokens / 5)), 8)
+                    length = min(length, max_tokens or length)
+                    text = self._prose(model_name, prompt, length)
+            self._stats["calls"] += 1
+        if error is not None:
+            # Rejections come back quickly: a fraction of the normal wait, no decoding.
+            delay = base * 0.2 * self.time_scale
+            with self._lock:
+                self._stats[f"errors_{error}"] += 1
+                self._stats["simulated_seconds"] += delay
+            return Reply("", delay, error, prompt_tokens)
+        delay = (
+            base + prompt_tokens / self.prefill_tokens_per_second + length / self.tokens_per_second
+        ) * self.time_scale
+        with self._lock:
+            self._stats["simulated_seconds"] += delay
+        return Reply(text, delay, None, prompt_tokens, length)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {**self._stats, "simulated_seconds": round(self._stats["simulated_seconds"], 3)}
+
+    def _prose(self, model_name: str, prompt: str, tokens: int) -> str:
+        excerpt = " ".join(prompt.split()[:12])
+        words = [self._rng.choice(_FILLER) for _ in range(max(int(tokens * 0.75), 1))]
+        return f"[SIM:{model_name}] {excerpt} — " + " ".join(words)
+
+    def _judge_json(self) -> str:
+        return json.dumps(self._verdict())
+
+    def _series_json(self, rounds: int) -> str:
+        return json.dumps({"rounds": [{"round": number, **self._verdict()} for number in range(1, rounds + 1)]})
+
+    def _verdict(self) -> Dict[str, Any]:
+        scores = {
+            metric: {
+                "A": round(self._rng.uniform(5.0, 9.0) * 2) / 2,
+                "B": round(self._rng.uniform(5.0, 9.0) * 2) / 2,
+                "notes": f"Simulated {metric} assessment.",
+            }
+            for metric in DEFAULT_RUBRIC
+        }
+        totals = {side: sum(scores[m][side] * w for m, w in DEFAULT_RUBRIC.items()) for side in ("A", "B")}
+        winner = "draw" if totals["A"] == totals["B"] else max(totals, key=totals.get)
+        return {"rubric_scores": scores, "winner": winner, "rationale": "Simulated verdict."}
+
+
+@dataclass
+class SimulatedResponse:
+    text: str
+    usage_metadata: Dict[str, int]
+
+
+class SimulatedModel:
+    """Duck-typed ``genai.GenerativeModel`` backed by :class:`SimulatedGemini`."""
+
+    def __init__(self, simulator: SimulatedGemini, model_name: str, system_instruction: str) -> None:
+        self.simulator = simulator
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+    def generate_content(
+        self, contents: str, generation_config: Any = None, request_options: Any = None
+    ) -> SimulatedResponse:
+        reply = self.simulator.plan(
+            self.model_name, self.system_instruction, contents, _max_tokens(generation_config)
+        )
+        time.sleep(reply.delay)
+        return self._finish(reply)
+
+    async def generate_content_async(
+        self, contents: str, generation_config: Any = None, request_options: Any = None
+    ) -> SimulatedResponse:
+        reply = self.simulator.plan(
+            self.model_name, self.system_instruction, contents, _max_tokens(generation_config)
+        )
+        await asyncio.sleep(reply.delay)
+        return self._finish(reply)
+
+    @staticmethod
+    def _finish(reply: Reply) -> SimulatedResponse:
+        if reply.error is not None:
+            raise SimulatedAPIError(reply.error)
+        usage = {"prompt_token_count": reply.prompt_tokens, "candidates_token_count": reply.output_tokens}
+        return SimulatedResponse(reply.text, usage)
+
+
+def _max_tokens(generation_config: Any) -> Optional[int]:
+    if isinstance(generation_config, dict):
+        return generation_config.get("max_output_tokens")
+    return getattr(generation_config, "max_output_tokens", None)
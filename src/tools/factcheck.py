@@ -1,53 +1,486 @@
-
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Dict, List
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 import httpx
-from dotenv import load_dotenv
 from loguru import logger
 
-load_dotenv()
+from src.services.env import load_env
+from src.services.metrics import FACTCHECK_RESULTS, stage
+
+load_env()
 
 FactCheckResult = Dict[str, str]
 
+T = TypeVar("T")
+
+
+class CitationBackend(Protocol):
+    """Local search backend that can stand in for Google Custom Search."""
+
+    def search(self, query: str, *, max_results: int = 3) -> List[FactCheckResult]:
+        ...
+
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class TTLCache(Generic[T]):
+    """Small thread-safe LRU whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, *, maxsize: int = 512, ttl: float = 900.0) -> None:
+        self.maxsize = max(maxsize, 1)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            # Expired entries stay (until LRU-evicted) as a fallback for stale().
+            self.misses += 1
+            return None
+
+    def stale(self, key: Hashable) -> Optional[T]:
+        """The last value stored for ``key``, expired or not."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[1] if entry is not None else None
+
+    def set(self, key: Hashable, value: T) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class CircuitBreaker:
+    """Rolling failure-rate breaker for an upstream dependency.
+
+    Closed, it tracks the last ``window`` calls; once at least ``min_calls``
+    are in and ``failure_rate`` of them failed (errors, or answers slower than
+    ``slow_call`` seconds) it opens and rejects calls for ``open_for``
+    seconds. Then it is half-open: ``probes`` trial calls go through, and the
+    first result closes it again or reopens it. Calls the caller cut short
+    (its own time-box or a cancellation) only count once they have taken
+    longer than ``slow_call``.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call: float = 3.0,
+        open_for: float = 30.0,
+        probes: int = 1,
+    ) -> None:
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.open_for = open_for
+        self.probes = probes
+        self.state = "closed"
+        self.trips = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=max(window, 1))  # True marks a failure
+        self._opened_at = 0.0
+        self._probing = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        return cls(
+            window=int(os.getenv("FACTCHECK_BREAKER_WINDOW", "20")),
+            failure_rate=float(os.getenv("FACTCHECK_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call=float(os.getenv("FACTCHECK_BREAKER_SLOW_CALL", "3")),
+            open_for=float(os.getenv("FACTCHECK_BREAKER_OPEN_SECONDS", "30")),
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; a granted half-open probe must be recorded."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.open_for:
+                    self.rejected += 1
+                    return False
+                self.state, self._probing = "half_open", 0
+            if self.state == "half_open":
+                if self._probing >= self.probes:
+                    self.rejected += 1
+                    return False
+                self._probing += 1
+            return True
+
+    def record(self, ok: bool, elapsed: float = 0.0, *, cut_short: bool = False) -> None:
+        failed = not ok or elapsed > self.slow_call
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = max(self._probing - 1, 0)
+                if cut_short and elapsed <= self.slow_call:
+                    return  # no verdict; the next caller probes again
+                if failed:
+                    self._trip()
+                else:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    logger.info("Fact-check circuit closed again")
+                return
+            if self.state == "open" or (cut_short and elapsed <= self.slow_call):
+                return  # a call that started before the trip, or one with no verdict
+            self._outcomes.append(failed)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and sum(self._outcomes) / calls >= self.failure_rate:
+                self._trip()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "failure_rate": round(sum(self._outcomes) / calls, 3) if calls else 0.0,
+                "window_calls": calls,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+    def _trip(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.trips += 1
+        logger.warning(
+            "Fact-check circuit open for {:.1f}s; serving cached or empty citations", self.open_for
+        )
+
 
 class FactChecker:
-    """Thin wrapper around Google Custom Search for citations."""
+    """Thin wrapper around Google Custom Search for citations.
+
+    HTTP connections are pooled for the lifetime of the checker, results are
+    cached per normalized query, and concurrent identical lookups share a
+    single upstream request. A ``backend`` (or ``FACTCHECK_BACKEND=local``)
+    answers queries from a local index instead of the network. Upstream
+    calls go through a :class:`CircuitBreaker`; while it is open, lookups
+    return the last cached results for the query (even if expired) or
+    nothing, immediately.
+    """
 
     SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        backend: Optional[CitationBackend] = None,
+        timeout: float = 10.0,
+        cache_ttl: float = 900.0,
+        cache_size: int = 512,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
         self.api_key = os.getenv("FACTCHECK_SEARCH_API_KEY")
         self.engine_id = os.getenv("FACTCHECK_SEARCH_ENGINE_ID")
-        if not self.api_key or not self.engine_id:
+        self.backend = backend if backend is not None else self._backend_from_env()
+        self.timeout = timeout
+        self.cache: TTLCache[List[FactCheckResult]] = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.breaker = breaker if breaker is not None else CircuitBreaker.from_env()
+        self._limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_keeper: Optional[AsyncIterator[None]] = None
+        self._inflight: Dict[Tuple[str, int], Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.upstream_requests = 0
+        self.coalesced = 0
+        if not self.enabled:
             logger.warning(
                 "FACTCHECK_SEARCH_API_KEY/ENGINE_ID not configured; fact-checking disabled."
             )
 
-    def search(self, query: str, *, max_results: int = 3) -> List[FactCheckResult]:
-        """Perform a lightweight search and return [{title, link, snippet}]."""
-        if not self.api_key or not self.engine_id:
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None or bool(self.api_key and self.engine_id)
+
+    @staticmethod
+    def _backend_from_env() -> Optional[CitationBackend]:
+        if os.getenv("FACTCHECK_BACKEND", "google") != "local":
+            return None
+        from src.tools.local_index import LocalCitationIndex
+
+        path = os.getenv("FACTCHECK_INDEX_PATH", "data/citation_index")
+        try:
+            return LocalCitationIndex.open(path)
+        except Exception as exc:
+            logger.warning("Local citation index at {} unavailable: {}", path, exc)
+            return None
+
+    def search(
+        self, query: str, *, max_results: int = 3, timeout: Optional[float] = None
+    ) -> List[FactCheckResult]:
+        """Perform a lightweight search and return [{title, link, snippet}].
+
+        With ``timeout``, a lookup that cannot finish in time raises
+        :class:`TimeoutError` instead of returning an empty list.
+        """
+        if not self.enabled:
+            FACTCHECK_RESULTS.inc(outcome="disabled")
+            return []
+        key = self._cache_key(query, max_results)
+        cached = self.cache.get(key)
+        if cached is not None:
+            FACTCHECK_RESULTS.inc(outcome="cached")
+            return cached
+        future, leader = self._join_flight(key)
+        if not leader:
+            if not _loop_running():
+                FACTCHECK_RESULTS.inc(outcome="coalesced")
+                return future.result(timeout)
+            # Blocking here could starve the async leader on this very loop, so
+            # look it up again, behind the same breaker as any other upstream call.
+            if not self._upstream_allowed():
+                FACTCHECK_RESULTS.inc(outcome="short_circuited")
+                return self.cache.stale(key) or []
+            FACTCHECK_RESULTS.inc(outcome="coalesced")
+            return self._fetch(query, max_results, timeout)
+        if not self._upstream_allowed():
+            return self._short_circuit(key, future)
+        results: List[FactCheckResult] = []
+        try:
+            with stage("factcheck.search"):
+                results = self._fetch(query, max_results, timeout)
+        finally:
+            self._land_flight(key, future, results)
+        return results
+
+    async def asearch(
+        self, query: str, *, max_results: int = 3, timeout: Optional[float] = None
+    ) -> List[FactCheckResult]:
+        """Non-blocking :meth:`search` sharing the same cache and in-flight table.
+
+        A lookup that outlives ``timeout`` raises :class:`TimeoutError` but keeps
+        running in the background, so its results still reach the cache.
+        """
+        if timeout is None:
+            return await self._asearch(query, max_results)
+        lookup = asyncio.ensure_future(self._asearch(query, max_results))
+        self._background.add(lookup)
+        lookup.add_done_callback(self._background.discard)
+        return await asyncio.wait_for(asyncio.shield(lookup), timeout)
+
+    async def _asearch(self, query: str, max_results: int) -> List[FactCheckResult]:
+        if not self.enabled:
+            FACTCHECK_RESULTS.inc(outcome="disabled")
             return []
-        params = {
+        key = self._cache_key(query, max_results)
+        cached = self.cache.get(key)
+        if cached is not None:
+            FACTCHECK_RESULTS.inc(outcome="cached")
+            return cached
+        future, leader = self._join_flight(key)
+        if not leader:
+            FACTCHECK_RESULTS.inc(outcome="coalesced")
+            # Shielded so a cancelled follower cannot cancel the shared future.
+            return await asyncio.shield(asyncio.wrap_future(future))
+        if not self._upstream_allowed():
+            return self._short_circuit(key, future)
+        results: List[FactCheckResult] = []
+        try:
+            with stage("factcheck.search"):
+                results = await self._afetch(query, max_results)
+        finally:
+            self._land_flight(key, future, results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend is not None else "google",
+            "cache": self.cache.stats(),
+            "upstream_requests": self.upstream_requests,
+            "coalesced": self.coalesced,
+            "breaker": self.breaker.stats() if self.backend is None else None,
+        }
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        with self._lock:
+            client, keeper = self._async_client, self._async_keeper
+            self._async_client = self._async_keeper = self._async_loop = None
+        if keeper is not None:
+            await keeper.aclose()  # type: ignore[attr-defined]
+        elif client is not None:
+            await client.aclose()
+
+    @staticmethod
+    def _cache_key(query: str, max_results: int) -> Tuple[str, int]:
+        return " ".join(query.lower().split()), max_results
+
+    def _join_flight(self, key: Tuple[str, int]) -> Tuple[Future, bool]:
+        """Return the in-flight future for ``key`` and whether we must fill it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _land_flight(self, key: Tuple[str, int], future: Future, results: List[FactCheckResult]) -> None:
+        # Failures come back as []; they resolve waiters but are not cached.
+        FACTCHECK_RESULTS.inc(outcome="ok" if results else "empty")
+        if results:
+            self.cache.set(key, results)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(results)
+
+    def _upstream_allowed(self) -> bool:
+        """Whether a lookup may be sent; counts it in ``upstream_requests`` if so."""
+        # Local backends fail fast on their own; only the network is guarded.
+        allowed = self.backend is not None or self.breaker.allow()
+        if allowed:
+            with self._lock:
+                self.upstream_requests += 1
+        return allowed
+
+    def _short_circuit(self, key: Tuple[str, int], future: Future) -> List[FactCheckResult]:
+        """Answer a lookup the open breaker refused: stale cached results, else none."""
+        results = self.cache.stale(key) or []
+        FACTCHECK_RESULTS.inc(outcome="short_circuited")
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(results)
+        return results
+
+    def _params(self, query: str, max_results: int) -> Dict[str, Any]:
+        return {
             "key": self.api_key,
             "cx": self.engine_id,
             "q": query,
             "num": max_results,
         }
+
+    def _fetch(self, query: str, max_results: int, timeout: Optional[float] = None) -> List[FactCheckResult]:
+        if self.backend is not None:
+            return self.backend.search(query, max_results=max_results)
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=self.timeout, limits=self._limits)
+        start, data, cut_short = time.monotonic(), None, False
         try:
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(self.SEARCH_URL, params=params)
-                response.raise_for_status()
-                data = response.json()
+            response = self._client.get(
+                self.SEARCH_URL, params=self._params(query, max_results), timeout=timeout or self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except httpx.TimeoutException as exc:
+            if timeout is not None:  # the caller's time-box, not necessarily a slow upstream
+                cut_short = True
+                raise TimeoutError(f"Fact-check lookup exceeded {timeout:.2f}s") from exc
+            logger.warning("Fact-check HTTP error: {}", exc)
+            return []
         except httpx.HTTPError as exc:
             logger.warning("Fact-check HTTP error: {}", exc)
             return []
         except Exception as exc:  # pragma: no cover
             logger.exception("Unexpected fact-check error: {}", exc)
             return []
+        finally:
+            self.breaker.record(data is not None, time.monotonic() - start, cut_short=cut_short)
+        return self._parse(data)
+
+    async def _afetch(self, query: str, max_results: int) -> List[FactCheckResult]:
+        if self.backend is not None:
+            # Backends are synchronous; keep even a slow one off the event loop.
+            return await asyncio.to_thread(self.backend.search, query, max_results=max_results)
+        client = await self._get_async_client()
+        start, data, cut_short = time.monotonic(), None, False
+        try:
+            response = await client.get(self.SEARCH_URL, params=self._params(query, max_results))
+            response.raise_for_status()
+            data = response.json()
+        except asyncio.CancelledError:
+            cut_short = True
+            raise
+        except httpx.HTTPError as exc:
+            logger.warning("Fact-check HTTP error: {}", exc)
+            return []
+        except Exception as exc:  # pragma: no cover
+            logger.exception("Unexpected fact-check error: {}", exc)
+            return []
+        finally:
+            # Every outcome is recorded, cancellation included, so a half-open probe is never lost.
+            self.breaker.record(data is not None, time.monotonic() - start, cut_short=cut_short)
+        return self._parse(data)
+
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        # Pooled connections are bound to the loop that opened them, and can only be
+        # closed on it. Each client is held by an async generator on its loop, which
+        # closes the client when the loop finalizes it: at shutdown (asyncio.run does
+        # this before closing the loop), or once the generator is dropped below
+        # because a later call runs on another loop.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_client is not None and self._async_loop is loop:
+                return self._async_client
+            client = self._async_client = httpx.AsyncClient(timeout=self.timeout, limits=self._limits)
+            self._async_loop = loop
+            keeper = self._async_keeper = self._hold_async_client(client)
+        await keeper.__anext__()
+        return client
+
+    @staticmethod
+    async def _hold_async_client(client: httpx.AsyncClient) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            await client.aclose()
 
+    @staticmethod
+    def _parse(data: Dict[str, Any]) -> List[FactCheckResult]:
         hits = data.get("items", []) or []
         results: List[FactCheckResult] = []
         for item in hits:
@@ -0,0 +1,355 @@
+"""Offline citation backend: a segmented BM25 index over a JSONL corpus.
+
+Each corpus line is ``{"title", "link", "snippet", "body"}``. The index lives in
+a directory of immutable segments plus a ``manifest.json``; every segment keeps
+its sorted lexicon, postings, document lengths and stored fields in flat binary
+files that are memory-mapped on open. Adding documents writes a new segment, so
+no rebuild is needed; :meth:`LocalCitationIndex.compact` merges them.
+
+Build from the command line::
+
+    python -m src.tools.local_index build corpus.jsonl data/citation_index
+    python -m src.tools.local_index add more.jsonl data/citation_index
+    python -m src.tools.local_index search data/citation_index "car free cities"
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+FactCheckResult = Dict[str, str]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class _Lexicon(Sequence[str]):
+    """Sorted term list backed by a blob and an offsets array."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def find(self, term: str) -> int:
+        idx = bisect.bisect_left(self, term)
+        if idx < len(self) and self[idx] == term:
+            return idx
+        return -1
+
+
+class _Segment:
+    """One immutable, memory-mapped slice of the index."""
+
+    FILES = (
+        "terms.dat",
+        "terms.off",
+        "postings.ptr",
+        "postings.doc",
+        "postings.tf",
+        "doclen",
+        "docs.dat",
+        "docs.off",
+    )
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lexicon = _Lexicon(self._load("terms.dat", np.uint8), self._load("terms.off", np.uint64))
+        self.postings_ptr = self._load("postings.ptr", np.uint64)
+        self.postings_doc = self._load("postings.doc", np.uint32)
+        self.postings_tf = self._load("postings.tf", np.uint16)
+        self.doclen = self._load("doclen", np.uint32)
+        self._docs = self._load("docs.dat", np.uint8)
+        self._docs_off = self._load("docs.off", np.uint64)
+        self.num_docs = len(self.doclen)
+        self.total_len = int(self.doclen.sum(dtype=np.uint64))
+
+    def _load(self, name: str, dtype) -> np.ndarray:
+        return _map(os.path.join(self.path, name), dtype)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        idx = self.lexicon.find(term)
+        if idx < 0:
+            return _EMPTY_DOCS, _EMPTY_TFS
+        start, end = int(self.postings_ptr[idx]), int(self.postings_ptr[idx + 1])
+        return self.postings_doc[start:end], self.postings_tf[start:end]
+
+    def document(self, doc_id: int) -> Dict[str, str]:
+        start, end = int(self._docs_off[doc_id]), int(self._docs_off[doc_id + 1])
+        return json.loads(self._docs[start:end].tobytes().decode("utf-8"))
+
+    def iter_terms(self) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+        for idx in range(len(self.lexicon)):
+            start, end = int(self.postings_ptr[idx]), int(self.postings_ptr[idx + 1])
+            yield self.lexicon[idx], self.postings_doc[start:end], self.postings_tf[start:end]
+
+    @classmethod
+    def write(cls, path: str, docs: Iterable[Dict[str, Any]]) -> int:
+        """Tokenize ``docs`` and write them as a new segment; returns its size."""
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        doclen: List[int] = []
+        stored: List[bytes] = []
+        for doc_id, doc in enumerate(docs):
+            tokens = tokenize(" ".join(str(doc.get(f, "")) for f in ("title", "snippet", "body")))
+            for term, tf in Counter(tokens).items():
+                postings[term].append((doc_id, min(tf, 0xFFFF)))
+            doclen.append(len(tokens))
+            stored.append(json.dumps(_fields(doc), ensure_ascii=False).encode("utf-8"))
+        cls._dump(path, postings, doclen, stored)
+        return len(doclen)
+
+    @classmethod
+    def merge(cls, path: str, segments: List["_Segment"]) -> int:
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        doclen: List[int] = []
+        stored: List[bytes] = []
+        for segment in segments:
+            base = len(doclen)
+            for term, docs, tfs in segment.iter_terms():
+                postings[term].extend(zip((docs.astype(np.int64) + base).tolist(), tfs.tolist()))
+            doclen.extend(segment.doclen.tolist())
+            for doc_id in range(segment.num_docs):
+                start, end = int(segment._docs_off[doc_id]), int(segment._docs_off[doc_id + 1])
+                stored.append(segment._docs[start:end].tobytes())
+        cls._dump(path, postings, doclen, stored)
+        return len(doclen)
+
+    @staticmethod
+    def _dump(
+        path: str,
+        postings: Dict[str, List[Tuple[int, int]]],
+        doclen: List[int],
+        stored: List[bytes],
+    ) -> None:
+        os.makedirs(path, exist_ok=True)
+        terms = sorted(postings)
+        encoded = [term.encode("utf-8") for term in terms]
+        ptr = np.zeros(len(terms) + 1, dtype=np.uint64)
+        ptr[1:] = np.cumsum([len(postings[term]) for term in terms], dtype=np.uint64)
+        pairs = np.array([pair for term in terms for pair in postings[term]], dtype=np.uint32).reshape(-1, 2)
+        arrays = {
+            "terms.dat": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "terms.off": _offsets(encoded),
+            "postings.ptr": ptr,
+            "postings.doc": pairs[:, 0].astype(np.uint32),
+            "postings.tf": pairs[:, 1].astype(np.uint16),
+            "doclen": np.asarray(doclen, dtype=np.uint32),
+            "docs.dat": np.frombuffer(b"".join(stored), dtype=np.uint8),
+            "docs.off": _offsets(stored),
+        }
+        for name, array in arrays.items():
+            array.tofile(os.path.join(path, name))
+
+
+class LocalCitationIndex:
+    """BM25 citation search over a local corpus, usable as a FactChecker backend."""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path: str, *, k1: float = 1.2, b: float = 0.75) -> None:
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._segments = [_Segment(os.path.join(path, name)) for name in self._manifest["segments"]]
+
+    @classmethod
+    def build(cls, corpus_path: str, path: str, **kwargs: Any) -> "LocalCitationIndex":
+        """Index a JSONL corpus into ``path``, replacing any existing manifest."""
+        os.makedirs(path, exist_ok=True)
+        _write_json(os.path.join(path, cls.MANIFEST), {"segments": [], "next_segment": 0})
+        index = cls(path, **kwargs)
+        index.add(_read_jsonl(corpus_path))
+        return index
+
+    @classmethod
+    def open(cls, path: str, *, create: bool = False, **kwargs: Any) -> "LocalCitationIndex":
+        """Open the index at ``path``; with ``create``, start an empty one if there is none.
+
+        Raises :class:`FileNotFoundError` when ``path`` holds no index and
+        ``create`` is false.
+        """
+        if create and not os.path.exists(os.path.join(path, cls.MANIFEST)):
+            os.makedirs(path, exist_ok=True)
+            _write_json(os.path.join(path, cls.MANIFEST), {"segments": [], "next_segment": 0})
+        return cls(path, **kwargs)
+
+    @property
+    def num_docs(self) -> int:
+        return sum(segment.num_docs for segment in self._segments)
+
+    def add(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Append documents as a new segment without touching existing ones."""
+        with self._lock:
+            name = f"seg-{self._manifest['next_segment']:05d}"
+            count = _Segment.write(os.path.join(self.path, name), docs)
+            if not count:
+                _remove_segment(os.path.join(self.path, name))
+                return 0
+            self._commit(self._manifest["segments"] + [name], self._manifest["next_segment"] + 1)
+            self._segments = self._segments + [_Segment(os.path.join(self.path, name))]
+        logger.info("Indexed {} citation documents into {}", count, name)
+        return count
+
+    def compact(self) -> None:
+        """Merge all segments into one to keep per-query overhead flat."""
+        with self._lock:
+            if len(self._segments) < 2:
+                return
+            name = f"seg-{self._manifest['next_segment']:05d}"
+            _Segment.merge(os.path.join(self.path, name), self._segments)
+            stale = list(self._manifest["segments"])
+            self._commit([name], self._manifest["next_segment"] + 1)
+            self._segments = [_Segment(os.path.join(self.path, name))]
+        for old in stale:
+            _remove_segment(os.path.join(self.path, old))
+
+    def search(self, query: str, *, max_results: int = 3) -> List[FactCheckResult]:
+        """Return the top BM25 hits as ``[{title, link, snippet}]``."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        segments = self._segments
+        num_docs = sum(segment.num_docs for segment in segments)
+        if not terms or not num_docs or max_results < 1:
+            return []
+        avgdl = max(sum(segment.total_len for segment in segments) / num_docs, 1.0)
+
+        per_segment = [[segment.postings(term) for term in terms] for segment in segments]
+        df = np.array([sum(len(hits[i][0]) for hits in per_segment) for i in range(len(terms))], dtype=np.float64)
+        idf = np.log1p((num_docs - df + 0.5) / (df + 0.5))
+
+        candidates: List[Tuple[float, int, int]] = []
+        for seg_idx, (segment, hits) in enumerate(zip(segments, per_segment)):
+            docs, scores = self._score(segment, hits, idf, avgdl)
+            if not len(docs):
+                continue
+            top = np.argpartition(-scores, min(max_results, len(docs)) - 1)[:max_results]
+            candidates.extend((float(scores[i]), seg_idx, int(docs[i])) for i in top)
+
+        candidates.sort(key=lambda item: (-item[0], item[1], item[2]))
+        return [segments[seg_idx].document(doc_id) for _, seg_idx, doc_id in candidates[:max_results]]
+
+    def _score(
+        self,
+        segment: _Segment,
+        hits: List[Tuple[np.ndarray, np.ndarray]],
+        idf: np.ndarray,
+        avgdl: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        docs_parts, score_parts = [], []
+        for (docs, tfs), term_idf in zip(hits, idf):
+            if not len(docs):
+                continue
+            tf = tfs.astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * segment.doclen[docs] / avgdl)
+            docs_parts.append(docs)
+            score_parts.append(term_idf * tf * (self.k1 + 1.0) / (tf + norm))
+        if not docs_parts:
+            return _EMPTY_DOCS, np.empty(0, dtype=np.float32)
+        docs = np.concatenate(docs_parts)
+        unique, inverse = np.unique(docs, return_inverse=True)
+        return unique, np.bincount(inverse, weights=np.concatenate(score_parts))
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        manifest_path = os.path.join(self.path, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No citation index at {self.path} (missing {self.MANIFEST})")
+        with open(manifest_path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _commit(self, segments: List[str], next_segment: int) -> None:
+        manifest = {"segments": segments, "next_segment": next_segment}
+        _write_json(os.path.join(self.path, self.MANIFEST), manifest)
+        self._manifest = manifest
+
+
+_EMPTY_DOCS = np.empty(0, dtype=np.uint32)
+_EMPTY_TFS = np.empty(0, dtype=np.uint16)
+
+
+def _fields(doc: Dict[str, Any]) -> FactCheckResult:
+    snippet = doc.get("snippet") or str(doc.get("body", ""))[:200]
+    return {
+        "title": doc.get("title", "Reference"),
+        "link": doc.get("link", ""),
+        "snippet": snippet,
+    }
+
+
+def _offsets(chunks: List[bytes]) -> np.ndarray:
+    offsets = np.zeros(len(chunks) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(chunk) for chunk in chunks], dtype=np.uint64)
+    return offsets
+
+
+def _map(path: str, dtype) -> np.ndarray:
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_json(path: str, payload: Dict[str, Any]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle)
+    os.replace(tmp, path)
+
+
+def _remove_segment(path: str) -> None:
+    for name in _Segment.FILES:
+        try:
+            os.remove(os.path.join(path, name))
+        except FileNotFoundError:
+            pass
+    try:
+        os.rmdir(path)
+    except OSError:  # pragma: no cover - still mapped on some platforms
+        logger.warning("Could not remove merged segment {}", path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover - CLI helper
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) != 3 or args[0] not in {"build", "add", "search"}:
+        raise SystemExit("usage: local_index (build|add) CORPUS.jsonl INDEX_DIR | search INDEX_DIR QUERY")
+    command = args[0]
+    if command == "build":
+        index = LocalCitationIndex.build(args[1], args[2])
+        print(f"indexed {index.num_docs} documents")
+    elif command == "add":
+        index = LocalCitationIndex.open(args[2], create=True)
+        print(f"added {index.add(_read_jsonl(args[1]))} documents")
+    else:
+        for hit in LocalCitationIndex.open(args[1]).search(args[2], max_results=5):
+            print(json.dumps(hit, ensure_ascii=False))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
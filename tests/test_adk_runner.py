@@ -0,0 +1,174 @@
+from pathlib import Path
+from types import SimpleNamespace
+import asyncio
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.services.adk_runner import ADKDebateRuntime
+from src.tools.factcheck import FactChecker
+
+
+class FakeSessionService:
+    def __init__(self):
+        self.sessions = {}
+
+    async def create_session(self, *, app_name, user_id, session_id):
+        self.sessions[(user_id, session_id)] = []
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        del self.sessions[(user_id, session_id)]
+
+
+class FakeRunner:
+    instances = 0
+
+    def __init__(self, app):
+        FakeRunner.instances += 1
+        self.session_service = FakeSessionService()
+
+    async def run_async(self, *, user_id, session_id, new_message):
+        history = self.session_service.sessions[(user_id, session_id)]
+        history.append(new_message.parts[0].text)
+        yield SimpleNamespace(id=str(len(history)), author="debater_pro", content=new_message)
+
+    async def close(self):
+        pass
+
+
+def fake_dependencies(self):
+    types_mod = SimpleNamespace(
+        Content=lambda role, parts: SimpleNamespace(role=role, parts=parts),
+        Part=lambda text: SimpleNamespace(text=text),
+    )
+    return {"InMemoryRunner": FakeRunner, "FunctionTool": lambda func: func, "types": types_mod}
+
+
+def build_runtime(monkeypatch, **kwargs):
+    monkeypatch.setattr(ADKDebateRuntime, "_load_dependencies", fake_dependencies)
+    monkeypatch.setattr(ADKDebateRuntime, "_build_app", lambda self: object())
+    return ADKDebateRuntime(fact_checker=None, **kwargs)
+
+
+def test_runner_is_shared_and_sessions_carry_state(monkeypatch):
+    FakeRunner.instances = 0
+    runtime = build_runtime(monkeypatch)
+
+    async def scenario():
+        first = await runtime.run("Topic one")
+        again = await runtime.run("Follow up", session_id=first["session_id"])
+        other = await runtime.run("Topic two")
+        return first, again, other
+
+    first, again, other = asyncio.run(scenario())
+
+    assert FakeRunner.instances == 1
+    assert again["session_id"] == first["session_id"]
+    assert again["events"][0]["id"] == "2"
+    assert other["events"][0]["id"] == "1"
+    assert runtime.stats()["created"] == 2
+
+
+def test_sessions_are_evicted_by_capacity_and_idle_ttl(monkeypatch):
+    runtime = build_runtime(monkeypatch, max_sessions=2, session_ttl=60)
+    service = runtime._runner.session_service
+
+    async def scenario():
+        for name in ("a", "b", "c"):
+            await runtime.run("Topic", session_id=name)
+        assert set(service.sessions) == {("adk-demo", "b"), ("adk-demo", "c")}
+        for slot in runtime._sessions.values():
+            slot.last_used -= 120
+        await runtime.run("Topic", session_id="d")
+
+    asyncio.run(scenario())
+
+    assert set(service.sessions) == {("adk-demo", "d")}
+    assert runtime.stats()["evicted"] == 3
+
+
+def test_stream_yields_each_event_before_the_run_finishes(monkeypatch):
+    runtime = build_runtime(monkeypatch)
+    release = asyncio.Event()
+
+    async def run_async(*, user_id, session_id, new_message):
+        yield SimpleNamespace(id="1", author="debater_pro", content=new_message)
+        await release.wait()
+        yield SimpleNamespace(id="2", author="debate_judge", content=None)
+
+    runtime._runner.run_async = run_async
+
+    async def scenario():
+        frames = runtime.astream("Topic", session_id="s")
+        start = await frames.__anext__()
+        first = await frames.__anext__()
+        release.set()
+        rest = [frame async for frame in frames]
+        return start, first, rest
+
+    start, first, rest = asyncio.run(scenario())
+
+    assert start["data"]["session_id"] == "s"
+    assert first["event"] == "event" and first["data"]["author"] == "debater_pro"
+    assert first["data"]["content"] == ["Topic"]
+    assert [frame["event"] for frame in rest] == ["event", "done"]
+    assert rest[-1]["data"]["events"] == 2
+
+
+def test_runner_failures_surface_before_the_start_frame(monkeypatch):
+    runtime = build_runtime(monkeypatch)
+
+    async def run_async(*, user_id, session_id, new_message):
+        raise RuntimeError("model quota exhausted")
+        yield
+
+    runtime._runner.run_async = run_async
+
+    async def scenario():
+        frames = runtime.astream("Topic", session_id="s")
+        try:
+            await frames.__anext__()
+        except RuntimeError as exc:
+            return str(exc)
+
+    assert asyncio.run(scenario()) == "model quota exhausted"
+    assert runtime._sessions[("adk-demo", "s")].ready
+
+
+class SlowBackend:
+    def search(self, query, *, max_results=3):
+        time.sleep(0.2)
+        return [{"title": f"About {query}", "link": "https://example.org", "snippet": ""}]
+
+
+def test_fact_check_tool_times_out_without_blocking_the_loop(monkeypatch):
+    monkeypatch.setattr(ADKDebateRuntime, "_load_dependencies", fake_dependencies)
+    monkeypatch.setattr(ADKDebateRuntime, "_build_app", lambda self: object())
+    runtime = ADKDebateRuntime(fact_checker=FactChecker(backend=SlowBackend()), fact_timeout=0.05)
+    fact_check = runtime._create_fact_tool()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        background = asyncio.ensure_future(ticker())
+        first = await fact_check("solar subsidies")
+        await asyncio.sleep(0.3)
+        background.cancel()
+        second = await fact_check("Solar  subsidies")
+        return first, second, ticks
+
+    first, second, ticks = asyncio.run(scenario())
+
+    assert first["status"] == "timeout"
+    assert ticks >= 10
+    assert second["status"] == "ok"
+    assert second["results"][0]["title"] == "About solar subsidies"
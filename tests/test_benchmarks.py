@@ -0,0 +1,35 @@
+from pathlib import Path
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import suite
+
+
+def test_suite_writes_comparable_results(tmp_path):
+    out = tmp_path / "run.json"
+    argv = [
+        "--targets", "manager", "factcheck",
+        "--rounds", "1",
+        "--concurrency", "2",
+        "--topics", "2",
+        "--debates", "2",
+        "--time-scale", "0.005",
+        "--out", str(out),
+    ]
+    assert suite.main(argv) == 0
+
+    report = json.loads(out.read_text())
+    row = report["results"]["manager"][0]
+    assert row["debates"] == 2 and row["throughput_per_s"] > 0
+    assert {"p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "alloc_peak_kb"} <= set(row)
+    assert set(row["stages"]) == {"argument", "rebuttal", "judge"}
+    assert report["results"]["factcheck"][0]["upstream_requests"] == 2
+
+    slower = json.loads(out.read_text())
+    slower["results"]["manager"][0]["p95_ms"] = row["p95_ms"] * 2
+    assert suite.compare(slower, report, tolerance=0.25)
+    assert not suite.compare(report, report, tolerance=0.25)
@@ -0,0 +1,365 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+import threading
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.agents.debaters import DebaterA, DebaterB
+from src.agents.judge import Judge
+from src.agents.records import Turn, to_primitive
+from src.agents.transcript import (
+    DEBATER_WINDOW,
+    JUDGE_WINDOW,
+    SummaryWindow,
+    Transcript,
+    TranscriptDigest,
+    summarize,
+)
+from src.services.deadline import MIN_JUDGE_BUDGET, DebateDeadline, current_deadline
+from src.services.debate import DebateManager
+from src.services.runtime import GeminiLLM
+from src.services.scheduler import FairLimiter, llm_slot
+from src.services.simulator import SimulatedGemini
+from src.tools.factcheck import FactChecker
+
+
+class SlowLLM(GeminiLLM):
+    """Mock-mode LLM that sleeps to expose scheduling overlap."""
+
+    delay = 0.05
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def generate(self, system_prompt, user_prompt, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return super().generate(system_prompt, user_prompt, **kwargs)
+
+    async def agenerate(self, system_prompt, user_prompt, **kwargs):
+        async with llm_slot():
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(self.delay)
+            self.in_flight -= 1
+        return self._mock_response(system_prompt, user_prompt)
+
+
+def build_manager(llm):
+    return DebateManager(
+        debater_a=DebaterA(name="Alice", stance="pro", llm=llm),
+        debater_b=DebaterB(name="Blake", stance="con", llm=llm),
+        judge=Judge(llm=llm),
+    )
+
+
+def test_independent_turns_overlap_and_keep_transcript_order():
+    llm = SlowLLM()
+    result = build_manager(llm).run("Should AI moderate debates?", rounds=2)
+
+    assert llm.peak >= 2
+    agents = [(turn["agent"], turn["type"]) for turn in result["transcript"]]
+    assert agents == [
+        ("Alice", "argument"),
+        ("Blake", "argument"),
+        ("Alice", "rebuttal"),
+        ("Blake", "rebuttal"),
+    ] * 2
+    assert [r["round"] for r in result["rounds"]] == [1, 2]
+    assert result["rounds"][1]["A"]["argument"] is result["transcript"][4]
+
+
+def test_second_round_sees_first_round_history():
+    result = build_manager(GeminiLLM()).run("Should AI moderate debates?", rounds=2)
+    second = result["rounds"][1]["A"]["argument"]["text"]
+    assert "Alice (argument)" in second
+
+
+def test_async_run_matches_sync_shape():
+    llm = SlowLLM()
+    manager = build_manager(llm)
+    async_result = asyncio.run(manager.arun("Should AI moderate debates?", rounds=2))
+    sync_result = manager.run("Should AI moderate debates?", rounds=2)
+
+    assert llm.peak >= 2
+    assert async_result == sync_result
+
+
+def test_batch_caps_in_flight_calls_and_reports_every_debate():
+    llm = SlowLLM()
+    llm.delay = 0.01
+    requests = [{"topic": f"Topic number {i}", "rounds": 1} for i in range(4)] + [{"topic": " "}]
+
+    entries = build_manager(llm).run_batch(requests, max_in_flight=3)
+
+    assert 2 <= llm.peak <= 3
+    assert [entry["index"] for entry in entries] == list(range(5))
+    assert all(entry["result"]["topic"] == f"Topic number {i}" for i, entry in enumerate(entries[:4]))
+    assert entries[4]["error"] == "Topic is required."
+
+
+def test_fair_limiter_grants_round_robin_across_owners():
+    async def scenario():
+        limiter = FairLimiter(1)
+        order = []
+        await limiter.acquire("holder")
+
+        async def call(owner):
+            await limiter.acquire(owner)
+            order.append(owner)
+            limiter.release()
+
+        tasks = [asyncio.ensure_future(call(owner)) for owner in ("a", "a", "a", "b")]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "a", "a"]
+
+
+def test_records_round_trip_to_the_json_shape():
+    history = [{"agent": "Alice", "stance": "pro", "text": "Earlier point", "citations": [], "type": "argument"}]
+    result = build_manager(GeminiLLM()).run("Should AI moderate debates?", context={"history": history})
+
+    first = result["transcript"][0]
+    assert isinstance(first, Turn)
+    assert first.agent is sys.intern("Alice")
+    payload = to_primitive(result)
+    assert payload["transcript"][0] == history[0]
+    assert set(payload["transcript"][4]) == {"agent", "stance", "text", "type"}
+    assert set(payload["rounds"][0]["judgement"]) == {"rubric_scores", "scores", "winner", "rationale"}
+    assert Turn.from_dict(payload["transcript"][1]) == result["transcript"][1]
+
+
+def test_transcript_views_match_full_recompute():
+    turns = [Turn(agent=f"agent{i % 2}", stance="pro", text=f"turn {i} " * 20, type="argument") for i in range(11)]
+    transcript = Transcript(turns[:3])
+    early = transcript.view()
+    transcript.extend(turns[3:])
+    late = transcript.view()
+
+    assert len(early) == 3 and list(early) == turns[:3] and early[-1] is turns[2]
+    for view, prefix in ((early, turns[:3]), (late, turns)):
+        for kind in ("debater", "judge"):
+            assert summarize(view, kind) == summarize(list(prefix), kind)
+    assert summarize([], "judge") == "No turns yet."
+
+
+def test_transcript_digest_compacts_each_block_once():
+    llm = SlowLLM()
+    calls = []
+    original = llm.generate
+
+    def counting(system_prompt, user_prompt, **kwargs):
+        calls.append(user_prompt)
+        return original(system_prompt, user_prompt, **kwargs)
+
+    llm.generate = counting
+    digest = TranscriptDigest(llm=llm, block_size=4, keep_recent=4)
+    turns = [Turn(agent="Alice", stance="pro", text=f"point {i}", type="argument") for i in range(12)]
+
+    first = Transcript(turns, digest=digest)
+    first.compact()
+    assert len(calls) == 2
+    assert first.view().summary("judge").startswith("Earlier: ")
+
+    replay = Transcript(turns, digest=digest)
+    replay.compact()
+    assert len(calls) == 2
+    assert replay.digest == first.digest
+
+
+def test_every_turn_reaches_the_digest_or_the_recent_summary():
+    llm = GeminiLLM()
+    digest = TranscriptDigest(llm=llm)  # default block_size / keep_recent
+    turns = [Turn(agent="Alice", stance="pro", text=f"T{i:02d}", type="argument") for i in range(20)]
+    transcript = Transcript(turns, digest=digest)
+    transcript.compact()
+
+    view = transcript.view()
+    for kind in ("debater", "judge"):
+        recent = view.summary(kind).split(" | ", 1)[1]
+        for index, turn in enumerate(turns):
+            assert index < transcript._digested or turn.text in recent, (kind, turn.text)
+
+
+def test_long_history_is_formatted_only_as_far_back_as_the_summaries_reach(monkeypatch):
+    formatted = []
+    original = SummaryWindow.format
+
+    def counting(self, turn):
+        formatted.append(turn)
+        return original(self, turn)
+
+    monkeypatch.setattr(SummaryWindow, "format", counting)
+    turns = [Turn(agent=f"agent{i % 2}", stance="pro", text=f"turn {i}", type="argument") for i in range(1000)]
+
+    transcript = Transcript(turns)
+    assert len(formatted) == DEBATER_WINDOW.size + JUDGE_WINDOW.size
+    for kind in ("debater", "judge"):
+        assert transcript.view().summary(kind) == summarize(turns, kind)
+
+    digest = TranscriptDigest(llm=GeminiLLM(), block_size=4, keep_recent=4)
+    seeded = Transcript(turns[:10], digest=digest)
+    appended = Transcript(digest=digest)
+    for turn in turns[:10]:
+        appended.append(turn)
+    seeded.compact()
+    appended.compact()
+    assert seeded.view().summary("judge") == appended.view().summary("judge")
+    assert "turn 9" in seeded.view().summary("judge") and "turn 1..." not in seeded.view().summary("judge")
+
+
+def test_long_series_runs_with_digest_enabled():
+    llm = SlowLLM()
+    llm.delay = 0
+    manager = build_manager(llm)
+    manager.digest = TranscriptDigest(llm=llm, block_size=4, keep_recent=4)
+    result = manager.run("Should AI moderate debates?", rounds=4)
+
+    assert len(result["transcript"]) == 16
+    assert [turn.type for turn in result["transcript"][:4]] == ["argument", "argument", "rebuttal", "rebuttal"]
+
+
+def test_deadline_drops_rounds_that_cannot_fit():
+    result = build_manager(SlowLLM()).run("Should AI moderate debates?", rounds=3, deadline=0.15)
+
+    assert [r["round"] for r in result["rounds"]] == [1]
+    assert len(result["transcript"]) == 4
+    assert result["degraded"] is True
+    assert "rounds_dropped" in result["deadline"]["reasons"]
+    assert result["deadline"]["rounds_completed"] == 1
+    assert {"debater.argument", "debater.rebuttal", "judge.score"} <= set(result["deadline"]["stages_ms"])
+
+    relaxed = asyncio.run(build_manager(SlowLLM()).arun("Should AI moderate debates?", rounds=2, deadline=30))
+    assert len(relaxed["rounds"]) == 2
+    assert relaxed["degraded"] is False
+    assert "degraded" not in build_manager(GeminiLLM()).run("Should AI moderate debates?")
+
+
+def test_deadline_time_boxes_citation_lookups():
+    class SlowBackend:
+        def search(self, query, *, max_results=3):
+            time.sleep(0.6)
+            return [{"title": "Late", "link": "https://example.org", "snippet": ""}]
+
+    checker = FactChecker(backend=SlowBackend())
+    llm = GeminiLLM()
+    manager = DebateManager(
+        debater_a=DebaterA(name="Alice", stance="pro", llm=llm, fact_checker=checker),
+        debater_b=DebaterB(name="Blake", stance="con", llm=llm, fact_checker=checker),
+        judge=Judge(llm=llm),
+    )
+    result = asyncio.run(manager.arun("Should AI moderate debates?", deadline=1.5))
+
+    assert result["deadline"]["reasons"] == ["citations_timed_out"]
+    assert result["rounds"][0]["A"]["argument"].citations == ()
+    assert result["deadline"]["elapsed_ms"] < 1000
+
+
+def test_deadline_under_pressure_caps_debaters_but_not_the_judge():
+    deadline = DebateDeadline(0.0)
+
+    assert deadline.output_cap("argument") == 256
+    assert deadline.output_cap("judge") is None
+    assert deadline.citation_timeout(10.0) == 0
+    assert deadline.report()["reasons"] == ["output_capped", "citations_skipped", "deadline_exceeded"]
+
+
+def test_only_the_judge_may_run_past_the_deadline():
+    assert DebateDeadline(0.0).call_budget("argument") <= 0
+    assert DebateDeadline(0.0).call_budget("judge") == MIN_JUDGE_BUDGET
+    simulator = SimulatedGemini(latency_ms=400, tokens_per_second=4000, latency_sigma=0.0, seed=1)
+    llm = GeminiLLM(simulator=simulator, cache=None)
+
+    start = time.monotonic()
+    result = asyncio.run(build_manager(llm).arun("Should AI moderate debates?", deadline=0.2))
+
+    # Debater calls are cut off at 0.2s; only the judge's ~0.4s call runs past it.
+    assert time.monotonic() - start < 0.9
+    assert "calls_timed_out" in result["deadline"]["reasons"]
+    assert result["final_scores"]["totals"]["A"] > 0
+
+
+def test_deadline_binding_is_reset_when_the_stream_fails_or_closes_early():
+    class FailingLLM(GeminiLLM):
+        async def agenerate(self, system_prompt, user_prompt, **kwargs):
+            raise RuntimeError("upstream down")
+
+    async def caller():
+        try:
+            await build_manager(FailingLLM()).arun("Should AI moderate debates?", deadline=5)
+        except RuntimeError:
+            pass
+        assert current_deadline() is None
+
+        stream = build_manager(SlowLLM()).astream("Should AI moderate debates?", rounds=2, deadline=5)
+        async for frame in stream:
+            if frame["event"] != "start":
+                break
+        await stream.aclose()
+        return current_deadline()
+
+    assert asyncio.run(caller()) is None
+
+
+def test_deferred_judging_scores_every_round_in_one_call():
+    simulator = SimulatedGemini(latency_ms=1, time_scale=0.0, seed=3)
+    manager = build_manager(GeminiLLM(simulator=simulator, cache=None))
+
+    async def collect():
+        return [frame async for frame in manager.astream("Ban cars?", rounds=3, judging="deferred")]
+
+    frames = asyncio.run(collect())
+    assert simulator.stats()["calls"] == 12 + 1
+    events = [frame["event"] for frame in frames]
+    assert events[-4:] == ["judgement", "judgement", "judgement", "final_scores"]
+    assert "judgement" not in events[:-4]
+
+    result = frames[-1]["data"]
+    assert [r["round"] for r in result["rounds"]] == [1, 2, 3]
+    per_round = [r["judgement"].scores for r in result["rounds"]]
+    assert result["final_scores"]["per_round"] == per_round
+    assert result["final_scores"]["totals"]["A"] == sum(scores["A"] for scores in per_round)
+    assert all(r["judgement"].rationale == "Simulated verdict." for r in result["rounds"])
+
+
+def test_series_verdict_is_split_by_round_number():
+    class SeriesLLM(GeminiLLM):
+        def generate(self, system_prompt, user_prompt, **kwargs):
+            verdict = {"rubric_scores": {"logic": {"A": 8, "B": 6}}, "winner": "A", "rationale": "Sharper."}
+            return json.dumps({"rounds": [{"round": 2, **verdict}]})
+
+    judge = Judge(llm=SeriesLLM())
+    claims = [({"argument": {"text": "Cars pollute."}}, {"argument": {"text": "Cars free."}})] * 2
+    first, second = judge.score_series(claims, {"topic": "Ban cars?"})
+
+    assert first.scores == {"A": 0.0, "B": 0.0}  # missing from the verdict: placeholder scores
+    assert second.winner == "A"
+    assert second.scores == judge._aggregate_scores({"logic": {"A": 8, "B": 6}})
+
+
+def test_sync_run_works_inside_a_running_loop():
+    manager = build_manager(GeminiLLM())
+
+    async def notebook_cell():
+        result = manager.run("Should AI moderate debates?")
+        batch = manager.run_batch([{"topic": "Ban cars?"}])
+        return result, batch
+
+    result, batch = asyncio.run(notebook_cell())
+    assert len(result["rounds"]) == 1
+    assert batch[0]["result"]["topic"] == "Ban cars?"
@@ -0,0 +1,210 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.tools.factcheck import CircuitBreaker, FactChecker
+from src.tools.local_index import LocalCitationIndex
+
+
+def make_checker(monkeypatch):
+    monkeypatch.setenv("FACTCHECK_SEARCH_API_KEY", "key")
+    monkeypatch.setenv("FACTCHECK_SEARCH_ENGINE_ID", "engine")
+    checker = FactChecker()
+    calls = []
+
+    async def fake_afetch(query, max_results):
+        calls.append(query)
+        await asyncio.sleep(0.02)
+        return [{"title": query, "link": "https://example.org", "snippet": ""}]
+
+    monkeypatch.setattr(checker, "_afetch", fake_afetch)
+    return checker, calls
+
+
+def test_concurrent_identical_lookups_share_one_request(monkeypatch):
+    checker, calls = make_checker(monkeypatch)
+
+    async def burst():
+        return await asyncio.gather(
+            checker.asearch("Car bans  evidence"),
+            checker.asearch("car bans evidence"),
+            checker.asearch("CAR BANS EVIDENCE"),
+        )
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1
+    assert results[0] == results[1] == results[2]
+    assert checker.stats()["coalesced"] == 2
+
+
+def test_results_are_cached_per_normalized_query(monkeypatch):
+    checker, calls = make_checker(monkeypatch)
+    asyncio.run(checker.asearch("car bans evidence"))
+    assert checker.search(" Car Bans Evidence ") == [
+        {"title": "car bans evidence", "link": "https://example.org", "snippet": ""}
+    ]
+    assert len(calls) == 1
+
+
+def test_async_client_pools_are_closed_with_their_event_loop(monkeypatch):
+    checker, _ = make_checker(monkeypatch)
+    first = asyncio.run(checker._get_async_client())
+    assert first.is_closed
+
+    async def reuse():
+        client = await checker._get_async_client()
+        return client, await checker._get_async_client()
+
+    second, again = asyncio.run(reuse())
+    assert second is again and second is not first
+
+
+def test_breaker_fast_fails_with_stale_results_and_recovers_through_a_probe(monkeypatch):
+    monkeypatch.setenv("FACTCHECK_SEARCH_API_KEY", "key")
+    monkeypatch.setenv("FACTCHECK_SEARCH_ENGINE_ID", "engine")
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, open_for=0.05)
+    checker = FactChecker(cache_ttl=0, breaker=breaker)
+    upstream = {"calls": 0, "status": 200}
+
+    def handler(request):
+        upstream["calls"] += 1
+        return httpx.Response(upstream["status"], json={"items": [{"title": "Transit", "link": "https://t"}]})
+
+    checker._client = httpx.Client(transport=httpx.MockTransport(handler))
+    assert checker.search("public transit")[0]["link"] == "https://t"
+    upstream["status"] = 503
+    assert checker.search("car bans") == []
+    assert breaker.stats()["state"] == "open"
+
+    calls = upstream["calls"]
+    assert checker.search("public transit")[0]["link"] == "https://t"  # expired, but better than nothing
+    assert checker.search("car bans") == []
+    assert upstream["calls"] == calls
+    assert checker.stats()["breaker"]["rejected"] == 2
+    assert checker.stats()["upstream_requests"] == calls  # refused lookups never went upstream
+
+    time.sleep(0.06)
+    upstream["status"] = 200
+    assert checker.search("car bans")[0]["title"] == "Transit"
+    assert breaker.stats()["state"] == "closed"
+
+
+def test_sync_follower_on_a_running_loop_respects_the_open_breaker(monkeypatch):
+    monkeypatch.setenv("FACTCHECK_SEARCH_API_KEY", "key")
+    monkeypatch.setenv("FACTCHECK_SEARCH_ENGINE_ID", "engine")
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, open_for=60)
+    checker = FactChecker(breaker=breaker)
+    upstream = {"calls": 0}
+
+    def handler(request):
+        upstream["calls"] += 1
+        return httpx.Response(200, json={"items": []})
+
+    checker._client = httpx.Client(transport=httpx.MockTransport(handler))
+    breaker.record(False)
+    breaker.record(False)
+
+    async def follow():
+        # An async lookup of the same query is in flight on this loop.
+        checker._join_flight(checker._cache_key("car bans", 3))
+        return checker.search("car bans")
+
+    assert asyncio.run(follow()) == []
+    assert upstream["calls"] == 0
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_caller_time_boxes_do_not_open_the_breaker(monkeypatch):
+    monkeypatch.setenv("FACTCHECK_SEARCH_API_KEY", "key")
+    monkeypatch.setenv("FACTCHECK_SEARCH_ENGINE_ID", "engine")
+
+    def handler(request):  # answers in 0.1s; a shorter read timeout runs out first
+        budget = request.extensions["timeout"]["read"]
+        time.sleep(min(budget, 0.1))
+        if budget < 0.1:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json={"items": [{"title": "Transit", "link": "https://t"}]})
+
+    for slow_call, state in ((3.0, "closed"), (0.01, "open")):
+        breaker = CircuitBreaker(min_calls=5, slow_call=slow_call)
+        checker = FactChecker(breaker=breaker)
+        checker._client = httpx.Client(transport=httpx.MockTransport(handler))
+        for index in range(5):
+            with pytest.raises(TimeoutError):
+                checker.search(f"car bans {index}", timeout=0.03)
+        # Time-boxes cut shorter than slow_call say nothing about upstream health.
+        assert breaker.stats()["state"] == state
+        assert bool(checker.search("public transit")) is (state == "closed")
+
+
+def test_slow_answers_count_as_failures_and_a_failed_probe_reopens():
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, slow_call=1.0, open_for=0.01)
+    breaker.record(True, elapsed=0.1)
+    breaker.record(True, elapsed=2.0)
+    assert breaker.state == "open"
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record(False)
+    assert (breaker.state, breaker.trips) == ("open", 2)
+
+
+def write_corpus(path, docs):
+    path.write_text("\n".join(json.dumps(doc) for doc in docs))
+    return str(path)
+
+
+def test_local_index_ranks_with_bm25_and_supports_incremental_adds(tmp_path):
+    corpus = write_corpus(
+        tmp_path / "corpus.jsonl",
+        [
+            {"title": "Car-free city centres", "link": "https://a", "body": "car bans cut city traffic and pollution"},
+            {"title": "Bicycle lanes", "link": "https://b", "snippet": "cycling infrastructure", "body": "bikes"},
+            {"title": "Urban air", "link": "https://c", "body": "pollution from traffic harms health"},
+        ],
+    )
+    index_dir = str(tmp_path / "index")
+    LocalCitationIndex.build(corpus, index_dir)
+
+    index = LocalCitationIndex.open(index_dir)
+    hits = index.search("car bans in the city", max_results=2)
+    assert hits[0] == {"title": "Car-free city centres", "link": "https://a", "snippet": "car bans cut city traffic and pollution"}
+
+    index.add([{"title": "Congestion pricing", "link": "https://d", "body": "congestion pricing london"}])
+    assert index.search("congestion pricing")[0]["link"] == "https://d"
+    before = index.search("traffic pollution", max_results=3)
+    index.compact()
+    reopened = LocalCitationIndex.open(index_dir)
+    assert reopened.num_docs == 4
+    assert reopened.search("traffic pollution", max_results=3) == before
+
+
+def test_fact_checker_uses_local_backend(tmp_path, monkeypatch):
+    monkeypatch.delenv("FACTCHECK_SEARCH_API_KEY", raising=False)
+    corpus = write_corpus(tmp_path / "corpus.jsonl", [{"title": "Transit", "link": "https://t", "body": "public transit"}])
+    checker = FactChecker(backend=LocalCitationIndex.build(corpus, str(tmp_path / "index")))
+    assert checker.search("public transit") == [{"title": "Transit", "link": "https://t", "snippet": "public transit"}]
+    assert asyncio.run(checker.asearch("public transit"))[0]["link"] == "https://t"
+
+
+def test_missing_local_index_is_an_error_not_an_empty_index(tmp_path, monkeypatch):
+    missing = tmp_path / "nowhere"
+    with pytest.raises(FileNotFoundError):
+        LocalCitationIndex.open(str(missing))
+    assert not missing.exists()
+
+    monkeypatch.setenv("FACTCHECK_BACKEND", "local")
+    monkeypatch.setenv("FACTCHECK_INDEX_PATH", str(missing))
+    monkeypatch.delenv("FACTCHECK_SEARCH_API_KEY", raising=False)
+    checker = FactChecker()
+    assert checker.backend is None and not checker.enabled
+    assert LocalCitationIndex.open(str(missing), create=True).num_docs == 0
@@ -0,0 +1,108 @@
+from pathlib import Path
+from types import SimpleNamespace
+import asyncio
+import sys
+import threading
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.agents.judge import Judge
+from src.services.hedging import HedgePolicy
+from src.services.runtime import GeminiLLM
+from src.services.scheduler import FairLimiter, bind_llm_limiter
+from src.services.simulator import SimulatedGemini
+
+
+def warmed_policy(**options) -> HedgePolicy:
+    options.setdefault("budget", 1.0)
+    policy = HedgePolicy(roles={"judge"}, min_samples=5, min_delay=0.01, **options)
+    for _ in range(5):
+        policy.observe("judge", 0.02)
+    return policy
+
+
+def test_slow_call_is_hedged_and_the_duplicate_wins():
+    policy = warmed_policy()
+    calls = []
+    lock = threading.Lock()
+
+    def attempt():
+        with lock:
+            calls.append(None)
+            first = len(calls) == 1
+        time.sleep(0.5 if first else 0.01)
+        return "slow" if first else "fast"
+
+    start = time.perf_counter()
+    assert policy.run("judge", attempt) == "fast"
+    assert time.perf_counter() - start < 0.3
+    stats = policy.stats()
+    assert (stats["calls"], stats["hedged"], stats["hedge_wins"]) == (1, 1, 1)
+    assert stats["hedge_delay_ms"]["judge"] >= 10
+    policy.close()
+
+
+def test_hedges_stay_within_budget_and_skip_other_roles():
+    policy = warmed_policy(budget=0.0)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    assert asyncio.run(policy.arun("judge", slow)) == "primary"
+    assert asyncio.run(policy.arun("argument", slow)) == "primary"
+    stats = policy.stats()
+    assert (stats["calls"], stats["hedged"], stats["budget_denied"]) == (1, 0, 1)
+
+
+def test_async_hedge_cancels_the_losing_request():
+    policy = warmed_policy()
+    started, cancelled = [], []
+
+    async def attempt():
+        started.append(None)
+        delay = 1.0 if len(started) == 1 else 0.01
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    assert asyncio.run(policy.arun("judge", attempt)) == 0.01
+    assert cancelled == [1.0]
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_judge_calls_are_routed_through_the_policy():
+    policy = HedgePolicy(roles={"judge"})
+    simulator = SimulatedGemini(latency_ms=1, time_scale=0.0, seed=5)
+    llm = GeminiLLM(simulator=simulator, hedging=policy, cache=None)
+    Judge(llm=llm).score_round({"text": "Cars pollute."}, {"text": "Cars free."}, {"topic": "Ban cars?"})
+    llm.generate("debater", "Argue for trains", role="argument")
+    assert policy.stats()["calls"] == 1
+
+
+def test_hedged_legs_each_hold_a_batch_limiter_slot(monkeypatch):
+    async def scenario(limit):
+        simulator = SimulatedGemini(latency_ms=1, time_scale=0.0)
+        llm = GeminiLLM(simulator=simulator, hedging=warmed_policy(), cache=None)
+        started = []
+
+        async def generate_content(model, contents, config, timeout):
+            started.append(None)
+            await asyncio.sleep(0.3 if len(started) == 1 else 0.01)
+            return SimpleNamespace(text="primary" if len(started) == 1 else "hedge", usage_metadata=None)
+
+        monkeypatch.setattr(llm, "_agenerate_content", generate_content)
+        limiter = FairLimiter(limit)
+        bind_llm_limiter(limiter, "debate-0")
+        text = await llm.agenerate("judge", "score", role="judge")
+        return text, limiter.stats()["peak_in_flight"]
+
+    # With one slot the hedge waits for it, and it only frees up when the primary answers.
+    assert asyncio.run(scenario(1)) == ("primary", 1)
+    assert asyncio.run(scenario(2)) == ("hedge", 2)
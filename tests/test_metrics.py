@@ -0,0 +1,109 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.agents.judge import Judge
+from src.services import metrics
+from src.services.metrics import MetricsRegistry
+from src.services.runtime import GeminiLLM
+from src.services.simulator import SimulatedGemini
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ["stage"], buckets=(0.1, 1.0))
+    latency.observe(0.05, stage="a")
+    latency.observe(0.5, stage="a")
+    latency.observe(5.0, stage="a")
+    registry.counter("demo_total", "Demo counter.", ["outcome"]).inc(outcome='say "hi"')
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_sum{stage="a"} 5.55' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    assert 'demo_total{outcome="say \\"hi\\""} 1' in text
+    with pytest.raises(ValueError):
+        registry.counter("demo_total", "Duplicate.")
+
+
+def test_stage_times_counts_errors_and_releases_in_flight():
+    before = metrics.STAGE_SECONDS.count(stage="test.stage")
+    errors = metrics.STAGE_ERRORS.value(stage="test.stage")
+
+    with metrics.stage("test.stage"):
+        assert metrics.STAGE_IN_FLIGHT.value(stage="test.stage") == 1
+    with pytest.raises(RuntimeError):
+        with metrics.stage("test.stage"):
+            raise RuntimeError("boom")
+
+    assert metrics.STAGE_SECONDS.count(stage="test.stage") == before + 2
+    assert metrics.STAGE_ERRORS.value(stage="test.stage") == errors + 1
+    assert metrics.STAGE_IN_FLIGHT.value(stage="test.stage") == 0
+
+
+def test_llm_and_judge_outcomes_are_counted():
+    llm = GeminiLLM(simulator=SimulatedGemini(latency_ms=1, time_scale=0.0, seed=3), cache=None)
+    ok = metrics.LLM_RESPONSES.value(outcome="ok")
+    calls = metrics.STAGE_SECONDS.count(stage="llm.generate")
+    invalid = metrics.JUDGE_PARSE_FALLBACKS.value(reason="invalid_json")
+    missing = metrics.JUDGE_PARSE_FALLBACKS.value(reason="missing_scores")
+
+    assert llm.generate("system", "prompt")
+    judge = Judge(llm=llm)
+    judge._parse_response("not json")
+    judge._parse_response('{"winner": "A"}')
+
+    assert metrics.LLM_RESPONSES.value(outcome="ok") == ok + 1
+    assert metrics.STAGE_SECONDS.count(stage="llm.generate") == calls + 1
+    assert metrics.JUDGE_PARSE_FALLBACKS.value(reason="invalid_json") == invalid + 1
+    assert metrics.JUDGE_PARSE_FALLBACKS.value(reason="missing_scores") == missing + 1
+
+
+def test_debate_span_is_detached_but_parents_its_turns(monkeypatch):
+    import asyncio
+    from contextlib import contextmanager
+    from itertools import count
+
+    from opentelemetry import trace
+
+    from src.agents.debaters import DebaterA, DebaterB
+    from src.services.debate import DebateManager
+
+    ids, parents = count(1), []
+
+    class RecordingTracer:
+        def start_span(self, name, attributes=None):
+            return trace.NonRecordingSpan(trace.SpanContext(trace_id=1, span_id=next(ids), is_remote=False))
+
+        @contextmanager
+        def start_as_current_span(self, name, attributes=None):
+            parents.append((name, trace.get_current_span().get_span_context().span_id))
+            with trace.use_span(self.start_span(name), end_on_exit=True):
+                yield
+
+    monkeypatch.setattr(metrics, "_tracer", RecordingTracer())
+    monkeypatch.setattr(metrics, "_tracing_checked", True)
+    llm = GeminiLLM()
+    manager = DebateManager(
+        debater_a=DebaterA(name="Alice", stance="pro", llm=llm),
+        debater_b=DebaterB(name="Blake", stance="con", llm=llm),
+        judge=Judge(llm=llm),
+    )
+
+    async def consume():
+        seen = []
+        async for _ in manager.astream("Ban cars?"):
+            seen.append(trace.get_current_span().get_span_context().span_id)
+        return seen
+
+    assert set(asyncio.run(consume())) == {0}  # the consumer never sees the debate span as current
+    turns = [parent for name, parent in parents if name in ("debater.argument", "judge.score")]
+    assert turns and set(turns) == {1}
@@ -0,0 +1,64 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.agents.debaters import Debater
+from src.agents.judge import Judge
+from src.agents.prompts import PromptBuilder, estimate_tokens, prompt_usage
+from src.agents.records import Turn
+from src.services.runtime import GeminiLLM
+
+
+def test_builder_trims_lowest_priority_first_and_levels_peers():
+    prompt = (
+        PromptBuilder("judge", budget=200)
+        .add("Keep me", "Topic: ")
+        .add("a" * 2000, "\nA: ", priority=1, floor=10)
+        .add("b" * 200, "\nB: ", priority=1, floor=10)
+        .add("h" * 400, "\nHistory: ", priority=0)
+        .build()
+    )
+
+    assert prompt.tokens <= 200
+    assert prompt.text.startswith("Topic: Keep me\nA: ")
+    assert "b" * 200 in prompt.text  # the short peer is untouched
+    assert "h" * 10 not in prompt.text
+    assert prompt.trimmed > 0
+
+
+def test_prompt_within_budget_is_unchanged():
+    prompt = PromptBuilder("rebuttal", budget=100).add("short", "Claim: ", priority=1).build()
+    assert prompt.text == "Claim: short"
+    assert prompt.trimmed == 0
+    assert prompt.tokens == estimate_tokens("Claim: short")
+
+
+def test_agents_stay_within_budget_and_report_usage():
+    prompt_usage.reset()
+    llm = GeminiLLM()
+    debater = Debater(name="Alice", stance="pro", llm=llm)
+    long_claim = Turn(agent="Blake", stance="con", text="word " * 5000, type="argument")
+    rebuttal = debater.rebut(long_claim)
+    Judge(llm=llm).score_round(
+        {"argument": long_claim, "rebuttal": rebuttal},
+        {"argument": long_claim, "rebuttal": rebuttal},
+        {"topic": "Cities", "history_summary": "x" * 10000},
+    )
+
+    stats = prompt_usage.stats()
+    assert stats["rebuttal"]["calls"] == 1
+    assert stats["rebuttal"]["tokens_max"] <= stats["rebuttal"]["budget"]
+    assert stats["judge"]["tokens_max"] <= stats["judge"]["budget"]
+    assert stats["judge"]["trimmed_calls"] == 1
+
+
+def test_rebuttals_still_accept_dict_claims():
+    debater = Debater(name="Alice", stance="pro", llm=GeminiLLM())
+    claim = {"agent": "Blake", "stance": "con", "text": "Cars mean freedom.", "type": "argument"}
+
+    assert debater.rebut(claim).type == "rebuttal"
+    assert asyncio.run(debater.arebut(claim)).agent == "Alice"
@@ -0,0 +1,100 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.services.ratelimit import AdaptiveConcurrency, DeadlineExceeded, RateLimiter, TokenBucket
+from src.services.runtime import GeminiLLM
+from src.services.simulator import SimulatedAPIError, SimulatedGemini
+
+
+def test_token_bucket_bursts_to_capacity_then_queues_reservations():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+    bucket.refund(2)
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_adaptive_concurrency_halves_once_per_burst_and_recovers():
+    concurrency = AdaptiveConcurrency(initial=8, maximum=8, cooldown=60)
+    for _ in range(8):
+        assert concurrency.try_acquire()
+    assert not concurrency.try_acquire()
+
+    for _ in range(3):
+        concurrency.release(overloaded=True)
+    assert concurrency.limit == 4
+    assert concurrency.decreases == 1
+
+    concurrency.release()
+    assert 4 < concurrency.limit < 5
+    assert concurrency.in_flight == 4
+
+
+def test_call_retries_overload_errors_but_not_others():
+    limiter = RateLimiter(attempts=4, base_delay=0.001, max_delay=0.002)
+    failures = [SimulatedAPIError(429), SimulatedAPIError(503)]
+
+    def flaky(timeout):
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert limiter.stats()["retries"] == 2
+    assert limiter.stats()["overloads"] == 2
+    assert limiter.concurrency.in_flight == 0
+
+    def broken(timeout):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call(broken)
+    assert limiter.stats()["retries"] == 2
+
+
+def test_call_gives_up_when_the_quota_cannot_admit_it_in_time():
+    limiter = RateLimiter(requests_per_minute=60, deadline=0.5)
+    limiter._requests = TokenBucket(rate_per_minute=60, capacity=1)
+
+    assert limiter.call(lambda timeout: timeout) <= 0.5
+    with pytest.raises(DeadlineExceeded):
+        limiter.call(lambda timeout: timeout)
+    assert limiter.stats()["deadline_exceeded"] == 1
+
+
+def test_acall_enforces_the_per_call_deadline():
+    limiter = RateLimiter(deadline=0.05)
+
+    async def slow(timeout):
+        await asyncio.sleep(1)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(limiter.acall(slow))
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_llm_rides_out_simulated_rate_limit_errors():
+    simulator = SimulatedGemini(latency_ms=1, error_rate=0.5, time_scale=0.01, seed=11)
+    limiter = RateLimiter(attempts=10, base_delay=0.001, max_delay=0.005, tokens_per_minute=10**7)
+    llm = GeminiLLM(simulator=simulator, limiter=limiter, cache=None)
+
+    texts = [llm.generate("debater", f"Argue point {index}") for index in range(12)]
+
+    async def many():
+        return await asyncio.gather(*(llm.agenerate("debater", f"Rebut {index}") for index in range(12)))
+
+    texts += asyncio.run(many())
+    assert all(texts)
+    stats = limiter.stats()
+    assert stats["retries"] > 0
+    assert stats["concurrency_limit"] < 32
@@ -0,0 +1,155 @@
+from pathlib import Path
+from types import SimpleNamespace
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.services import runtime
+from src.services.cache import ResponseCache
+from src.services.runtime import GeminiLLM
+
+
+class FakeModel:
+    def __init__(self, model_name, system_instruction):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+
+def test_model_pool_reuses_handles_and_evicts_lru(monkeypatch):
+    monkeypatch.setattr(runtime, "genai", SimpleNamespace(GenerativeModel=FakeModel))
+    llm = GeminiLLM(pool_size=2)
+
+    judge = llm._model("judge")
+    assert llm._model("judge") is judge
+    llm._model("debater")
+    llm._model("judge")
+    llm._model("rebuttal")  # evicts "debater", the least recently used
+
+    assert llm._model("judge") is judge
+    assert llm.pool_stats() == {"size": 2, "capacity": 2, "hits": 3, "misses": 3}
+
+
+def test_response_cache_memory_and_disk_tiers(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    key = ResponseCache.key("gemini", "judge", "", "prompt", 0.2)
+    cache = ResponseCache(path=path, memory_size=1)
+    cache.set(key, "verdict")
+    assert cache.get(key) == "verdict"
+    cache.close()
+
+    reopened = ResponseCache(path=path)
+    assert reopened.get(key) == "verdict"
+    assert reopened.get(key) == "verdict"
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_response_cache_expires_entries():
+    cache = ResponseCache(ttl=-1)
+    cache.set("k", "stale")
+    assert cache.get("k") is None
+
+
+def test_generate_serves_cache_hits_and_honours_bypass(monkeypatch):
+    calls = []
+
+    class CountingModel(FakeModel):
+        def generate_content(self, prompt, generation_config, request_options=None):
+            calls.append(prompt)
+            return SimpleNamespace(text=f"answer {len(calls)}")
+
+    monkeypatch.setattr(runtime, "genai", SimpleNamespace(GenerativeModel=CountingModel))
+    llm = GeminiLLM(cache=ResponseCache())
+    llm._mock_mode = False
+
+    assert llm.generate("judge", "score this", temperature=0.2) == "answer 1"
+    assert llm.generate("judge", "score this", temperature=0.2) == "answer 1"
+    assert llm.generate("judge", "score this", temperature=0.2, use_cache=False) == "answer 2"
+    assert llm.cache.stats()["bypassed"] == 1
+
+
+def test_async_calls_use_the_blocking_client_over_rest(monkeypatch):
+    import asyncio
+    import threading
+
+    threads = []
+
+    class RestOnlyModel(FakeModel):
+        def generate_content(self, prompt, generation_config, request_options=None):
+            threads.append(threading.current_thread())
+            return SimpleNamespace(text="over rest")
+
+        async def generate_content_async(self, *args, **kwargs):
+            raise AssertionError("the async client has no REST transport")
+
+    monkeypatch.setattr(runtime, "genai", SimpleNamespace(GenerativeModel=RestOnlyModel))
+    llm = GeminiLLM(cache=None)
+    llm._mock_mode, llm._sync_transport = False, True
+
+    assert asyncio.run(llm.agenerate("debater", "argue")) == "over rest"
+    assert threads and threads[0] is not threading.main_thread()
+def test_simulated_backend_drives_the_real_call_path():
+    from src.agents.judge import Judge
+    from src.services.simulator import SimulatedGemini
+
+    simulator = SimulatedGemini(latency_ms=20, tokens_per_second=20000, seed=7)
+    llm = GeminiLLM(simulator=simulator)
+    judgement = Judge(llm=llm).score_round(
+        {"argument": {"text": "Cars pollute."}, "rebuttal": {"text": "Buses too."}},
+        {"argument": {"text": "Cars free people."}, "rebuttal": {"text": "Not everyone."}},
+        {"topic": "Ban cars?"},
+    )
+
+    assert not llm.mock_mode
+    assert judgement.winner in {"A", "B", "draw"}
+    assert judgement.scores["A"] > 0 and judgement.scores["B"] > 0
+    assert llm.generate("debater", "Argue for trains").startswith("[SIM:")
+    assert simulator.stats()["calls"] == 2
+
+
+def test_simulated_backend_injects_errors_and_latency():
+    import time
+
+    from src.services.simulator import SimulatedAPIError, SimulatedGemini
+
+    model = SimulatedGemini(latency_ms=30, latency_sigma=0, error_rate=1.0, seed=1).model("gemini")
+    start = time.perf_counter()
+    try:
+        model.generate_content("hello")
+    except SimulatedAPIError as exc:
+        assert exc.code in (429, 503)
+    else:
+        raise AssertionError("expected an injected error")
+    assert time.perf_counter() - start < 0.03
+
+    simulator = SimulatedGemini(latency_ms=30, latency_sigma=0, tokens_per_second=1000, output_tokens=50)
+    reply = simulator.plan("gemini", "", "hello")
+    assert reply.delay == 0.03 + reply.prompt_tokens / 4000 + reply.output_tokens / 1000
+    start = time.perf_counter()
+    simulator.model("gemini").generate_content("hello")
+    assert time.perf_counter() - start >= 0.03
+
+
+def test_fake_gemini_server_speaks_the_rest_protocol():
+    from fastapi.testclient import TestClient
+
+    from src.services.fake_gemini import create_app
+    from src.services.simulator import SimulatedGemini
+
+    client = TestClient(create_app(SimulatedGemini(latency_ms=1, time_scale=0.01, seed=3)))
+    body = {
+        "systemInstruction": {"parts": [{"text": "You are a judge."}]},
+        "contents": [{"role": "user", "parts": [{"text": 'Reply with "rubric_scores" JSON'}]}],
+    }
+    response = client.post("/v1beta/models/gemini-2.5-flash:generateContent", json=body)
+    assert response.status_code == 200
+    text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+    assert set(json.loads(text)) == {"rubric_scores", "winner", "rationale"}
+
+    failing = TestClient(create_app(SimulatedGemini(error_rate=1.0, time_scale=0.01)))
+    response = failing.post("/v1beta/models/gemini-2.5-flash:generateContent", json=body)
+    assert response.status_code in (429, 503)
+    assert response.json()["error"]["status"] in ("RESOURCE_EXHAUSTED", "UNAVAILABLE")
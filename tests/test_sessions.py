@@ -0,0 +1,50 @@
+from pathlib import Path
+import sqlite3
+import sys
+import time
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.agents.records import Turn
+from src.services.sessions import SessionNotFound, SessionStore
+
+
+def make_turn(text):
+    return Turn(agent="Alice", stance="pro", text=text, type="argument")
+
+
+def test_sessions_default_to_a_file_and_reload_from_it(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("DEBATE_SESSION_DB", raising=False)
+    store = SessionStore.from_env()
+    session_id = store.create()
+    store.append(session_id, [make_turn("Cars pollute.")])
+    store.close()
+
+    assert store.path == "data/sessions.db" and (tmp_path / "data" / "sessions.db").exists()
+    reopened = SessionStore("data/sessions.db")
+    assert [turn.text for turn in reopened.history(session_id)] == ["Cars pollute."]
+    assert reopened.stats()["loads"] == 1
+
+
+def test_idle_sessions_expire_and_the_store_is_capped(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path, ttl=0.05)
+    stale = store.create()
+    time.sleep(0.06)
+    with pytest.raises(SessionNotFound):
+        store.history(stale)
+    store.close()
+
+    store = SessionStore(path, ttl=0.05, max_stored=2)
+    assert store.stats()["expired"] == 1  # trimmed on open
+    ids = [store.create() for _ in range(100)]
+    assert store.stats()["sessions"] == 2
+    store.append(ids[-1], [make_turn("Transit works.")])
+    store.close()
+    rows = sqlite3.connect(path).execute("SELECT DISTINCT session_id FROM turns").fetchall()
+    assert rows == [(ids[-1],)]
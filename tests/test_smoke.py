@@ -1,6 +1,11 @@
 
 from pathlib import Path
+import asyncio
+import json
+import os
+import subprocess
 import sys
+import threading
 
 from fastapi.testclient import TestClient
 
@@ -8,7 +13,10 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.services.app import app
+os.environ.setdefault("DEBATE_SESSION_DB", ":memory:")  # keep test sessions out of data/
+
+from src.services import app as app_module
+from src.services.app import Services, _component, app, services
 
 
 client = TestClient(app)
@@ -23,12 +31,167 @@ def test_debate_endpoint_returns_rounds():
     assert body["final_scores"]["totals"]["A"] >= 0
 
 
+def test_debate_with_deadline_reports_degradation_and_stage_timings():
+    payload = {"topic": "Should AI moderate debates?", "rounds": 1, "deadline_ms": 20000}
+    body = client.post("/debate", json=payload).json()
+    assert body["degraded"] is False
+    assert body["deadline"]["budget_ms"] == 20000
+    assert "judge.score" in body["deadline"]["stages_ms"]
+
+
 def test_health_endpoint_reports_status():
     response = client.get("/healthz")
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
 
 
+def test_metrics_endpoint_exports_stage_histograms():
+    client.post("/debate", json={"topic": "Should AI moderate debates?", "rounds": 1})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'agora_stage_seconds_count{stage="debater.argument"}' in response.text
+    assert 'agora_stage_seconds_count{stage="judge.score"}' in response.text
+    assert 'agora_llm_responses_total{outcome="mock"}' in response.text
+
+
 def test_adk_endpoint_disabled_without_flag():
     response = client.post("/adk/run", json={"prompt": "Host a quick debate"})
     assert response.status_code == 503
+    response = client.post("/adk/stream", json={"prompt": "Host a quick debate"})
+    assert response.status_code == 503
+
+
+def test_adk_stream_maps_failures_before_the_first_event(monkeypatch):
+    class BrokenRuntime:
+        def __init__(self, error):
+            self.error = error
+
+        async def astream(self, prompt, session_id=None):
+            if self.error is not None:
+                raise self.error
+            return
+            yield
+
+    for error, status in ((None, 502), (RuntimeError("ADK runtime not available"), 503), (KeyError("x"), 502)):
+        monkeypatch.setitem(services.built, "adk_runtime", BrokenRuntime(error))
+        assert client.post("/adk/stream", json={"prompt": "Host a quick debate"}).status_code == status
+
+
+def test_debate_stream_emits_turns_then_final_scores():
+    with client.stream("POST", "/debate/stream", json={"topic": "Should AI moderate debates?", "rounds": 1}) as response:
+        assert response.status_code == 200
+        body = "".join(response.iter_text())
+    events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+    assert events[0] == "start"
+    assert events[-1] == "final_scores"
+    assert sorted(events[1:-1]) == ["argument", "argument", "judgement", "rebuttal", "rebuttal"]
+    final = json.loads(body.strip().splitlines()[-1].split("data: ", 1)[1])
+    assert set(final) == {"topic", "rounds", "final_scores", "transcript"}
+
+
+def test_debate_stream_ends_with_an_error_frame_when_the_debate_fails(monkeypatch):
+    class FailingManager:
+        async def astream(self, **kwargs):
+            yield {"event": "start", "data": {"topic": kwargs["topic"]}}
+            raise RuntimeError("LLM upstream unavailable")
+
+    monkeypatch.setitem(services.built, "manager", FailingManager())
+    with client.stream("POST", "/debate/stream", json={"topic": "Should AI moderate debates?"}) as response:
+        assert response.status_code == 200
+        body = "".join(response.iter_text())
+    assert body.strip().splitlines()[-2:] == [
+        "event: error",
+        'data: {"detail": "LLM upstream unavailable"}',
+    ]
+
+
+def test_debate_batch_streams_ndjson_results():
+    payload = {"requests": [{"topic": "Should AI moderate debates?"}, {"topic": "Is remote work better?"}]}
+    response = client.post("/debate/batch", json=payload)
+    assert response.status_code == 200
+    entries = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(entry["index"] for entry in entries) == [0, 1]
+    assert all(entry["result"]["final_scores"] for entry in entries)
+
+
+def test_debate_batch_continues_sessions():
+    session_id = client.post("/sessions").json()["session_id"]
+    payload = {"requests": [{"topic": "Should AI moderate debates?", "session_id": session_id}]}
+    entry = json.loads(client.post("/debate/batch", json=payload).text)
+    assert entry["result"]["session_id"] == session_id
+    assert len(client.get(f"/sessions/{session_id}").json()["transcript"]) == 4
+
+    missing = {"requests": [{"topic": "Should AI moderate debates?", "session_id": "nope"}]}
+    assert client.post("/debate/batch", json=missing).status_code == 404
+    twice = {"requests": payload["requests"] * 2}
+    assert client.post("/debate/batch", json=twice).status_code == 400
+
+
+def test_session_debates_return_only_new_turns():
+    session_id = client.post("/sessions").json()["session_id"]
+    payload = {"topic": "Should AI moderate debates?", "session_id": session_id}
+
+    first = client.post("/debate", json=payload).json()
+    second = client.post("/debate", json=payload).json()
+
+    assert first["session_id"] == session_id
+    assert len(first["transcript"]) == len(second["transcript"]) == 4
+    assert "Previous turns summary: Debater Alice" in second["rounds"][0]["A"]["argument"]["text"]
+    stored = client.get(f"/sessions/{session_id}").json()["transcript"]
+    assert stored == first["transcript"] + second["transcript"]
+    assert client.post("/debate", json={**payload, "session_id": "missing"}).status_code == 404
+
+
+def test_importing_the_app_builds_nothing():
+    probe = (
+        "import sys\n"
+        "from src.services.app import app, services\n"
+        "assert not services.built, services.built\n"
+        "assert 'google.generativeai' not in sys.modules\n"
+        "assert 'src.agents.debaters' not in sys.modules\n"
+        "from fastapi.testclient import TestClient\n"
+        "health = TestClient(app).get('/healthz').json()\n"
+        "assert not services.built, services.built\n"
+        "assert 'src.services.runtime' not in sys.modules\n"
+        "assert health['mock_llm'] is None and health['llm_limiter'] is None, health\n"
+    )
+    subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT, check=True)
+
+
+def test_a_slow_component_build_blocks_neither_other_components_nor_the_loop(monkeypatch):
+    building, release = threading.Event(), threading.Event()
+
+    def adk_runtime(self):
+        building.set()
+        release.wait(5)
+
+    monkeypatch.setattr(Services, "adk_runtime", _component(adk_runtime))
+    container = Services()
+    monkeypatch.setattr(app_module, "services", container)
+    warmup = threading.Thread(target=lambda: container.adk_runtime)
+    warmup.start()
+    building.wait(5)
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while not release.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        # Not held up by the ADK build in progress.
+        sessions = await asyncio.wait_for(app_module._component_off_loop("sessions"), 1)
+        runtime = asyncio.ensure_future(app_module._component_off_loop("adk_runtime"))
+        await asyncio.sleep(0.1)
+        release.set()
+        await asyncio.gather(runtime, ticker)
+        return sessions, ticks
+
+    sessions, ticks = asyncio.run(scenario())
+    warmup.join()
+    assert sessions is container.built["sessions"]
+    assert ticks >= 5  # the loop kept running while the ADK build held its lock
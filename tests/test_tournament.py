@@ -0,0 +1,83 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.agents.judge import Judge
+from src.evaluation.tournament import (
+    Participant,
+    Tournament,
+    bradley_terry_ratings,
+    elo_ratings,
+    round_robin_schedule,
+)
+from src.services.runtime import GeminiLLM
+
+
+def test_round_robin_schedule_covers_each_ordered_pair_once():
+    schedule = round_robin_schedule(5)
+    pairings = [pair for slot in schedule for pair in slot]
+    assert len(pairings) == len(set(pairings)) == 20
+    for slot in schedule:
+        seats = [seat for pair in slot for seat in pair]
+        assert len(seats) == len(set(seats))
+
+
+def test_ratings_recover_strength_order():
+    n = 60
+    rng = np.random.default_rng(7)
+    strength = np.linspace(-2, 2, n)
+    schedule = round_robin_schedule(n)
+    a = np.array([p[0] for slot in schedule for p in slot])
+    b = np.array([p[1] for slot in schedule for p in slot])
+    slots = np.array([i for i, slot in enumerate(schedule) for _ in slot])
+    score = (rng.random(len(a)) < 1 / (1 + np.exp(strength[b] - strength[a]))).astype(float)
+
+    elo = elo_ratings(a, b, score, slots, n)
+    bt = bradley_terry_ratings(a, b, score, n)
+
+    assert np.corrcoef(elo, strength)[0, 1] > 0.9
+    assert np.corrcoef(bt, strength)[0, 1] > 0.95
+    assert abs(np.mean(bt) - 1500) < 1e-6
+
+
+def test_tournament_plays_full_schedule_and_ranks_everyone():
+    participants = [Participant(name=f"config-{i}", guidance=f"Style {i}.") for i in range(3)]
+    tournament = Tournament(participants=participants, judge=Judge(llm=GeminiLLM()))
+
+    results = tournament.run(["Should cities ban private cars?"])
+
+    assert len(results) == 6
+    assert all(len(result.judgements) == 1 for result in results)
+    standings = tournament.standings()
+    assert {row["name"] for row in standings} == {p.name for p in participants}
+    assert all(row["played"] == 4 for row in standings)
+
+
+def test_sync_run_works_inside_a_running_loop():
+    participants = [Participant(name=f"config-{i}", guidance=f"Style {i}.") for i in range(2)]
+    tournament = Tournament(participants=participants, judge=Judge(llm=GeminiLLM()), double=False)
+
+    async def notebook_cell():
+        return tournament.run(["Should cities ban private cars?"])
+
+    assert len(asyncio.run(notebook_cell())) == 1
+
+
+def test_repeat_runs_continue_the_slot_numbering():
+    participants = [Participant(name=f"config-{i}", guidance=f"Style {i}.") for i in range(3)]
+    tournament = Tournament(participants=participants, judge=Judge(llm=GeminiLLM()), double=False)
+
+    first = tournament.run(["Should cities ban private cars?"])
+    second = tournament.run(["Is remote work better?"])
+
+    assert min(r.slot for r in second) == max(r.slot for r in first) + 1
+    _, _, _, slots = tournament.results_matrix()
+    for slot in set(slots.tolist()):
+        seats = [seat for r in tournament.results if r.slot == slot for seat in (r.a, r.b)]
+        assert len(seats) == len(set(seats))